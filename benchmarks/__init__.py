@@ -0,0 +1 @@
+"""Benchmark suite for the storage layer and services."""
@@ -0,0 +1,77 @@
+"""Load and save timings for every available FileStore codec.
+
+Run:
+  python -m benchmarks.codecs --sizes 10000 100000 --output results/codecs.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.datagen import generate, scaled_sizes
+from benchmarks.run import time_calls, environment, summarize, write_report
+from src.serialization import available_codecs
+from src.storage import FileStore
+
+
+def run_codecs(
+    sizes: Sequence[int],
+    codecs: Sequence[str],
+    repeat: int = 5,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Time save() and load() of the reservations file per codec."""
+    results = []
+    for size in sizes:
+        data = generate(*scaled_sizes(size), seed)["reservations"]
+        with tempfile.TemporaryDirectory() as tmp:
+            for codec in codecs:
+                store = FileStore(f"{tmp}/{codec}.dat", codec=codec)
+                results.extend(_time_codec(store, data, size, repeat))
+    return results
+
+
+def _time_codec(
+    store: FileStore, data: Dict[str, Any], size: int, repeat: int
+) -> List[Dict[str, Any]]:
+    """Return save and load summaries for one store's codec."""
+    saves = time_calls([functools.partial(store.save, data)] * repeat)
+    loads = time_calls([store.load] * repeat)
+    rows = []
+    for action, latencies in (("save", saves), ("load", loads)):
+        row = summarize(f"{store.codec.name}:{action}", size, repeat,
+                        latencies)
+        row["codec"] = store.codec.name
+        row["bytes"] = store.path.stat().st_size
+        rows.append(row)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000])
+    parser.add_argument("--codecs", nargs="+", default=available_codecs(),
+                        choices=available_codecs())
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="results/codecs.json")
+    args = parser.parse_args(argv)
+
+    results = run_codecs(args.sizes, args.codecs, args.repeat, args.seed)
+    report = dict(environment(), seed=args.seed, results=results)
+    output = write_report(report, args.output)
+    for row in report["results"]:
+        print(
+            f"{row['scenario']:>20} size={row['size']:<9} "
+            f"p50={row['p50_ms']}ms  bytes={row['bytes']}"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
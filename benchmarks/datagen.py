@@ -0,0 +1,90 @@
+"""Deterministic synthetic data for benchmarks.
+
+The same ``seed`` and sizes always produce the same records, so results
+from different versions of the code are measured on identical data.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict
+from typing import Dict, Tuple
+
+from src.models import Customer, Hotel, Reservation
+
+Dataset = Dict[str, Dict[str, dict]]
+
+
+def scaled_sizes(reservations: int) -> Tuple[int, int, int]:
+    """Return (hotels, customers, reservations) for a target size."""
+    hotels = max(10, reservations // 100)
+    customers = max(10, reservations // 10)
+    return hotels, customers, reservations
+
+
+def hotel_id(index: int) -> str:
+    """Return the id of the index-th synthetic hotel."""
+    return f"H{index:07d}"
+
+
+def customer_id(index: int) -> str:
+    """Return the id of the index-th synthetic customer."""
+    return f"C{index:08d}"
+
+
+def reservation_id(index: int) -> str:
+    """Return the id of the index-th synthetic reservation."""
+    return f"R{index:09d}"
+
+
+def generate(
+    hotels: int, customers: int, reservations: int, seed: int = 0
+) -> Dataset:
+    """Build records for the three collections.
+
+    Hotels get enough rooms for every reservation assigned to them plus
+    headroom, so booking scenarios never run out of rooms. About one
+    reservation in ten is canceled.
+    """
+    rng = random.Random(seed)
+    booked = [0] * hotels
+    reservation_records = {}
+    for index in range(reservations):
+        hotel = rng.randrange(hotels)
+        canceled = rng.random() < 0.1
+        if not canceled:
+            booked[hotel] += 1
+        reservation = Reservation(
+            reservation_id(index),
+            hotel_id(hotel),
+            customer_id(rng.randrange(customers)),
+            "CANCELED" if canceled else "ACTIVE",
+        )
+        reservation_records[reservation.reservation_id] = asdict(reservation)
+
+    hotel_records = {}
+    for index in range(hotels):
+        rooms_total = booked[index] + 1000
+        hotel = Hotel(
+            hotel_id(index),
+            f"Hotel {index}",
+            rooms_total,
+            rooms_total - booked[index],
+        )
+        hotel_records[hotel.hotel_id] = asdict(hotel)
+
+    customer_records = {
+        customer_id(index): asdict(
+            Customer(
+                customer_id(index),
+                f"Customer {index}",
+                f"customer{index}@example.com",
+            )
+        )
+        for index in range(customers)
+    }
+    return {
+        "hotels": hotel_records,
+        "customers": customer_records,
+        "reservations": reservation_records,
+    }
@@ -0,0 +1,239 @@
+"""Timed scenarios for the services at increasing dataset sizes.
+
+Run:
+  python -m benchmarks.run --sizes 10000 100000 --output results/bench.json
+
+Each scenario records per-operation latencies; the JSON output lists
+ops/sec and latency percentiles per (scenario, size) so runs made on
+different versions can be compared. A scenario that needs records of its
+own (cancel) creates them in an untimed setup step, so any subset of
+scenarios can run in any order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.datagen import (
+    customer_id,
+    generate,
+    hotel_id,
+    reservation_id,
+    scaled_sizes,
+)
+from src.backends import COLLECTIONS, open_stores
+from src.models import Customer, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+
+SCENARIOS = (
+    "get",
+    "update",
+    "booking",
+    "cancel",
+    "list_all",
+    "bulk_import",
+)
+
+# Records per create_many call in the bulk_import scenario.
+IMPORT_BATCH = 1000
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted ``samples``."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(fraction * len(samples)) - 1))
+    return samples[rank]
+
+
+def summarize(
+    scenario: str, size: int, ops: int, latencies: List[float]
+) -> Dict[str, Any]:
+    """Return ops/sec and latency percentiles (ms) for one scenario."""
+    latencies = sorted(latencies)
+    seconds = sum(latencies)
+    return {
+        "scenario": scenario,
+        "size": size,
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(ops / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4) if latencies else 0.0,
+    }
+
+
+def time_calls(calls: Sequence[Callable[[], Any]]) -> List[float]:
+    """Run each call and return its latency in seconds."""
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _close(stores: Dict[str, Any]) -> None:
+    """Release backend resources held by ``stores``."""
+    closed = set()
+    for store in stores.values():
+        closer = getattr(store, "close", None)
+        if closer is None:
+            closer = getattr(getattr(store, "database", None), "close", None)
+        if closer is not None and id(closer.__self__) not in closed:
+            closed.add(id(closer.__self__))
+            closer()
+
+
+# pylint: disable-next=too-many-locals
+def run_size(
+    size: int,
+    backend: str = "json",
+    ops: int = 200,
+    scenarios: Sequence[str] = SCENARIOS,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Seed a fresh dataset of ``size`` reservations and time scenarios."""
+    hotels, customers, reservations = scaled_sizes(size)
+    dataset = generate(hotels, customers, reservations, seed)
+    rng = random.Random(seed + 1)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = open_stores({"backend": backend, "data_dir": tmp})
+        try:
+            for name in COLLECTIONS:
+                stores[name].save(dataset[name])
+            hotel_service = HotelService(stores["hotels"])
+            customer_service = CustomerService(stores["customers"])
+            service = ReservationService(
+                stores["reservations"], hotel_service, customer_service
+            )
+
+            new_ids = [reservation_id(reservations + i) for i in range(ops)]
+            cancel_ids = [
+                reservation_id(reservations + ops + i) for i in range(ops)
+            ]
+            plans: Dict[str, Any] = {
+                "get": (ops, [
+                    (lambda rid=reservation_id(rng.randrange(size)):
+                     service.get(rid))
+                    for _ in range(ops)
+                ]),
+                "update": (ops, [
+                    (lambda hid=hotel_id(rng.randrange(hotels)), i=i:
+                     hotel_service.update(hid, name=f"Renamed {i}"))
+                    for i in range(ops)
+                ]),
+                "booking": (ops, [
+                    (lambda rid=rid, hid=hotel_id(rng.randrange(hotels)),
+                     cid=customer_id(rng.randrange(customers)):
+                     service.create(Reservation(rid, hid, cid)))
+                    for rid in new_ids
+                ]),
+                "cancel": (ops, [
+                    (lambda rid=rid: service.cancel(rid)) for rid in cancel_ids
+                ]),
+                "list_all": (max(1, ops // 20), [
+                    service.list_all for _ in range(max(1, ops // 20))
+                ]),
+                "bulk_import": (size, [
+                    (lambda start=start: customer_service.create_many(
+                        Customer(customer_id(customers + i), f"Imported {i}")
+                        for i in range(start, min(size, start + IMPORT_BATCH))
+                    ))
+                    for start in range(0, size, IMPORT_BATCH)
+                ]),
+            }
+            setups = {
+                "cancel": functools.partial(service.create_many, [
+                    Reservation(rid, hotel_id(rng.randrange(hotels)),
+                                customer_id(rng.randrange(customers)))
+                    for rid in cancel_ids
+                ]),
+            }
+            for scenario in scenarios:
+                if scenario in setups:
+                    setups[scenario]()
+                count, calls = plans[scenario]
+                results.append(
+                    summarize(scenario, size, count, time_calls(calls))
+                )
+        finally:
+            _close(stores)
+    return results
+
+
+def run_suite(
+    sizes: Sequence[int],
+    backend: str = "json",
+    ops: int = 200,
+    scenarios: Sequence[str] = SCENARIOS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run every size and return the machine-readable report."""
+    results = []
+    for size in sizes:
+        results.extend(run_size(size, backend, ops, scenarios, seed))
+    return dict(
+        environment(), backend=backend, seed=seed, ops=ops, results=results
+    )
+
+
+def environment() -> Dict[str, str]:
+    """Return when and where a benchmark ran."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> Path:
+    """Write ``report`` as JSON to ``path`` and return the path."""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return output
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000])
+    parser.add_argument("--backend", default="json",
+                        choices=("json", "journal", "sqlite"))
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS),
+                        choices=SCENARIOS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="results/benchmarks.json")
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        args.sizes, args.backend, args.ops, args.scenarios, args.seed
+    )
+    output = write_report(report, args.output)
+    for row in report["results"]:
+        print(
+            f"{row['scenario']:>12} size={row['size']:<9} "
+            f"{row['ops_per_sec']} ops/s  p50={row['p50_ms']}ms  "
+            f"p99={row['p99_ms']}ms"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
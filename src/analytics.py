@@ -0,0 +1,225 @@
+"""Occupancy and booking analytics over the reservation table.
+
+Reservations are streamed into a columnar ReservationTable, whose array
+columns are wrapped as NumPy arrays without copying; every statistic is
+then one vectorized pass (``bincount`` over interned codes). When NumPy is
+not installed the same report is computed with plain Python loops.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.compact import ReservationTable
+
+try:  # NumPy is optional; the pure-Python path gives identical results.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+@dataclass
+class HotelStats:
+    """Per-hotel occupancy figures."""
+
+    hotel_id: str
+    rooms_total: int
+    active: int = 0
+    canceled: int = 0
+    occupancy_rate: float = 0.0
+    cancellation_ratio: float = 0.0
+
+
+@dataclass
+class OccupancyReport:
+    """Aggregate figures for a set of hotels and reservations.
+
+    ``engine`` records whether the NumPy or the pure-Python path ran.
+    """
+
+    by_hotel: Dict[str, HotelStats]
+    active: int
+    canceled: int
+    cancellation_ratio: float
+    customer_bookings: Dict[str, int] = field(default_factory=dict)
+    engine: str = "python"
+
+
+# Per-hotel (occupied, active, canceled) and per-customer booking counts,
+# each indexed by interned code.
+_Counts = Tuple[List[int], List[int], List[int], List[int]]
+
+
+def numpy_available() -> bool:
+    """Return True if the vectorized path can be used."""
+    return np is not None
+
+
+def build_report(
+    hotel_service: Any,
+    reservation_service: Any,
+    night: Optional[str] = None,
+    use_numpy: bool = True,
+) -> OccupancyReport:
+    """Stream both services' stores and compute an OccupancyReport."""
+    rooms = {
+        hotel.hotel_id: hotel.rooms_total
+        for hotel in hotel_service.iter_all(typed=True)
+    }
+    return compute_report(
+        rooms, reservation_service.load_table(), night, use_numpy
+    )
+
+
+def compute_report(
+    rooms_by_hotel: Dict[str, int],
+    table: ReservationTable,
+    night: Optional[str] = None,
+    use_numpy: bool = True,
+) -> OccupancyReport:
+    """Compute occupancy, cancellations and per-customer counts.
+
+    Occupancy is active reservations over ``rooms_total``; with ``night``
+    (an ISO date) only dated stays covering that night count, plus the
+    undated stays, which hold their room every night.
+    Reservations for hotels missing from ``rooms_by_hotel`` count toward
+    the totals but get no per-hotel entry.
+    """
+    night_ordinal = (
+        date.fromisoformat(night).toordinal() if night is not None else None
+    )
+    if use_numpy and np is not None:
+        counts = _counts_numpy(table, night_ordinal)
+        engine = "numpy"
+    else:
+        counts = _counts_python(table, night_ordinal)
+        engine = "python"
+    total_active, total_canceled = sum(counts[1]), sum(counts[2])
+    return OccupancyReport(
+        by_hotel=_hotel_stats(rooms_by_hotel, table, counts),
+        active=total_active,
+        canceled=total_canceled,
+        cancellation_ratio=_ratio(
+            total_canceled, total_active + total_canceled
+        ),
+        customer_bookings={
+            customer_id: count
+            for customer_id, count in zip(
+                table.customers.values, counts[3]
+            )
+            if count
+        },
+        engine=engine,
+    )
+
+
+def _hotel_stats(
+    rooms_by_hotel: Dict[str, int],
+    table: ReservationTable,
+    counts: _Counts,
+) -> Dict[str, HotelStats]:
+    """Combine per-hotel-code counts with each hotel's capacity."""
+    occupied, active, canceled, _ = counts
+    by_hotel = {}
+    for hotel_id, rooms_total in rooms_by_hotel.items():
+        code = table.hotels.find(hotel_id)
+        stats = HotelStats(hotel_id, rooms_total)
+        if code is not None:
+            stats.active = active[code]
+            stats.canceled = canceled[code]
+            stats.occupancy_rate = _ratio(occupied[code], rooms_total)
+            stats.cancellation_ratio = _ratio(
+                stats.canceled, stats.active + stats.canceled
+            )
+        by_hotel[hotel_id] = stats
+    return by_hotel
+
+
+def _ratio(part: int, whole: int) -> float:
+    """Return part/whole, or 0.0 when whole is zero."""
+    return part / whole if whole else 0.0
+
+
+def _status_codes(table: ReservationTable) -> Tuple[int, int]:
+    """Return the ACTIVE and CANCELED codes (-1 when never seen)."""
+    active = table.statuses.find("ACTIVE")
+    canceled = table.statuses.find("CANCELED")
+    return (
+        -1 if active is None else active,
+        -1 if canceled is None else canceled,
+    )
+
+
+def _counts_numpy(
+    table: ReservationTable, night: Optional[int]
+) -> _Counts:
+    """Return per-hotel (occupied, active, canceled) and per-customer
+    counts in vectorized passes."""
+    columns = {
+        name: _wrap(column) for name, column in table.columns().items()
+    }
+    hotel, customer, status = (
+        columns["hotel"], columns["customer"], columns["status"]
+    )
+    hotels = len(table.hotels)
+
+    active_code, canceled_code = _status_codes(table)
+    is_active = _matches(status, active_code)
+    occupied_mask = is_active
+    if night is not None:
+        check_in = columns["check_in"]
+        occupied_mask = is_active & (
+            (check_in == 0)
+            | ((check_in <= night) & (night < columns["check_out"]))
+        )
+
+    return (
+        _bincount(hotel[occupied_mask], hotels),
+        _bincount(hotel[is_active], hotels),
+        _bincount(hotel[_matches(status, canceled_code)], hotels),
+        _bincount(customer, len(table.customers)),
+    )
+
+
+def _wrap(column: Any) -> Any:
+    """View an ``array.array`` as a NumPy array without copying."""
+    # array typecodes name the same C types as NumPy's dtype characters.
+    return np.frombuffer(column, dtype=np.dtype(column.typecode))
+
+
+def _matches(column: Any, code: int) -> Any:
+    """Return a boolean mask of ``column == code`` (all False if -1)."""
+    if code < 0:
+        return np.zeros(len(column), dtype=bool)
+    return column == code
+
+
+def _bincount(codes: Any, size: int) -> List[int]:
+    """Count occurrences of each code in [0, size) as a list."""
+    return np.bincount(codes, minlength=size).tolist()
+
+
+def _counts_python(
+    table: ReservationTable, night: Optional[int]
+) -> _Counts:
+    """Pure-Python equivalent of _counts_numpy."""
+    hotels = len(table.hotels)
+    occupied, active, canceled = [0] * hotels, [0] * hotels, [0] * hotels
+    per_customer = [0] * len(table.customers)
+    active_code, canceled_code = _status_codes(table)
+
+    for hotel, customer, status, check_in, check_out in zip(
+        *table.columns().values()
+    ):
+        per_customer[customer] += 1
+        if status == canceled_code:
+            canceled[hotel] += 1
+        elif status == active_code:
+            active[hotel] += 1
+            if night is None or not check_in or (
+                check_in <= night < check_out
+            ):
+                occupied[hotel] += 1
+    return occupied, active, canceled, per_customer
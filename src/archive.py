@@ -0,0 +1,232 @@
+"""Cold storage for reservations that no longer change.
+
+ReservationArchive keeps archived reservations in gzip-compressed JSON
+partitions, one per month (``reservations-2026-10.json.gz``). A record
+goes to the month of its ``check_in``; undated records go to the month
+they were archived in. ``reservations.archive.json`` lists the ids in
+each partition, so a lookup opens only the one partition that holds the
+record, and recently read partitions stay decoded in a small LRU cache.
+
+Archiving is crash-safe when partitions are written before the hot store
+is trimmed (as ReservationService.archive_inactive() does): a record is
+then always in the hot store, the archive, or briefly in both, and
+adding it again just replaces the archived copy.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.durability import replace_file
+from src.locking import FileLock
+
+_MONTH = re.compile(r"^\d{4}-\d{2}")
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ReservationArchive:
+    """Monthly gzip partitions of archived reservation records."""
+
+    def __init__(
+        self,
+        directory: str,
+        name: str = "reservations",
+        cached_partitions: int = 4,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Use ``directory`` for partitions (created on first write)."""
+        self.directory = Path(directory)
+        self.name = name
+        self.cached_partitions = cached_partitions
+        self.clock = clock
+        self.manifest_path = self.directory / f"{name}.archive.json"
+        self.stats = {"partition_reads": 0, "partition_writes": 0}
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(str(self.directory / f".{name}.lock"))
+        self._locations: Dict[str, str] = {}
+        self._manifest_signature: Any = None
+        self._partitions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def partition_for(self, record: Any) -> str:
+        """Return the month ("YYYY-MM") a record is archived under."""
+        check_in = record.get("check_in") if isinstance(record, dict) else None
+        if isinstance(check_in, str) and _MONTH.match(check_in):
+            return check_in[:7]
+        return time.strftime("%Y-%m", time.gmtime(self.clock()))
+
+    def partition_path(self, month: str) -> Path:
+        """Return the file of one monthly partition."""
+        return self.directory / f"{self.name}-{month}.json.gz"
+
+    def add(self, records: Dict[str, Any]) -> int:
+        """Archive ``records`` (id -> record); return how many were written.
+
+        Each touched partition is rewritten durably, then the manifest.
+        A record already archived is replaced, even if it moves month.
+        """
+        if not records:
+            return 0
+        with self._lock, self._file_lock:
+            self._refresh()
+            # None marks a record leaving a partition for another month.
+            groups: Dict[str, Dict[str, Any]] = {}
+            for record_id, record in records.items():
+                month = self.partition_for(record)
+                groups.setdefault(month, {})[record_id] = record
+                previous = self._locations.get(record_id)
+                if previous is not None and previous != month:
+                    groups.setdefault(previous, {})[record_id] = None
+
+            try:
+                for month, group in sorted(groups.items()):
+                    data = self._partition(month)
+                    for record_id, record in group.items():
+                        if record is None:
+                            data.pop(record_id, None)
+                        else:
+                            data[record_id] = record
+                            self._locations[record_id] = month
+                    self._write_partition(month, data)
+                self._write_manifest()
+            except BaseException:
+                # Cached state may be ahead of the files: reload it.
+                self._manifest_signature = None
+                self._partitions.clear()
+                raise
+        return len(records)
+
+    def get(self, record_id: str) -> Optional[Any]:
+        """Return an archived record, opening only its partition."""
+        with self._lock:
+            self._refresh()
+            month = self._locations.get(record_id)
+            if month is None:
+                return None
+            record = self._partition(month).get(record_id)
+        return dict(record) if isinstance(record, dict) else record
+
+    def __contains__(self, record_id: object) -> bool:
+        """Return True if ``record_id`` is archived."""
+        with self._lock:
+            self._refresh()
+            return record_id in self._locations
+
+    def __len__(self) -> int:
+        """Return the number of archived records."""
+        with self._lock:
+            self._refresh()
+            return len(self._locations)
+
+    def partitions(self) -> List[str]:
+        """Return the archived months, oldest first."""
+        with self._lock:
+            self._refresh()
+            return sorted(set(self._locations.values()))
+
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Yield every archived (id, record), one partition at a time."""
+        for month in self.partitions():
+            with self._lock:
+                data = dict(self._partition(month))
+            yield from data.items()
+
+    def _refresh(self) -> None:
+        """Reload the manifest if another writer changed it (lock held)."""
+        try:
+            stat = os.stat(self.manifest_path)
+        except OSError:
+            self._locations = {}
+            self._manifest_signature = None
+            return
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._manifest_signature:
+            return
+        try:
+            manifest = json.loads(self.manifest_path.read_bytes())
+            self._locations = {
+                record_id: month
+                for month, ids in manifest["partitions"].items()
+                for record_id in ids
+            }
+        except (OSError, ValueError, KeyError, TypeError,
+                AttributeError) as exc:
+            print(f"[WARN] Could not load {self.manifest_path}: {exc}.")
+            self._locations = {}
+        self._manifest_signature = signature
+        self._partitions.clear()
+
+    def _partition(self, month: str) -> Dict[str, Any]:
+        """Return one partition's records, via the LRU cache (lock held)."""
+        data = self._partitions.get(month)
+        if data is not None:
+            self._partitions.move_to_end(month)
+            return data
+        path = self.partition_path(month)
+        data = {}
+        if path.exists():
+            try:
+                data = json.loads(gzip.decompress(path.read_bytes()))
+                self.stats["partition_reads"] += 1
+            except (OSError, ValueError) as exc:
+                print(f"[WARN] Could not read {path}: {exc}.")
+                data = {}
+        self._cache(month, data)
+        return data
+
+    def _cache(self, month: str, data: Dict[str, Any]) -> None:
+        """Keep a decoded partition, evicting the least recently used."""
+        self._partitions[month] = data
+        self._partitions.move_to_end(month)
+        while len(self._partitions) > self.cached_partitions:
+            self._partitions.popitem(last=False)
+
+    def _write_partition(self, month: str, data: Dict[str, Any]) -> None:
+        """Durably replace one partition file (lock held)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        replace_file(self.partition_path(month),
+                     gzip.compress(payload, mtime=0))
+        self.stats["partition_writes"] += 1
+        self._cache(month, data)
+
+    def _write_manifest(self) -> None:
+        """Durably replace the manifest with the current locations."""
+        partitions: Dict[str, List[str]] = {}
+        for record_id, month in self._locations.items():
+            partitions.setdefault(month, []).append(record_id)
+        payload = json.dumps({"partitions": partitions}).encode("utf-8")
+        replace_file(self.manifest_path, payload)
+        stat = os.stat(self.manifest_path)
+        self._manifest_signature = (
+            stat.st_mtime_ns, stat.st_size, stat.st_ino
+        )
+
+
+def archivable(
+    record: Any, include_completed: bool = False, today: str = ""
+) -> bool:
+    """Return True if a reservation record can move to the archive.
+
+    Canceled reservations always can; with ``include_completed`` so can
+    active dated ones whose ``check_out`` is on or before ``today`` (an
+    ISO date).
+    """
+    if not isinstance(record, dict):
+        return False
+    if record.get("status") == "CANCELED":
+        return True
+    check_out = record.get("check_out")
+    return (
+        include_completed
+        and record.get("status") == "ACTIVE"
+        and isinstance(check_out, str)
+        and check_out <= today
+    )
@@ -0,0 +1,249 @@
+"""asyncio facade over the hotel, customer and reservation services.
+
+Blocking file I/O and JSON parsing run on a bounded thread pool, so the
+event loop never waits on storage. Concurrent reads of the same store (or
+the same record, for stores with cheap point reads) are coalesced into a
+single in-flight call whose result is shared by every waiter. Writes
+bump a per-store epoch when they finish, and reads only join loads of
+the current epoch, so a read issued after a write never gets data that
+was loaded before it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from src.models import Customer, Hotel, Reservation
+from src.services import (
+    ItemResult,
+    ReservationService,
+    UpdateResult,
+    _build,
+)
+from src.storage import _copy_records
+
+
+class AsyncRunner:
+    """Bounded executor with single-flight coalescing of reads."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """Create the worker pool."""
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="store-io"
+        )
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._epochs: Dict[int, int] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool and await its result."""
+        loop = asyncio.get_running_loop()
+        self.stats["calls"] += 1
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def write(
+        self, stores: Iterable[Any], func: Callable, *args, **kwargs
+    ) -> Any:
+        """Run a blocking write; later reads of ``stores`` load afresh."""
+        try:
+            return await self.call(func, *args, **kwargs)
+        finally:
+            for store in stores:
+                self._epochs[id(store)] = self._epochs.get(id(store), 0) + 1
+
+    async def shared(self, key: Hashable, func: Callable, *args) -> Any:
+        """Run ``func`` once for all concurrent callers using ``key``."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self.call(func, *args))
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def load(self, store: Any) -> Dict[str, Any]:
+        """Load a store; callers share the result and must not mutate it."""
+        return await self.shared(
+            ("load", id(store), self._epochs.get(id(store), 0)), store.load
+        )
+
+    async def get_record(self, store: Any, key: str) -> Optional[Any]:
+        """Read one record, coalescing duplicate lookups."""
+        if getattr(store, "point_reads", False):
+            return await self.shared(
+                ("get", id(store), self._epochs.get(id(store), 0), key),
+                store.get_record,
+                key,
+            )
+        return (await self.load(store)).get(key)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        self.executor.shutdown(wait=True)
+
+
+class _AsyncRecordService:
+    """Async wrapper shared by the hotel and customer services.
+
+    Wraps a HotelService or CustomerService instance.
+    """
+
+    def __init__(self, service: Any, runner: AsyncRunner) -> None:
+        self.service = service
+        self.runner = runner
+
+    async def _write(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a write to the service's store."""
+        return await self.runner.write(
+            [self.service.store], func, *args, **kwargs
+        )
+
+    async def _get(self, item_id: str) -> Optional[Any]:
+        """Return a model by id, or None if not found/invalid."""
+        record = await self.runner.get_record(self.service.store, item_id)
+        if isinstance(record, dict):
+            record = dict(record)
+        return _build(self.service.model, record, self.service.label)
+
+    async def list_all(self) -> Dict[str, dict]:
+        """Return all records as a dict."""
+        return _copy_records(await self.runner.load(self.service.store))
+
+    async def update(self, item_id: str, **changes) -> bool:
+        """Update an existing record with partial changes."""
+        return await self._write(self.service.update, item_id, **changes)
+
+    async def compare_and_set(
+        self, item_id: str, expected_version: Optional[int], **changes
+    ) -> UpdateResult:
+        """Apply changes only if the record is at expected_version."""
+        return await self._write(
+            self.service.compare_and_set, item_id, expected_version, **changes
+        )
+
+    async def delete(self, item_id: str) -> bool:
+        """Delete a record by id."""
+        return await self._write(self.service.delete, item_id)
+
+    async def create_many(self, items: Iterable[Any]) -> List[ItemResult]:
+        """Create several records with one load and one save."""
+        return await self._write(self.service.create_many, list(items))
+
+
+class AsyncHotelService(_AsyncRecordService):
+    """Async facade for HotelService."""
+
+    async def create(
+        self, hotel: Hotel, idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Create a new hotel if it doesn't exist and values are valid."""
+        return await self._write(
+            self.service.create, hotel, idempotency_key
+        )
+
+    async def get(self, hotel_id: str) -> Optional[Hotel]:
+        """Return a Hotel by id, or None if not found/invalid."""
+        return await self._get(hotel_id)
+
+
+class AsyncCustomerService(_AsyncRecordService):
+    """Async facade for CustomerService."""
+
+    async def create(
+        self, customer: Customer, idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Create a new customer if it doesn't exist."""
+        return await self._write(
+            self.service.create, customer, idempotency_key
+        )
+
+    async def get(self, customer_id: str) -> Optional[Customer]:
+        """Return a Customer by id, or None if not found/invalid."""
+        return await self._get(customer_id)
+
+
+class AsyncReservationService:
+    """Async facade for ReservationService."""
+
+    def __init__(
+        self, service: ReservationService, runner: AsyncRunner
+    ) -> None:
+        self.service = service
+        self.runner = runner
+
+    async def _write(self, func: Callable, *args) -> Any:
+        """Run a write to the reservation and hotel stores."""
+        return await self.runner.write(
+            [self.service.store, self.service.hotels.store], func, *args
+        )
+
+    async def create(
+        self, reservation: Reservation, idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Create a reservation if ids exist and rooms are available."""
+        return await self._write(
+            self.service.create, reservation, idempotency_key
+        )
+
+    async def cancel(self, reservation_id: str) -> bool:
+        """Cancel a reservation and release its room."""
+        return await self._write(self.service.cancel, reservation_id)
+
+    async def create_many(
+        self, reservations: Iterable[Reservation]
+    ) -> List[ItemResult]:
+        """Book several reservations in a single transaction."""
+        return await self._write(
+            self.service.create_many, list(reservations)
+        )
+
+    async def cancel_many(
+        self, reservation_ids: Iterable[str]
+    ) -> List[ItemResult]:
+        """Cancel several reservations in a single transaction."""
+        return await self._write(
+            self.service.cancel_many, list(reservation_ids)
+        )
+
+    async def get(self, reservation_id: str) -> Optional[Reservation]:
+        """Return a Reservation by id, or None if not found/invalid."""
+        record = await self.runner.get_record(
+            self.service.store, reservation_id
+        )
+        if record is None and self.service.archive is not None:
+            record = await self.runner.call(
+                self.service.archive.get, reservation_id
+            )
+        if isinstance(record, dict):
+            record = dict(record)
+        return _build(Reservation, record, "Reservation")
+
+    async def list_all(self) -> Dict[str, dict]:
+        """Return all reservations as a dict."""
+        return _copy_records(await self.runner.load(self.service.store))
+
+    async def find_by_hotel(
+        self, hotel_id: str, status: Optional[str] = None
+    ) -> List[str]:
+        """Return reservation ids for a hotel, optionally by status."""
+        return await self.runner.call(
+            self.service.find_by_hotel, hotel_id, status
+        )
+
+    async def find_by_customer(
+        self, customer_id: str, status: Optional[str] = None
+    ) -> List[str]:
+        """Return reservation ids for a customer, optionally by status."""
+        return await self.runner.call(
+            self.service.find_by_customer, customer_id, status
+        )
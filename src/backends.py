@@ -0,0 +1,144 @@
+"""Storage backend selection from configuration.
+
+Small deployments stay on the JSON files; larger ones can switch to the
+journal or SQLite backends without touching the services. The backend is
+read from a JSON config file or the ``RESERVATION_BACKEND`` environment
+variable.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.archive import ReservationArchive
+from src.idempotency import IdempotencyCache
+from src.journal import JournalStore
+from src.ledger import EventLedger
+from src.locking import LockManager
+from src.offset_index import IndexedFileStore
+from src.services import CustomerService, HotelService, ReservationService
+from src.sharding import ShardedStore
+from src.sqlite_store import SQLiteDatabase
+from src.storage import FileStore
+
+COLLECTIONS = ("hotels", "customers", "reservations")
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "backend": "json",
+    "data_dir": "data",
+    "cache": False,
+    "codec": "json",
+    "durability": "none",
+    "group_window": 0.002,
+    "offset_index": False,
+    "unique_email": False,
+    "archive_dir": None,
+    "sqlite_path": None,
+    "shards": None,
+    "ledger_dir": None,
+    "idempotency_path": None,
+    "lock_dir": None,
+}
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Return the storage config, falling back to defaults on error."""
+    config = dict(DEFAULT_CONFIG)
+    if path is not None and Path(path).exists():
+        try:
+            loaded = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Could not load {path}: {exc}. Using defaults.")
+            loaded = {}
+        if isinstance(loaded, dict):
+            config.update(loaded)
+
+    env_backend = os.environ.get("RESERVATION_BACKEND")
+    if env_backend:
+        config["backend"] = env_backend
+    return config
+
+
+def open_stores(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Open one store per collection for the configured backend."""
+    backend = config.get("backend", "json")
+    data_dir = Path(config.get("data_dir", "data"))
+
+    if backend == "json":
+        store_class = (
+            IndexedFileStore if config.get("offset_index") else FileStore
+        )
+        return {
+            name: store_class(
+                str(data_dir / f"{name}.json"),
+                cache=bool(config.get("cache")),
+                codec=config.get("codec", "json"),
+                durability=config.get("durability", "none"),
+                group_window=float(config.get("group_window", 0.002)),
+            )
+            for name in COLLECTIONS
+        }
+    if backend == "journal":
+        return {
+            name: JournalStore(str(data_dir / f"{name}.json"))
+            for name in COLLECTIONS
+        }
+    if backend == "sqlite":
+        db_path = config.get("sqlite_path") or data_dir / "reservations.db"
+        database = SQLiteDatabase(str(db_path))
+        return {name: database.store(name) for name in COLLECTIONS}
+
+    if backend == "sharded":
+        return {
+            name: ShardedStore(
+                str(data_dir),
+                name,
+                shards=config.get("shards"),
+                cache=bool(config.get("cache")),
+                codec=config.get("codec", "json"),
+            )
+            for name in COLLECTIONS
+        }
+
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+def build_services(
+    config: Dict[str, Any]
+) -> Tuple[HotelService, CustomerService, ReservationService]:
+    """Wire the three services on top of the configured backend.
+
+    With ``ledger_dir`` set, booking and hotel changes are also appended
+    to an EventLedger in that directory. With ``idempotency_path`` set,
+    create() accepts idempotency keys recorded in that file. With
+    ``lock_dir`` set, a LockManager there guards bookings and whole-file
+    writes, so the services can be shared by threads and processes. With
+    ``archive_dir`` set, reservations can be archived there.
+    """
+    stores = open_stores(config)
+    ledger_dir = config.get("ledger_dir")
+    ledger = EventLedger(ledger_dir) if ledger_dir else None
+    idempotency_path = config.get("idempotency_path")
+    idempotency = (
+        IdempotencyCache(idempotency_path) if idempotency_path else None
+    )
+    hotel_service = HotelService(
+        stores["hotels"], ledger=ledger, idempotency=idempotency
+    )
+    customer_service = CustomerService(
+        stores["customers"],
+        idempotency=idempotency,
+        unique_email=bool(config.get("unique_email")),
+    )
+    lock_dir = config.get("lock_dir")
+    archive_dir = config.get("archive_dir")
+    reservation_service = ReservationService(
+        stores["reservations"], hotel_service, customer_service,
+        locks=LockManager(lock_dir) if lock_dir else None,
+        ledger=ledger, idempotency=idempotency,
+        archive=ReservationArchive(archive_dir) if archive_dir else None,
+    )
+    return hotel_service, customer_service, reservation_service
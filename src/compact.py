@@ -0,0 +1,272 @@
+"""Compact, columnar in-memory representation of reservations.
+
+A dict of dicts costs several hundred bytes per reservation. The
+ReservationTable keeps one entry per column instead: hotel and customer
+ids are interned into integer codes held in ``array`` columns, the
+status is stored as a one-byte code and stay dates as day ordinals (0 for
+an undated reservation). Rows convert to and from the
+Reservation dataclass on demand.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import asdict
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.models import Reservation
+
+# Status codes pre-registered so the common values are stable.
+STATUSES = ("ACTIVE", "CANCELED")
+
+
+class Interner:
+    """Two-way mapping between strings and small integer codes."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        """Create an interner, pre-registering ``values`` in order."""
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        """Return the number of distinct values."""
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        """Return the code for ``value``, assigning one if new."""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def find(self, value: str) -> Optional[int]:
+        """Return the code for ``value`` without assigning one."""
+        return self.codes.get(value)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ReservationTable:
+    """Array-backed table of reservations keyed by reservation id."""
+
+    def __init__(self, reservations: Iterable[Reservation] = ()) -> None:
+        """Create a table, optionally filled from dataclasses."""
+        self.hotels = Interner()
+        self.customers = Interner()
+        self.statuses = Interner(STATUSES)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._hotel = array("I")
+        self._customer = array("I")
+        self._status = array("B")
+        self._check_in = array("l")
+        self._check_out = array("l")
+        for reservation in reservations:
+            self.add(reservation)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Tuple[str, Any]]
+    ) -> "ReservationTable":
+        """Build a table from (id, record) pairs, e.g. iter_records().
+
+        Records that are not valid reservations are skipped.
+        """
+        table = cls()
+        for _, record in records:
+            if not isinstance(record, dict):
+                continue
+            try:
+                table.add(Reservation(**record))
+            except (TypeError, ValueError):
+                continue
+        return table
+
+    def __len__(self) -> int:
+        """Return the number of reservations."""
+        return len(self._ids)
+
+    def __contains__(self, reservation_id: object) -> bool:
+        """Return True if the reservation id is present."""
+        return reservation_id in self._rows
+
+    def __iter__(self) -> Iterator[Reservation]:
+        """Yield every reservation as a dataclass."""
+        for row in range(len(self._ids)):
+            yield self._build(row)
+
+    def add(self, reservation: Reservation) -> None:
+        """Insert a reservation, replacing any row with the same id."""
+        hotel = self.hotels.code(reservation.hotel_id)
+        customer = self.customers.code(reservation.customer_id)
+        status = self._status_code(reservation.status)
+        check_in = _to_ordinal(reservation.check_in)
+        check_out = _to_ordinal(reservation.check_out)
+
+        row = self._rows.get(reservation.reservation_id)
+        if row is None:
+            self._rows[reservation.reservation_id] = len(self._ids)
+            self._ids.append(sys.intern(reservation.reservation_id))
+            self._hotel.append(hotel)
+            self._customer.append(customer)
+            self._status.append(status)
+            self._check_in.append(check_in)
+            self._check_out.append(check_out)
+        else:
+            self._hotel[row] = hotel
+            self._customer[row] = customer
+            self._status[row] = status
+            self._check_in[row] = check_in
+            self._check_out[row] = check_out
+
+    def get(self, reservation_id: str) -> Optional[Reservation]:
+        """Return one reservation as a dataclass, or None if missing."""
+        row = self._rows.get(reservation_id)
+        return None if row is None else self._build(row)
+
+    def remove(self, reservation_id: str) -> bool:
+        """Delete a reservation; return False if it was not present.
+
+        The last row is moved into the hole, so row order is not stable.
+        """
+        row = self._rows.pop(reservation_id, None)
+        if row is None:
+            return False
+
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._hotel[row] = self._hotel[last]
+            self._customer[row] = self._customer[last]
+            self._status[row] = self._status[last]
+            self._check_in[row] = self._check_in[last]
+            self._check_out[row] = self._check_out[last]
+            self._rows[moved] = row
+        self._ids.pop()
+        self._hotel.pop()
+        self._customer.pop()
+        self._status.pop()
+        self._check_in.pop()
+        self._check_out.pop()
+        return True
+
+    def set_status(self, reservation_id: str, status: str) -> bool:
+        """Change a reservation's status; return False if missing."""
+        row = self._rows.get(reservation_id)
+        if row is None:
+            return False
+        self._status[row] = self._status_code(status)
+        return True
+
+    def ids_where(
+        self,
+        hotel_id: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[str]:
+        """Return ids matching every given column value (a column scan)."""
+        wanted = []
+        for column, interner, value in (
+            (self._hotel, self.hotels, hotel_id),
+            (self._customer, self.customers, customer_id),
+            (self._status, self.statuses, status),
+        ):
+            if value is None:
+                continue
+            code = interner.find(value)
+            if code is None:
+                return []
+            wanted.append((column, code))
+
+        return [
+            reservation_id
+            for row, reservation_id in enumerate(self._ids)
+            if all(column[row] == code for column, code in wanted)
+        ]
+
+    def columns(self) -> Dict[str, array]:
+        """Return the raw code columns (shared, do not mutate).
+
+        ``hotel``/``customer``/``status`` hold codes into the matching
+        interner; ``check_in``/``check_out`` hold day ordinals. The arrays
+        support the buffer protocol, so numpy.frombuffer can wrap them
+        without copying.
+        """
+        return {
+            "hotel": self._hotel,
+            "customer": self._customer,
+            "status": self._status,
+            "check_in": self._check_in,
+            "check_out": self._check_out,
+        }
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Return the number of reservations per status."""
+        counts = [0] * len(self.statuses)
+        for code in self._status:
+            counts[code] += 1
+        return {
+            status: count
+            for status, count in zip(self.statuses.values, counts)
+            if count
+        }
+
+    def to_records(self) -> Dict[str, dict]:
+        """Return the table as the dict-of-dicts the stores persist."""
+        return {
+            reservation.reservation_id: asdict(reservation)
+            for reservation in self
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and id lookups."""
+        columns = sum(
+            column.itemsize * len(column)
+            for column in (
+                self._hotel,
+                self._customer,
+                self._status,
+                self._check_in,
+                self._check_out,
+            )
+        )
+        return (
+            columns
+            + sys.getsizeof(self._ids)
+            + sys.getsizeof(self._rows)
+            + sum(sys.getsizeof(value) for value in self._ids)
+        )
+
+    def _status_code(self, status: str) -> int:
+        """Return the one-byte code for ``status``."""
+        if self.statuses.find(status) is None and len(self.statuses) > 0xFF:
+            raise ValueError("too many distinct reservation statuses")
+        return self.statuses.code(status)
+
+    def _build(self, row: int) -> Reservation:
+        """Materialize one row as a Reservation."""
+        return Reservation(
+            self._ids[row],
+            self.hotels.values[self._hotel[row]],
+            self.customers.values[self._customer[row]],
+            self.statuses.values[self._status[row]],
+            _from_ordinal(self._check_in[row]),
+            _from_ordinal(self._check_out[row]),
+        )
+
+
+def _to_ordinal(value: Optional[str]) -> int:
+    """Encode an ISO date as a day ordinal (0 when missing)."""
+    return 0 if value is None else date.fromisoformat(value).toordinal()
+
+
+def _from_ordinal(value: int) -> Optional[str]:
+    """Decode a day ordinal back to an ISO date (None for 0)."""
+    return None if value == 0 else date.fromordinal(value).isoformat()
@@ -0,0 +1,180 @@
+"""Durable file replacement, group commit and commit-latency stats.
+
+replace_file() writes a new version of a file next to it and renames it
+into place, so a crash leaves either the old or the new contents, never
+a truncated file. With ``sync`` the data is fsynced before the rename and
+the directory after it, so the new version also survives a power loss.
+
+GroupSync lets many writers share one durable write: each writer stages
+its change in memory and waits; one of them (the leader) waits a short
+window for others, then flushes everything staged so far at once.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, Tuple
+
+# "none" (FileStore's default): atomic rename without fsync; "fsync":
+# every save is durable when it returns; "group": concurrent saves share
+# one durable write.
+DURABILITY_LEVELS = ("none", "fsync", "group")
+
+
+def fsync_write(path: Path, payload: bytes) -> None:
+    """Write payload to path and flush it to disk."""
+    with path.open("wb") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def fsync_directory(path: Path) -> None:
+    """Flush a directory entry change (a rename) to disk, if supported."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - platforms without directory fds
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:  # pragma: no cover - e.g. filesystems refusing it
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def replace_file(path: Path, payload: bytes, sync: bool = True) -> None:
+    """Atomically replace ``path`` with ``payload``.
+
+    The temporary file is removed again if anything fails.
+    """
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        if sync:
+            fsync_write(tmp_path, payload)
+        else:
+            tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if sync:
+        fsync_directory(path.parent)
+
+
+class LatencyStats:
+    """Thread-safe commit counts and latencies over recent samples."""
+
+    def __init__(self, window: int = 4096) -> None:
+        """Keep the last ``window`` latencies for percentiles."""
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one commit latency."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return count, mean, p50, p99 and max (in milliseconds)."""
+        with self._lock:
+            ordered = sorted(self._samples)
+            count, total, largest = self._count, self._total, self._max
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            index = min(len(ordered) - 1, int(fraction * len(ordered)))
+            return ordered[index] * 1000
+
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000 if count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": largest * 1000,
+        }
+
+
+# pylint: disable-next=too-many-instance-attributes
+class GroupSync:
+    """Sequence-numbered staging with a shared flush.
+
+    ``flush`` must write everything staged so far. stage() returns a
+    sequence number; wait(seq) returns once a flush that started after
+    that stage has finished, and raises that flush's exception if it
+    failed. ``flushes`` counts the durable writes.
+    """
+
+    def __init__(self, flush: Callable[[], None], window: float) -> None:
+        """Create a group around ``flush``, waiting ``window`` seconds."""
+        self.flush = flush
+        self.window = window
+        self.flushes = 0
+        self._cond = threading.Condition()
+        self._staged = 0
+        self._settled = 0
+        self._flushing = False
+        # (after, through, error): stages in (after, through] were lost.
+        self._failures: Deque[Tuple[int, int, Exception]] = deque(
+            maxlen=64
+        )
+
+    @property
+    def staged(self) -> int:
+        """Sequence number of the latest staged change."""
+        return self._staged
+
+    def stage(self) -> int:
+        """Return the sequence number of a change just made in memory."""
+        with self._cond:
+            self._staged += 1
+            return self._staged
+
+    def wait(self, seq: int) -> None:
+        """Block until change ``seq`` has been flushed.
+
+        Every waiter of a failed flush gets its exception.
+        """
+        while True:
+            with self._cond:
+                while self._flushing and self._settled < seq:
+                    self._cond.wait()
+                if self._settled >= seq:
+                    for after, through, error in self._failures:
+                        if after < seq <= through:
+                            raise error
+                    return
+                self._flushing = True
+                after = self._settled
+            try:
+                if self.window > 0:
+                    time.sleep(self.window)
+                with self._cond:
+                    target = self._staged
+                try:
+                    self.flush()
+                # pylint: disable-next=broad-exception-caught
+                except Exception as exc:
+                    with self._cond:
+                        self._failures.append((after, target, exc))
+                else:
+                    with self._cond:
+                        self.flushes += 1
+                with self._cond:
+                    self._settled = max(self._settled, target)
+            finally:
+                with self._cond:
+                    self._flushing = False
+                    self._cond.notify_all()
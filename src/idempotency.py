@@ -0,0 +1,233 @@
+"""Idempotency keys for retried create calls.
+
+A client that retries a timed-out create sends the same idempotency key;
+IdempotencyCache returns the result recorded for that key instead of
+running the operation again, so a retry neither double-books nor reads
+the stores.
+
+Entries are kept in LRU order, bounded by ``capacity`` and expire after
+``ttl`` seconds. With a ``path`` each new entry is appended as a JSON line
+(and fsynced) so results survive restarts; the file is rewritten with the
+live entries once it holds twice ``capacity`` lines.
+
+Each entry also stores a fingerprint of the request. Reusing a key for a
+different request raises IdempotencyConflict.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.durability import replace_file
+
+_MISSING = object()
+
+
+class IdempotencyConflict(ValueError):
+    """Raised when a key is reused for a different request."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__(f"idempotency key {key!r} was used for another "
+                         f"request")
+        self.key = key
+
+
+def fingerprint(payload: Any) -> str:
+    """Return a short stable digest of a JSON-serializable request."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _line(key: str, entry: Tuple[float, str, Any]) -> str:
+    """Return the JSON line persisting one entry."""
+    stored_at, request, result = entry
+    record = {"key": key, "at": stored_at, "request": request,
+              "result": result}
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+# pylint: disable-next=too-many-instance-attributes
+class IdempotencyCache:
+    """Bounded LRU/TTL map from idempotency keys to recorded results.
+
+    Concurrent calls with the same key run the operation once; the others
+    wait for it and receive its result. Results must be JSON-serializable
+    when the cache is persisted. Exceptions are not recorded, so a call
+    that raised can be retried.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 10000,
+        ttl: float = 24 * 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Create the cache, replaying ``path`` if it exists."""
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.path = Path(path) if path is not None else None
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[float, str, Any]] = (
+            OrderedDict()
+        )
+        self._pending: Dict[str, threading.Event] = {}
+        self._lines = 0
+        if self.path is not None:
+            self._replay()
+
+    def __len__(self) -> int:
+        """Return the number of live (possibly expired) entries."""
+        return len(self._entries)
+
+    def get(self, key: str, request: str = "") -> Any:
+        """Return the recorded result for ``key``, or None if unknown.
+
+        Raises IdempotencyConflict if ``request`` (a fingerprint) differs
+        from the one recorded.
+        """
+        with self._lock:
+            found = self._lookup(key, request)
+        return None if found is _MISSING else found
+
+    def run(
+        self, key: str, operation: Callable[[], Any], request: str = ""
+    ) -> Any:
+        """Return the result recorded for ``key``, running it once if new.
+
+        ``request`` is a fingerprint of the call; a retry must send the
+        same one. Raises IdempotencyConflict otherwise.
+        """
+        while True:
+            with self._lock:
+                found = self._lookup(key, request)
+                if found is not _MISSING:
+                    self.stats["hits"] += 1
+                    return found
+                waiter = self._pending.get(key)
+                if waiter is None:
+                    self.stats["misses"] += 1
+                    waiter = self._pending[key] = threading.Event()
+                    break
+            waiter.wait()
+
+        try:
+            result = operation()
+            self._store(key, request, result)
+            return result
+        finally:
+            with self._lock:
+                del self._pending[key]
+            waiter.set()
+
+    def compact(self) -> None:
+        """Rewrite the file with only the live entries."""
+        with self._lock:
+            self._purge()
+            self._rewrite()
+
+    def _lookup(self, key: str, request: str) -> Any:
+        """Return the live result for ``key`` or _MISSING (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        stored_at, recorded, result = entry
+        if self.clock() - stored_at >= self.ttl:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            return _MISSING
+        if recorded != request:
+            raise IdempotencyConflict(key)
+        self._entries.move_to_end(key)
+        return result
+
+    def _store(self, key: str, request: str, result: Any) -> None:
+        """Record a result and append it to the file."""
+        stored_at = self.clock()
+        with self._lock:
+            self._remember(key, (stored_at, request, result))
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as handle:
+                    handle.write(_line(key, self._entries[key]))
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            except OSError as exc:
+                print(f"[WARN] Could not persist idempotency key: {exc}.")
+                return
+            self._lines += 1
+            if self._lines >= 2 * self.capacity:
+                self._purge()
+                self._rewrite()
+
+    def _remember(self, key: str, entry: Tuple[float, str, Any]) -> None:
+        """Insert an entry, evicting the least recently used past capacity."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def _purge(self) -> None:
+        """Drop expired entries (lock held)."""
+        now = self.clock()
+        for key in [
+            key for key, (stored_at, _, _) in self._entries.items()
+            if now - stored_at >= self.ttl
+        ]:
+            del self._entries[key]
+            self.stats["expired"] += 1
+
+    def _replay(self) -> None:
+        """Load persisted entries, skipping corrupt or expired lines."""
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open(encoding="utf-8") as handle:
+                for line in handle:
+                    self._lines += 1
+                    try:
+                        entry = json.loads(line)
+                        self._remember(entry["key"], (
+                            float(entry["at"]),
+                            entry.get("request", ""),
+                            entry.get("result"),
+                        ))
+                    except (ValueError, KeyError, TypeError):
+                        print(f"[WARN] Skipping corrupt idempotency entry "
+                              f"in {self.path}.")
+        except OSError as exc:
+            print(f"[WARN] Could not load {self.path}: {exc}.")
+            return
+        self._purge()
+        if self._lines > len(self._entries):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """Replace the file with the current entries (lock held)."""
+        if self.path is None:
+            return
+        payload = "".join(
+            _line(key, entry) for key, entry in self._entries.items()
+        )
+        try:
+            replace_file(self.path, payload.encode("utf-8"))
+        except OSError as exc:
+            print(f"[WARN] Could not rewrite {self.path}: {exc}.")
+            return
+        self._lines = len(self._entries)
@@ -0,0 +1,240 @@
+"""In-memory secondary indexes over stored records.
+
+Indexes are rebuilt from a full scan when the underlying store changes
+outside the owning service, and updated record by record otherwise.
+SecondaryIndex answers equality lookups; SortedIndex keeps one field in
+order for range, prefix and paginated scans.
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+Records = Union[Mapping[str, Any], Iterable[Tuple[str, Any]]]
+
+# Change sets larger than this are merged into a SortedIndex in one pass
+# instead of one insort each.
+_BULK_CHANGES = 16
+
+
+class SecondaryIndex:
+    """Hash index from field values to record ids."""
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        """Create an empty index over ``fields``."""
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[Any, Set[str]]] = {
+            field: {} for field in self.fields
+        }
+        self._values: Dict[str, Tuple[Any, ...]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed records."""
+        return len(self._values)
+
+    def rebuild(self, records: Records) -> None:
+        """Drop everything and index ``records`` (a dict or pairs)."""
+        for postings in self._postings.values():
+            postings.clear()
+        self._values.clear()
+        if isinstance(records, Mapping):
+            records = records.items()
+        for record_id, record in records:
+            self.add(record_id, record)
+
+    def add(self, record_id: str, record: Any) -> None:
+        """Index (or re-index) one record; non-dict records are skipped."""
+        self.remove(record_id)
+        if not isinstance(record, dict):
+            return
+
+        values = tuple(record.get(field) for field in self.fields)
+        for field, value in zip(self.fields, values):
+            if _hashable(value):
+                self._postings[field].setdefault(value, set()).add(record_id)
+        self._values[record_id] = values
+
+    def remove(self, record_id: str) -> None:
+        """Remove one record from the index if present."""
+        values = self._values.pop(record_id, None)
+        if values is None:
+            return
+
+        for field, value in zip(self.fields, values):
+            if not _hashable(value):
+                continue
+            ids = self._postings[field].get(value)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._postings[field][value]
+
+    def lookup(self, field: str, value: Any) -> Set[str]:
+        """Return the ids whose ``field`` equals ``value`` (do not mutate)."""
+        return self._postings[field].get(value, set())
+
+    def count(self, field: str, value: Any) -> int:
+        """Return how many records have ``field`` equal to ``value``."""
+        return len(self.lookup(field, value))
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """Return a key that orders mixed-type field values consistently.
+
+    None sorts first, then numbers, then strings, then anything else by
+    its repr.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (bool, int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, repr(value))
+
+
+def prefix_end(prefix: str) -> Optional[str]:
+    """Return the smallest string greater than every ``prefix`` match."""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class SortedIndex:
+    """Records ordered by one field, for range scans and pagination.
+
+    Entries are (sort_key(value), record_id) pairs in a sorted list, so
+    positioning a scan costs O(log N) and each step O(1). Inserts and
+    removals shift the list (a fast memmove) after an O(log N) search;
+    large change sets go through apply(), which merges them in one pass.
+    """
+
+    def __init__(self, field: str) -> None:
+        """Create an empty index on ``field``."""
+        self.field = field
+        self._entries: List[Tuple[Tuple[int, Any], str]] = []
+        self._keys: Dict[str, Tuple[int, Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed records."""
+        return len(self._entries)
+
+    def rebuild(self, records: Records) -> None:
+        """Drop everything and index ``records`` (a dict or pairs)."""
+        if isinstance(records, Mapping):
+            records = records.items()
+        self._keys = {
+            record_id: sort_key(record.get(self.field))
+            for record_id, record in records
+            if isinstance(record, dict)
+        }
+        self._entries = sorted(
+            (key, record_id) for record_id, key in self._keys.items()
+        )
+
+    def add(self, record_id: str, record: Any) -> None:
+        """Index (or re-index) one record; non-dict records are skipped."""
+        self.remove(record_id)
+        if not isinstance(record, dict):
+            return
+        key = sort_key(record.get(self.field))
+        bisect.insort(self._entries, (key, record_id))
+        self._keys[record_id] = key
+
+    def apply(self, changes: Mapping[str, Any]) -> None:
+        """Fold {record_id: record} changes in; non-dicts are removed.
+
+        Small change sets are applied one by one; larger ones filter the
+        entries once and merge the new ones in a single sort.
+        """
+        if len(changes) <= _BULK_CHANGES:
+            for record_id, record in changes.items():
+                self.add(record_id, record)
+            return
+        for record_id in changes:
+            self._keys.pop(record_id, None)
+        entries = [entry for entry in self._entries if entry[1] not in changes]
+        added = []
+        for record_id, record in changes.items():
+            if isinstance(record, dict):
+                key = sort_key(record.get(self.field))
+                self._keys[record_id] = key
+                added.append((key, record_id))
+        added.sort()
+        # Two sorted runs: the sort merges them in linear time.
+        entries.extend(added)
+        entries.sort()
+        self._entries = entries
+
+    def remove(self, record_id: str) -> None:
+        """Remove one record from the index if present."""
+        key = self._keys.pop(record_id, None)
+        if key is None:
+            return
+        position = bisect.bisect_left(self._entries, (key, record_id))
+        del self._entries[position]
+
+    def scan(
+        self,
+        low: Optional[Tuple[Any, bool]] = None,
+        high: Optional[Tuple[Any, bool]] = None,
+        after: Optional[Tuple[Any, str]] = None,
+        descending: bool = False,
+    ) -> Iterator[str]:
+        """Yield record ids in field order within the given bounds.
+
+        ``low``/``high`` are (value, inclusive) pairs. ``after`` is the
+        (value, record_id) of the last item already returned; the scan
+        resumes just past it in the scan direction.
+        """
+        start, end = 0, len(self._entries)
+        if low is not None:
+            key = sort_key(low[0])
+            find = bisect.bisect_left if low[1] else bisect.bisect_right
+            start = find(self._entries, key, key=_first)
+        if high is not None:
+            key = sort_key(high[0])
+            find = bisect.bisect_right if high[1] else bisect.bisect_left
+            end = find(self._entries, key, key=_first)
+        if after is not None:
+            entry = (sort_key(after[0]), after[1])
+            if descending:
+                end = min(end, bisect.bisect_left(self._entries, entry))
+            else:
+                start = max(start, bisect.bisect_right(self._entries, entry))
+
+        positions = (
+            range(end - 1, start - 1, -1) if descending
+            else range(start, end)
+        )
+        for position in positions:
+            yield self._entries[position][1]
+
+
+def _first(entry: Tuple[Any, str]) -> Any:
+    """Return the sort key of an index entry."""
+    return entry[0]
+
+
+def _hashable(value: Any) -> bool:
+    """Return True if ``value`` can be used as a dict key."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
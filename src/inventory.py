@@ -0,0 +1,131 @@
+"""Per-night room inventory for dated reservations.
+
+RoomNights is a sparse segment tree over day ordinals with lazy range
+additions, so booking a stay and asking for the busiest night of a range
+both take O(log D) time, where D is the size of the date domain. Only
+the nodes touched by bookings are allocated. Capacity is supplied at
+query time, so changing a hotel's ``rooms_total`` needs no rebuild.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+# Day ordinals of every representable date fit below this bound.
+_SPAN = 1 << 22
+
+
+def stay_nights(
+    check_in: Optional[str], check_out: Optional[str]
+) -> Optional[Tuple[int, int]]:
+    """Return the [start, end) night ordinals of a stay, or None.
+
+    Undated stays (both dates missing) return None. Raises ValueError for
+    a half-dated stay, a non-ISO date or check_out not after check_in.
+    """
+    if check_in is None and check_out is None:
+        return None
+    if check_in is None or check_out is None:
+        raise ValueError("check_in and check_out must be given together")
+
+    start = date.fromisoformat(check_in).toordinal()
+    end = date.fromisoformat(check_out).toordinal()
+    if end <= start:
+        raise ValueError("check_out must be after check_in")
+    return start, end
+
+
+class RoomNights:
+    """Rooms booked per night, with range add and range max."""
+
+    def __init__(self) -> None:
+        """Create an empty tree holding only the root node."""
+        # Node 0 is the root; a child index of 0 means "not allocated".
+        self._max: List[int] = [0]
+        self._add: List[int] = [0]
+        self._left: List[int] = [0]
+        self._right: List[int] = [0]
+
+    def add(self, start: int, end: int, rooms: int = 1) -> None:
+        """Add ``rooms`` (may be negative) to every night in [start, end)."""
+        if start < end:
+            self._update(0, 0, _SPAN, start, end, rooms)
+
+    def max_booked(self, start: int, end: int) -> int:
+        """Return the most rooms booked on any night in [start, end)."""
+        if start >= end:
+            return 0
+        return self._query(0, 0, _SPAN, start, end)
+
+    def peak(self, start: int = 0) -> int:
+        """Return the most rooms booked on any night from ``start`` on."""
+        return self.max_booked(start, _SPAN)
+
+    def min_available(self, capacity: int, start: int, end: int) -> int:
+        """Return the fewest free rooms on any night in [start, end)."""
+        return capacity - self.max_booked(start, end)
+
+    def can_book(
+        self, capacity: int, start: int, end: int, rooms: int = 1
+    ) -> bool:
+        """Return True if ``rooms`` are free on every night of the range."""
+        return self.min_available(capacity, start, end) >= rooms
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _update(
+        self, node: int, low: int, high: int, start: int, end: int, rooms: int
+    ) -> None:
+        """Apply a range addition below ``node`` covering [low, high)."""
+        if start <= low and high <= end:
+            self._max[node] += rooms
+            self._add[node] += rooms
+            return
+
+        mid = (low + high) // 2
+        if start < mid:
+            if not self._left[node]:
+                self._left[node] = self._new_node()
+            self._update(self._left[node], low, mid, start, end, rooms)
+        if end > mid:
+            if not self._right[node]:
+                self._right[node] = self._new_node()
+            self._update(self._right[node], mid, high, start, end, rooms)
+
+        left, right = self._left[node], self._right[node]
+        self._max[node] = self._add[node] + max(
+            self._max[left] if left else 0,
+            self._max[right] if right else 0,
+        )
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _query(
+        self, node: int, low: int, high: int, start: int, end: int
+    ) -> int:
+        """Return the range max below ``node`` covering [low, high)."""
+        if start <= low and high <= end:
+            return self._max[node]
+
+        mid = (low + high) // 2
+        best = []
+        for child, child_low, child_high in (
+            (self._left[node], low, mid),
+            (self._right[node], mid, high),
+        ):
+            if start >= child_high or end <= child_low:
+                continue
+            # An unallocated child has nothing booked on any night.
+            best.append(
+                self._query(child, child_low, child_high, start, end)
+                if child
+                else 0
+            )
+        return self._add[node] + max(best)
+
+    def _new_node(self) -> int:
+        """Allocate an empty node and return its index."""
+        self._max.append(0)
+        self._add.append(0)
+        self._left.append(0)
+        self._right.append(0)
+        return len(self._max) - 1
@@ -0,0 +1,283 @@
+"""Append-only journaled store with background compaction.
+
+JournalStore keeps the same load/save contract as FileStore, but a save
+only appends the records that changed to a log file. On open, state is
+rebuilt from the last snapshot plus the log tail. Once the log grows past
+``compact_threshold`` bytes it is rotated into a numbered segment and a
+background thread folds it into a new snapshot.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from src.storage import DELETED, FileStore, PointRecordMixin, _copy_records
+
+_MISSING = object()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class JournalStore(PointRecordMixin):
+    """Journaled key/record store compatible with the services."""
+
+    def __init__(
+        self,
+        filepath: str,
+        compact_threshold: int = 1024 * 1024,
+        background: bool = True,
+    ) -> None:
+        """Open the store, replaying snapshot and log into memory."""
+        self.path = Path(filepath)
+        self.log_path = self.path.with_name(self.path.name + ".log")
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self.stats = {"appends": 0, "compactions": 0}
+
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._log = None
+        self._version = 0
+        self._state = self._recover()
+        self._log_size = (
+            self.log_path.stat().st_size if self.log_path.exists() else 0
+        )
+
+    def signature(self) -> Tuple[int]:
+        """Return a token that changes whenever the state changes."""
+        return (self._version,)
+
+    def load(self) -> Dict[str, Any]:
+        """Return a copy of the current state."""
+        with self._lock:
+            return _copy_records(self._state)
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Append one journal entry per record that differs from state."""
+        if not isinstance(data, dict):
+            print(f"[WARN] Invalid data structure for {self.path}. Ignored.")
+            return
+
+        with self._lock:
+            entries: List[Dict[str, Any]] = []
+            for key, value in data.items():
+                if self._state.get(key, _MISSING) != value:
+                    entries.append({"op": "put", "key": key, "value": value})
+            for key in self._state:
+                if key not in data:
+                    entries.append({"op": "del", "key": key})
+
+            self._commit(entries)
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return a copy of one record without copying the whole state."""
+        with self._lock:
+            record = self._state.get(key)
+        return dict(record) if isinstance(record, dict) else record
+
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, record) copies one at a time.
+
+        Only the key list is snapshotted; records deleted while iterating
+        are skipped.
+        """
+        with self._lock:
+            keys = list(self._state)
+        for key in keys:
+            record = self.get_record(key)
+            if record is not None:
+                yield key, record
+
+    def apply(self, changes: Dict[str, Any]) -> None:
+        """Append a change set (DELETED removes a record)."""
+        entries = [
+            {"op": "del", "key": key}
+            if record is DELETED
+            else {"op": "put", "key": key, "value": record}
+            for key, record in changes.items()
+        ]
+        with self._lock:
+            self._commit(entries)
+
+    def atomic(self) -> ContextManager:
+        """Serialize read-modify-write helpers on the state lock."""
+        return self._lock
+
+    def _commit(self, entries: List[Dict[str, Any]]) -> None:
+        """Append entries, apply them to state and maybe compact."""
+        if not entries:
+            return
+
+        try:
+            self._append(entries)
+        except OSError as exc:
+            print(f"[WARN] Could not save {self.log_path}: {exc}.")
+            return
+
+        for entry in entries:
+            self._apply(self._state, entry)
+        self._version += 1
+
+        if self._log_size >= self.compact_threshold:
+            self.compact(wait=not self.background)
+
+    def compact(self, wait: bool = True) -> None:
+        """Rotate the log and fold it into a fresh snapshot."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                if not wait:
+                    return
+                self._compactor.join()
+
+            self._close_log()
+            generation = self._next_generation()
+            if self.log_path.exists():
+                os.replace(self.log_path, self._segment_path(generation))
+            self._log_size = 0
+            snapshot = _copy_records(self._state)
+
+            self._compactor = threading.Thread(
+                target=self._write_snapshot,
+                args=(snapshot, generation),
+                daemon=True,
+            )
+            self._compactor.start()
+
+        if wait:
+            self._compactor.join()
+
+    def close(self) -> None:
+        """Wait for a running compaction and close the log file."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._close_log()
+
+    def _recover(self) -> Dict[str, Any]:
+        """Rebuild state from the snapshot, old segments and the log."""
+        state = FileStore(str(self.path)).load()
+        for segment in self._segments():
+            self._replay(state, segment[1])
+        self._replay(state, self.log_path, repair=True)
+        return state
+
+    def _replay(
+        self, state: Dict[str, Any], path: Path, repair: bool = False
+    ) -> None:
+        """Apply every valid entry of a log file to ``state``.
+
+        With ``repair`` a partial last line left by a crashed writer is
+        cut off so later appends start on a clean line.
+        """
+        if not path.exists():
+            return
+
+        complete = 0
+        with path.open("rb") as handle:
+            for line_no, line in enumerate(handle, start=1):
+                if not line.endswith(b"\n"):
+                    break
+                complete += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(
+                        f"[WARN] Skipping corrupt entry {path}:{line_no}."
+                    )
+                    continue
+                if isinstance(entry, dict):
+                    self._apply(state, entry)
+
+        if path.stat().st_size > complete:
+            print(f"[WARN] Skipping partial entry at the end of {path}.")
+            if repair:
+                with path.open("r+b") as handle:
+                    handle.truncate(complete)
+
+    @staticmethod
+    def _apply(state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """Apply a single journal entry to ``state``."""
+        if entry.get("op") == "put":
+            value = entry["value"]
+            state[entry["key"]] = (
+                dict(value) if isinstance(value, dict) else value
+            )
+        elif entry.get("op") == "del":
+            state.pop(entry.get("key"), None)
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        """Write entries to the active log, one JSON document per line."""
+        if self._log is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # pylint: disable-next=consider-using-with
+            self._log = self.log_path.open("a", encoding="utf-8")
+
+        payload = "".join(
+            json.dumps(entry, separators=(",", ":")) + "\n"
+            for entry in entries
+        )
+        self._log.write(payload)
+        self._log.flush()
+        self._log_size += len(payload.encode("utf-8"))
+        self.stats["appends"] += len(entries)
+
+    def _close_log(self) -> None:
+        """Close the active log handle if it is open."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _segment_path(self, generation: int) -> Path:
+        """Return the path of a rotated log segment."""
+        return self.log_path.with_name(f"{self.log_path.name}.{generation}")
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        """Return rotated log segments sorted by generation."""
+        prefix = self.log_path.name + "."
+        segments = []
+        if not self.path.parent.exists():
+            return segments
+        for candidate in self.path.parent.iterdir():
+            suffix = candidate.name[len(prefix):]
+            if candidate.name.startswith(prefix) and suffix.isdigit():
+                segments.append((int(suffix), candidate))
+        return sorted(segments)
+
+    def _next_generation(self) -> int:
+        """Return the generation number for the next rotated segment."""
+        segments = self._segments()
+        return segments[-1][0] + 1 if segments else 1
+
+    def _write_snapshot(
+        self, snapshot: Dict[str, Any], generation: int
+    ) -> None:
+        """Persist ``snapshot`` and drop the segments it covers."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(snapshot, handle, separators=(",", ":"))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"[WARN] Could not compact {self.path}: {exc}.")
+            return
+
+        for segment_generation, segment in self._segments():
+            if segment_generation <= generation:
+                segment.unlink(missing_ok=True)
+        self.stats["compactions"] += 1
@@ -0,0 +1,299 @@
+"""Append-only event ledger for reservations and hotel changes.
+
+Every booking change is recorded as an event line in ``events.log``:
+
+    {"seq": 7, "type": "ReservationCreated", "at": "...", "data": {...}}
+
+Event types are ReservationCreated, ReservationCanceled, HotelUpdated and
+HotelDeleted. The log is never rewritten. Every ``snapshot_every`` events
+the projected state is written to ``snapshot.json`` together with the log
+offset it covers, so opening the ledger replays only the tail.
+
+Room availability is derived from the events (``rooms_total`` minus the
+active undated reservations), so ``drift()`` can report hotels whose
+stored ``rooms_available`` counter disagrees. Consumers follow the ledger
+with ``read(cursor)``, where the cursor is a byte offset returned by the
+previous call.
+
+Events appended by a UnitOfWork carry its commit token as ``tx``. The
+commit's intent file holds the same events, so recovery can append them
+if the process died in between; the ledger remembers recent tokens and
+skips a commit it has already recorded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.locking import FileLock
+
+EVENT_TYPES = (
+    "ReservationCreated",
+    "ReservationCanceled",
+    "HotelUpdated",
+    "HotelDeleted",
+)
+
+# Commit tokens remembered (and snapshotted) to drop replayed commits.
+RECENT_COMMITS = 1024
+
+
+class LedgerState:
+    """Projection of the events: reservations, hotels and active counts.
+
+    ``commits`` holds the tokens of the latest UnitOfWork commits.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None) -> None:
+        """Create a state, optionally from a snapshot's ``state``."""
+        data = data or {}
+        self.reservations: Dict[str, Dict[str, Any]] = dict(
+            data.get("reservations", {})
+        )
+        self.hotels: Dict[str, Dict[str, Any]] = dict(data.get("hotels", {}))
+        self.commits: Deque[str] = deque(
+            data.get("commits", []), maxlen=RECENT_COMMITS
+        )
+        self.active: Dict[str, int] = {}
+        for record in self.reservations.values():
+            self._count(record, 1)
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Fold one event into the state."""
+        kind, data = event.get("type"), event.get("data") or {}
+        tx = event.get("tx")
+        if tx is not None and (not self.commits or self.commits[-1] != tx):
+            self.commits.append(tx)
+        if kind in ("ReservationCreated", "ReservationCanceled"):
+            reservation_id = data.get("reservation_id")
+            previous = self.reservations.get(reservation_id)
+            if previous is not None:
+                self._count(previous, -1)
+            self.reservations[reservation_id] = dict(data)
+            self._count(data, 1)
+        elif kind == "HotelUpdated":
+            self.hotels[data.get("hotel_id")] = dict(data)
+        elif kind == "HotelDeleted":
+            self.hotels.pop(data.get("hotel_id"), None)
+
+    def rooms_available(self, hotel_id: str) -> Optional[int]:
+        """Return rooms_total minus active undated bookings, or None."""
+        hotel = self.hotels.get(hotel_id)
+        if hotel is None:
+            return None
+        return hotel.get("rooms_total", 0) - self.active.get(hotel_id, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON-serializable form stored in snapshots."""
+        return {
+            "reservations": self.reservations,
+            "hotels": self.hotels,
+            "commits": list(self.commits),
+        }
+
+    def _count(self, record: Dict[str, Any], delta: int) -> None:
+        """Adjust the active undated count of the record's hotel."""
+        if record.get("status") == "ACTIVE" and not record.get("check_in"):
+            hotel_id = record.get("hotel_id")
+            self.active[hotel_id] = self.active.get(hotel_id, 0) + delta
+
+
+# pylint: disable-next=too-many-instance-attributes
+class EventLedger:
+    """Append-only event log with periodic snapshots.
+
+    Appends from several processes are serialized by a FileLock; each
+    writer first catches up on events others appended, so sequence
+    numbers stay dense and the projection stays current.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 1000) -> None:
+        """Open (or create) the ledger, replaying snapshot and tail."""
+        self.directory = Path(directory)
+        self.log_path = self.directory / "events.log"
+        self.snapshot_path = self.directory / "snapshot.json"
+        self.snapshot_every = snapshot_every
+        self.stats = {"appends": 0, "snapshots": 0, "replayed": 0}
+
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(str(self.directory / "ledger.lock"))
+        self._seq = 0
+        self._offset = 0
+        self._since_snapshot = 0
+        self.state = LedgerState()
+        with self._lock, self._file_lock:
+            self._load_snapshot()
+            self._catch_up(repair=True)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last event seen."""
+        return self._seq
+
+    def append(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Append one event and return its sequence number."""
+        return self.append_many([(event_type, data)])
+
+    def append_many(
+        self,
+        events: Iterable[Tuple[str, Dict[str, Any]]],
+        tx: Optional[str] = None,
+    ) -> int:
+        """Append events in one write; return the last sequence number.
+
+        ``tx`` tags the events with a commit token; a commit whose token
+        is already in the ledger is not appended again.
+        """
+        events = list(events)
+        for event_type, _ in events:
+            if event_type not in EVENT_TYPES:
+                raise ValueError(f"Unknown event type: {event_type!r}")
+        if not events:
+            return self._seq
+
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if tx is not None and tx in self.state.commits:
+                return self._seq
+            at = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+            lines = []
+            for event_type, data in events:
+                self._seq += 1
+                event = {
+                    "seq": self._seq,
+                    "type": event_type,
+                    "at": at,
+                    "data": data,
+                }
+                if tx is not None:
+                    event["tx"] = tx
+                self.state.apply(event)
+                lines.append(json.dumps(event, separators=(",", ":")) + "\n")
+
+            payload = "".join(lines).encode("utf-8")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self.log_path.open("ab") as handle:
+                handle.write(payload)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._offset += len(payload)
+            self._since_snapshot += len(events)
+            self.stats["appends"] += len(events)
+
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot()
+            return self._seq
+
+    def read(
+        self, cursor: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return events after byte offset ``cursor`` and the next cursor.
+
+        Pass the returned cursor to the next call to receive only new
+        events. An incomplete last line is left for a later call.
+        """
+        events: List[Dict[str, Any]] = []
+        if not self.log_path.exists():
+            return events, cursor
+
+        with self.log_path.open("rb") as handle:
+            handle.seek(cursor)
+            while limit is None or len(events) < limit:
+                line = handle.readline()
+                if not line.endswith(b"\n"):
+                    break
+                cursor += len(line)
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"[WARN] Skipping corrupt event at {cursor}.")
+        return events, cursor
+
+    def refresh(self) -> None:
+        """Apply events appended by other processes since the last call."""
+        with self._lock, self._file_lock:
+            self._catch_up()
+
+    def snapshot(self) -> None:
+        """Write a snapshot of the current state now."""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            self._write_snapshot()
+
+    def drift(self, hotel_records: Dict[str, Any]) -> Dict[str, Tuple]:
+        """Return {hotel_id: (stored, derived)} where counters disagree."""
+        with self._lock:
+            mismatches = {}
+            for hotel_id, record in hotel_records.items():
+                derived = self.state.rooms_available(hotel_id)
+                if not isinstance(record, dict) or derived is None:
+                    continue
+                stored = record.get("rooms_available")
+                if stored != derived:
+                    mismatches[hotel_id] = (stored, derived)
+            return mismatches
+
+    def _load_snapshot(self) -> None:
+        """Start from the last snapshot, if there is a readable one."""
+        if not self.snapshot_path.exists():
+            return
+        try:
+            snapshot = json.loads(
+                self.snapshot_path.read_text(encoding="utf-8")
+            )
+            state = LedgerState(snapshot["state"])
+            seq, offset = int(snapshot["seq"]), int(snapshot["offset"])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            print(f"[WARN] Ignoring snapshot {self.snapshot_path}: {exc}.")
+            return
+        self.state, self._seq, self._offset = state, seq, offset
+
+    def _catch_up(self, repair: bool = False) -> None:
+        """Replay events past the known offset.
+
+        With ``repair`` a partial last line left by a crashed writer is
+        cut off so later appends start on a clean line.
+        """
+        events, offset = self.read(self._offset)
+        for event in events:
+            self.state.apply(event)
+            self._seq = max(self._seq, int(event.get("seq", 0)))
+        self.stats["replayed"] += len(events)
+        self._since_snapshot += len(events)
+        self._offset = offset
+
+        if repair and self.log_path.exists() and (
+            self.log_path.stat().st_size > offset
+        ):
+            print(f"[WARN] Truncating partial event in {self.log_path}.")
+            with self.log_path.open("r+b") as handle:
+                handle.truncate(offset)
+
+    def _write_snapshot(self) -> None:
+        """Persist the state with the offset and sequence it covers."""
+        snapshot = {
+            "seq": self._seq,
+            "offset": self._offset,
+            "state": self.state.to_dict(),
+        }
+        tmp_path = self.snapshot_path.with_name(
+            self.snapshot_path.name + ".tmp"
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(snapshot, handle, separators=(",", ":"))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as exc:
+            print(f"[WARN] Could not snapshot {self.snapshot_path}: {exc}.")
+            return
+        self._since_snapshot = 0
+        self.stats["snapshots"] += 1
@@ -0,0 +1,112 @@
+"""Thread and process locks for concurrent bookings.
+
+A FileLock combines a re-entrant thread lock with an OS advisory lock
+(``fcntl.flock``) on a lock file, so it excludes other threads of this
+process and other processes sharing the lock directory. On platforms
+without ``fcntl`` only the thread lock is taken.
+
+LockManager hands out one lock per hotel, so bookings for different
+hotels proceed in parallel, plus one short-lived lock per store file that
+serializes the final read-merge-write of whole-file stores.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+class FileLock:
+    """Re-entrant lock that is exclusive across threads and processes."""
+
+    def __init__(self, path: str) -> None:
+        """Create a lock backed by the file at ``path``."""
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        """Block until the lock is held by the calling thread."""
+        self._thread_lock.acquire()  # pylint: disable=consider-using-with
+        if self._depth == 0 and fcntl is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except OSError:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        """Release one level of ownership."""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        """Acquire the lock."""
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        """Release the lock."""
+        self.release()
+
+
+class LockManager:
+    """Hands out named FileLocks kept under one directory."""
+
+    def __init__(self, lock_dir: str) -> None:
+        """Use ``lock_dir`` for lock files (created on demand)."""
+        self.lock_dir = Path(lock_dir)
+        self._locks: Dict[str, FileLock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, name: str) -> FileLock:
+        """Return the lock for ``name``, creating it once per process."""
+        with self._guard:
+            lock = self._locks.get(name)
+            if lock is None:
+                digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+                lock = FileLock(str(self.lock_dir / f"{digest}.lock"))
+                self._locks[name] = lock
+            return lock
+
+    def hotel(self, hotel_id: str) -> FileLock:
+        """Return the lock guarding one hotel's availability."""
+        return self.lock(f"hotel:{hotel_id}")
+
+    @contextmanager
+    def hotels(self, hotel_ids: Iterable[str]) -> Iterator[None]:
+        """Hold several hotel locks, always taken in sorted order."""
+        with ExitStack() as stack:
+            for hotel_id in sorted(set(hotel_ids)):
+                stack.enter_context(self.hotel(hotel_id))
+            yield
+
+    def guard(self, store: Any) -> None:
+        """Attach a store-file lock to a whole-file store.
+
+        Stores with a ``lock`` attribute run their read-modify-write
+        helpers, and UnitOfWork commits, while holding it.
+        """
+        path = getattr(store, "path", None)
+        if path is not None and hasattr(store, "lock"):
+            store.lock = self.lock(f"store:{Path(path).resolve()}")
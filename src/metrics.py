@@ -0,0 +1,334 @@
+"""In-process metrics for the storage layer and services.
+
+Instrumentation is installed by wrapping methods on the classes, so when
+it is off the original methods run untouched and there is no overhead.
+``instrument()`` records:
+
+- ``store_calls_total`` / ``store_latency_seconds`` for FileStore.load
+  and FileStore.save, and for each file a UnitOfWork commit writes
+  (``method="commit"``),
+- ``store_read_bytes_total`` / ``store_written_bytes_total`` for file I/O,
+- ``store_parse_seconds`` / ``store_serialize_seconds`` for codec work,
+- ``service_calls_total`` / ``service_errors_total`` /
+  ``service_latency_seconds`` for every public service method.
+
+Metrics can be read with ``counter()``/``histogram()`` or exported as
+JSON or Prometheus text.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+# Upper bounds (seconds) of the latency buckets; +Inf is implicit.
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+_MISSING = object()
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    """Return a hashable identity for a metric and its labels."""
+    return name, tuple(sorted(labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Create an empty histogram with the given upper bounds."""
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (upper bound, cumulative count) pairs ending at +Inf."""
+        pairs, total = [], 0
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = {}
+        self._histograms: Dict[_Key, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add ``value`` to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in a histogram."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return a counter's value (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """Return a histogram, or None if nothing was observed."""
+        with self._lock:
+            return self._histograms.get(_key(name, labels))
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return all metrics as plain, JSON-serializable data."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative()),
+                }
+                for (name, labels), histogram in sorted(
+                    self._histograms.items(), key=lambda item: item[0]
+                )
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self) -> str:
+        """Export all metrics as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        typed = set()
+        for counter in snapshot["counters"]:
+            if counter["name"] not in typed:
+                typed.add(counter["name"])
+                lines.append(f"# TYPE {counter['name']} counter")
+            lines.append(
+                f"{counter['name']}{_labels(counter['labels'])} "
+                f"{counter['value']}"
+            )
+        for histogram in snapshot["histograms"]:
+            name, labels = histogram["name"], histogram["labels"]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in histogram["buckets"].items():
+                bucket_labels = _labels(dict(labels, le=bound))
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(
+                f"{name}_count{_labels(labels)} {histogram['count']}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Format labels as ``{a="1",b="2"}`` (empty string if none)."""
+    if not labels:
+        return ""
+    body = ",".join(
+        f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())
+    )
+    return "{" + body + "}"
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+REGISTRY = MetricsRegistry()
+
+SERVICE_CLASSES = (HotelService, CustomerService, ReservationService)
+
+_patched: List[Tuple[type, str, Any]] = []
+_patch_lock = threading.Lock()
+
+
+def is_instrumented() -> bool:
+    """Return True while instrumentation is installed."""
+    return bool(_patched)
+
+
+def instrument(registry: MetricsRegistry = REGISTRY) -> MetricsRegistry:
+    """Install instrumentation recording into ``registry``.
+
+    Calling it again while installed is a no-op.
+    """
+    with _patch_lock:
+        if _patched:
+            return registry
+
+        for method in ("load", "save"):
+            _patch(FileStore, method, _timed_store(registry, method))
+        _patch(FileStore, "parse", _timed_codec(
+            registry, "store_parse_seconds"
+        ))
+        _patch(FileStore, "dumps", _timed_codec(
+            registry, "store_serialize_seconds"
+        ))
+        _patch(FileStore, "_read_bytes", _counted_read(registry))
+        _patch(FileStore, "_write_bytes", _counted_write(registry))
+        _patch(FileStore, "stage_bytes", _counted_write(registry))
+        _patch(FileStore, "stage_bytes", _timed_store(registry, "commit"))
+
+        for cls in SERVICE_CLASSES:
+            for name in dir(cls):
+                if name.startswith("_") or not inspect.isfunction(
+                    getattr(cls, name)
+                ):
+                    continue
+                _patch(cls, name, _timed_service(registry, cls.__name__,
+                                                 name))
+    return registry
+
+
+def uninstrument() -> None:
+    """Restore every original method."""
+    with _patch_lock:
+        while _patched:
+            cls, name, original = _patched.pop()
+            if original is _MISSING:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+
+def _patch(
+    cls: type, name: str, wrap: Callable[[Callable], Callable]
+) -> None:
+    """Replace ``cls.name`` with ``wrap(original)`` and remember it."""
+    original = getattr(cls, name)
+    _patched.append((cls, name, cls.__dict__.get(name, _MISSING)))
+    setattr(cls, name, functools.wraps(original)(wrap(original)))
+
+
+def _timed_store(
+    registry: MetricsRegistry, method: str
+) -> Callable[[Callable], Callable]:
+    """Wrap FileStore.load/save with a call counter and latency."""
+    def wrap(original: Callable) -> Callable:
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                registry.inc("store_calls_total", method=method)
+                registry.observe(
+                    "store_latency_seconds",
+                    time.perf_counter() - started,
+                    method=method,
+                )
+        return wrapper
+    return wrap
+
+
+def _timed_codec(
+    registry: MetricsRegistry, metric: str
+) -> Callable[[Callable], Callable]:
+    """Wrap a parse/serialize method with a latency histogram."""
+    def wrap(original: Callable) -> Callable:
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                registry.observe(metric, time.perf_counter() - started)
+        return wrapper
+    return wrap
+
+
+def _counted_read(registry: MetricsRegistry) -> Callable[[Callable], Callable]:
+    """Wrap FileStore._read_bytes to count the bytes read."""
+    def wrap(original: Callable) -> Callable:
+        def wrapper(self):
+            payload = original(self)
+            registry.inc("store_read_bytes_total", len(payload))
+            return payload
+        return wrapper
+    return wrap
+
+
+def _counted_write(
+    registry: MetricsRegistry,
+) -> Callable[[Callable], Callable]:
+    """Wrap a FileStore write method to count the bytes written."""
+    def wrap(original: Callable) -> Callable:
+        def wrapper(self, *args):
+            original(self, *args)
+            registry.inc("store_written_bytes_total", len(args[-1]))
+        return wrapper
+    return wrap
+
+
+def _timed_service(
+    registry: MetricsRegistry, service: str, method: str
+) -> Callable[[Callable], Callable]:
+    """Wrap a public service method with calls, errors and latency."""
+    def wrap(original: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            except Exception:
+                registry.inc(
+                    "service_errors_total", service=service, method=method
+                )
+                raise
+            finally:
+                registry.inc(
+                    "service_calls_total", service=service, method=method
+                )
+                registry.observe(
+                    "service_latency_seconds",
+                    time.perf_counter() - started,
+                    service=service,
+                    method=method,
+                )
+        return wrapper
+    return wrap
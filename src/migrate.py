@@ -0,0 +1,49 @@
+"""Import the JSON data files into a SQLite database.
+
+Run:
+  python -m src.migrate --data-dir data --db data/reservations.db
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.backends import COLLECTIONS
+from src.sqlite_store import SQLiteDatabase
+from src.storage import FileStore
+
+
+def migrate_json_to_sqlite(data_dir: str, db_path: str) -> Dict[str, int]:
+    """Copy every ``<collection>.json`` into its table.
+
+    Existing rows with the same id are replaced. Returns the number of
+    records imported per collection.
+    """
+    database = SQLiteDatabase(db_path)
+    counts = {}
+    try:
+        for name in COLLECTIONS:
+            records = FileStore(str(Path(data_dir) / f"{name}.json")).load()
+            database.store(name).apply(records)
+            counts[name] = len(records)
+    finally:
+        database.close()
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--db", default="data/reservations.db")
+    args = parser.parse_args(argv)
+
+    counts = migrate_json_to_sqlite(args.data_dir, args.db)
+    for name, count in counts.items():
+        print(f"{name}: {count} records imported into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 """
 Domain models for the hotel reservation system.
 
-Includes basic entities: Hotel, Customer, and Reservation.
+Includes basic entities: Hotel, Customer, and Reservation. The models
+use ``__slots__`` so each instance carries no per-object ``__dict__``.
 """
 
 from __future__ import annotations
@@ -10,14 +11,19 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Hotel:
-    """Represents a hotel and its room availability."""
+    """Represents a hotel and its room availability.
+
+    ``version`` is bumped on every stored update and is used for
+    optimistic concurrency (compare-and-set updates).
+    """
 
     hotel_id: str
     name: str
     rooms_total: int
     rooms_available: int
+    version: int = 0
 
     def reserve_room(self) -> bool:
         """Reserve one room if available. Returns True on success."""
@@ -32,26 +38,35 @@ class Hotel:
             self.rooms_available += 1
 
 
-@dataclass
+@dataclass(slots=True)
 class Customer:
     """Represents a customer.
 
     Email is optional to keep the model flexible and test-friendly.
+    ``version`` is bumped on every stored update.
     """
 
     customer_id: str
     name: str
     email: Optional[str] = None
+    version: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Reservation:
-    """Represents a reservation made by a customer for a hotel."""
+    """Represents a reservation made by a customer for a hotel.
+
+    ``check_in``/``check_out`` are optional ISO dates (YYYY-MM-DD); a
+    dated reservation holds one room for each night in [check_in,
+    check_out) instead of the hotel's global ``rooms_available`` counter.
+    """
 
     reservation_id: str
     hotel_id: str
     customer_id: str
     status: str = "ACTIVE"  # ACTIVE | CANCELED
+    check_in: Optional[str] = None
+    check_out: Optional[str] = None
 
     def cancel(self) -> None:
         """Mark the reservation as canceled."""
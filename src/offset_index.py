@@ -0,0 +1,288 @@
+"""Point reads from a JSON store through a sidecar offset index.
+
+IndexedFileStore writes the same file as FileStore, plus a sidecar
+``<file>.idx`` mapping each record id to the byte offset and length of
+its value in the data file. get_record() memory-maps the data file and
+decodes only that slice, so a lookup costs the same whatever the size of
+the collection.
+
+The index is produced while the default ``json`` codec encodes the file,
+so saving costs no extra pass. It records the data file's (mtime_ns,
+size, inode); if the file is replaced by anything else (another codec, a
+UnitOfWork commit, a manual edit) the stale index is ignored and rebuilt
+from the mapped file on the next lookup. Binary codecs cannot be sliced
+and fall back to a full load.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.durability import replace_file
+from src.storage import FileStore
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = b" \t\n\r"
+
+Offsets = Dict[str, Tuple[int, int]]
+
+
+def encode_indexed(data: Dict[str, Any]) -> Tuple[bytes, Offsets]:
+    """Encode ``data`` like ``json.dumps(data, indent=2)`` with offsets.
+
+    Returns the payload and, per key, the (offset, length) in bytes of
+    its value. Output is ASCII (``ensure_ascii``), so characters and
+    bytes line up.
+    """
+    if not data:
+        return b"{}", {}
+    parts: List[str] = ["{"]
+    offsets: Offsets = {}
+    position = 1
+    separator = "\n  "
+    for key, value in data.items():
+        head = f"{separator}{json.dumps(key)}: "
+        # Values sit one level deep: indent their inner lines by two more.
+        body = json.dumps(value, indent=2).replace("\n", "\n  ")
+        position += len(head)
+        offsets[key] = (position, len(body))
+        position += len(body)
+        parts.append(head)
+        parts.append(body)
+        separator = ",\n  "
+    parts.append("\n}")
+    return "".join(parts).encode("ascii"), offsets
+
+
+def scan_offsets(raw: bytes) -> Offsets:
+    """Return the (offset, length) of each member of a JSON object.
+
+    Raises ValueError if ``raw`` is not a JSON object. The text is read
+    as latin-1, so string positions are byte positions; keys are decoded
+    from their own UTF-8 bytes.
+    """
+    text = raw.decode("latin-1")
+    offsets: Offsets = {}
+    pos = _skip(raw, 0)
+    if pos == len(raw):
+        return offsets
+    if raw[pos:pos + 1] != b"{":
+        raise ValueError("expected a JSON object")
+    pos = _skip(raw, pos + 1)
+    if raw[pos:pos + 1] == b"}":
+        return offsets
+    while True:
+        _, end = _DECODER.raw_decode(text, pos)
+        key = json.loads(raw[pos:end])
+        if not isinstance(key, str):
+            raise ValueError("object keys must be strings")
+        pos = _skip(raw, end)
+        if raw[pos:pos + 1] != b":":
+            raise ValueError(f"expected ':' at offset {pos}")
+        start = _skip(raw, pos + 1)
+        _, end = _DECODER.raw_decode(text, start)
+        offsets[key] = (start, end - start)
+        pos = _skip(raw, end)
+        if raw[pos:pos + 1] == b",":
+            pos = _skip(raw, pos + 1)
+            continue
+        if raw[pos:pos + 1] != b"}":
+            raise ValueError(f"expected ',' or '}}' at offset {pos}")
+        return offsets
+
+
+def _skip(raw: bytes, pos: int) -> int:
+    """Return the first position at or after ``pos`` that is not blank."""
+    while pos < len(raw) and raw[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _file_signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Return the (mtime_ns, size, inode) triple FileStore compares."""
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class IndexedFileStore(FileStore):
+    """FileStore with memory-mapped point reads via an offset index.
+
+    Takes the same arguments as FileStore. Writes go through FileStore
+    unchanged; ``stats`` adds ``index_reads`` (records decoded from a
+    slice) and ``index_builds`` (indexes rebuilt by scanning the file).
+    Call close() to release the mapping.
+    """
+
+    point_reads = True
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Open the store; the index is read or built on first lookup."""
+        super().__init__(*args, **kwargs)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.stats.update({"index_reads": 0, "index_builds": 0})
+        self._index_lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+        self._map_signature: Optional[Tuple[int, int, int]] = None
+        self._offsets: Optional[Offsets] = None
+        self._index_signature: Optional[Tuple[int, int, int]] = None
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return one record, decoding only its bytes from the file."""
+        if self.is_cached():
+            return super().get_record(key)
+
+        with self._index_lock:
+            offsets = self._current()
+            if offsets is None:
+                return super().get_record(key)
+            span = offsets.get(key)
+            if span is None:
+                return None
+            raw = self._map[span[0]:span[0] + span[1]]
+        self.stats["index_reads"] += 1
+        try:
+            return json.loads(raw)
+        except ValueError as exc:
+            print(f"[WARN] Bad index entry for {key!r} in "
+                  f"{self.index_path}: {exc}. Reading the whole file.")
+            self.drop_index()
+            return super().get_record(key)
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        """Serialize data, keeping the offsets of a ``json`` payload."""
+        if (
+            self.codec.name != "json"
+            or not isinstance(data, dict)
+            or not all(isinstance(key, str) for key in data)
+        ):
+            return super().dumps(data)
+        payload, offsets = encode_indexed(data)
+        self._local.encoded = (payload, offsets)
+        return payload
+
+    def _write_bytes(self, payload: bytes) -> None:
+        """Replace the file, then publish the index of what was written."""
+        super()._write_bytes(payload)
+        self._publish(payload)
+
+    def remember(self, data: Dict[str, Any]) -> None:
+        """Also index files written by others (e.g. UnitOfWork)."""
+        super().remember(data)
+        self._publish(None)
+
+    def drop_index(self) -> None:
+        """Forget the index (and its sidecar); the next lookup rebuilds it."""
+        with self._index_lock:
+            self._offsets = None
+            self._index_signature = None
+            self.index_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        with self._index_lock:
+            self._unmap()
+
+    def _publish(self, payload: Optional[bytes]) -> None:
+        """Write the index for a file just written from dumps() output.
+
+        ``payload`` is what was written, if known; otherwise the last
+        dumps() result is used when its size matches the file.
+        """
+        encoded = getattr(self._local, "encoded", None)
+        self._local.encoded = None
+        if encoded is None:
+            return
+        try:
+            signature = _file_signature(os.stat(self.path))
+        except OSError:
+            return
+        written, offsets = encoded
+        if written is not payload and len(written) != signature[1]:
+            return
+        with self._index_lock:
+            if signature == self._index_signature:
+                return
+            self._offsets = offsets
+            self._index_signature = signature
+            self._store_index()
+
+    def _current(self) -> Optional[Offsets]:
+        """Return offsets matching the mapped file (lock held).
+
+        Returns None when the file cannot be indexed (binary codec or
+        malformed JSON); a missing file has no records.
+        """
+        try:
+            signature = _file_signature(os.stat(self.path))
+        except OSError:
+            self._unmap()
+            return {}
+        if signature != self._map_signature and not self._remap():
+            return None
+        if self._index_signature != self._map_signature:
+            self._load_index()
+        return self._offsets
+
+    def _remap(self) -> bool:
+        """Map the current file; return False if it is missing."""
+        self._unmap()
+        try:
+            with self.path.open("rb") as handle:
+                stat = os.fstat(handle.fileno())
+                self._map_signature = _file_signature(stat)
+                if self._map_signature[1]:
+                    self._map = mmap.mmap(
+                        handle.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Could not map {self.path}: {exc}.")
+            self._unmap()
+            return False
+        return True
+
+    def _unmap(self) -> None:
+        """Close the current mapping, if any (lock held)."""
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._map_signature = None
+
+    def _load_index(self) -> None:
+        """Use the sidecar if it matches the mapping, else rebuild it."""
+        self._index_signature = self._map_signature
+        if self._map is None:
+            self._offsets = {}
+            return
+        try:
+            stored = json.loads(self.index_path.read_bytes())
+            if tuple(stored["signature"]) == self._map_signature:
+                self._offsets = {
+                    key: (span[0], span[1])
+                    for key, span in stored["offsets"].items()
+                }
+                return
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            pass
+
+        self.stats["index_builds"] += 1
+        try:
+            self._offsets = scan_offsets(self._map[:])
+        except ValueError:
+            # Binary codec or malformed file: no point reads.
+            self._offsets = None
+            return
+        self._store_index()
+
+    def _store_index(self) -> None:
+        """Write the sidecar index (lock held); losing it is harmless."""
+        payload = json.dumps({
+            "signature": list(self._index_signature),
+            "offsets": self._offsets,
+        }, separators=(",", ":")).encode("utf-8")
+        try:
+            replace_file(self.index_path, payload, sync=False)
+        except OSError as exc:
+            print(f"[WARN] Could not write {self.index_path}: {exc}.")
@@ -0,0 +1,272 @@
+"""Filtered, sorted and cursor-paginated queries over a store.
+
+QueryViews keeps one SortedIndex per queried field (built on first use,
+then maintained by the owning service on every mutation) plus, for
+whole-file stores, an in-memory copy of the records. Fetching a page walks
+the index from the cursor position, so it costs O(log N + page size) when
+the filter bounds the sort field, instead of a full load and sort.
+
+A filter maps field names to a value (equality) or to a dict of
+operators: ``eq``, ``prefix``, ``gt``, ``gte``, ``lt`` and ``lte``.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.indexes import SortedIndex, prefix_end, sort_key
+from src.storage import DELETED, signature_of
+
+OPERATORS = ("eq", "prefix", "gt", "gte", "lt", "lte")
+
+_UNBUILT = object()
+
+
+@dataclass
+class Page:
+    """One page of query results.
+
+    ``next_cursor`` is None on the last page; pass it back to query() to
+    fetch the following page.
+    """
+
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def parse_where(where: Optional[Dict[str, Any]]) -> Dict[str, Dict]:
+    """Normalize a filter to {field: {operator: value}}.
+
+    Raises ValueError for unknown operators.
+    """
+    conditions = {}
+    for name, condition in (where or {}).items():
+        if not isinstance(condition, dict):
+            condition = {"eq": condition}
+        unknown = set(condition) - set(OPERATORS)
+        if unknown:
+            raise ValueError(f"Unknown filter operator(s): {sorted(unknown)}")
+        conditions[name] = dict(condition)
+    return conditions
+
+
+def encode_cursor(value: Any, record_id: str) -> str:
+    """Return an opaque cursor for the last item of a page."""
+    raw = json.dumps([value, record_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Return the (value, record_id) stored in a cursor.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        value, record_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    return value, record_id
+
+
+def matches(record: Any, conditions: Dict[str, Dict]) -> bool:
+    """Return True if ``record`` satisfies every condition."""
+    if not isinstance(record, dict):
+        return False
+    for name, condition in conditions.items():
+        value = record.get(name)
+        for operator, expected in condition.items():
+            if not _compare(operator, value, expected):
+                return False
+    return True
+
+
+def _compare(operator: str, value: Any, expected: Any) -> bool:
+    """Evaluate one operator using the index ordering."""
+    if operator == "eq":
+        return value == expected
+    if operator == "prefix":
+        return isinstance(value, str) and value.startswith(expected)
+    left, right = sort_key(value), sort_key(expected)
+    if operator == "gt":
+        return left > right
+    if operator == "gte":
+        return left >= right
+    if operator == "lt":
+        return left < right
+    return left <= right
+
+
+def _cursor_after(item: Tuple[str, Any], order_by: str) -> str:
+    """Return the cursor resuming after the (id, record) ``item``."""
+    record_id, record = item
+    return encode_cursor(record.get(order_by), record_id)
+
+
+def _bounds(
+    condition: Dict[str, Any]
+) -> Tuple[Optional[Tuple[Any, bool]], Optional[Tuple[Any, bool]]]:
+    """Turn a condition on the sort field into index scan bounds."""
+    low = high = None
+    if "eq" in condition:
+        low = high = (condition["eq"], True)
+    if "prefix" in condition:
+        low = (condition["prefix"], True)
+        end = prefix_end(condition["prefix"])
+        high = (end, False) if end is not None else None
+    if "gt" in condition:
+        low = (condition["gt"], False)
+    if "gte" in condition:
+        low = (condition["gte"], True)
+    if "lt" in condition:
+        high = (condition["lt"], False)
+    if "lte" in condition:
+        high = (condition["lte"], True)
+    return low, high
+
+
+class StoreViews(ABC):
+    """In-memory views (and a record copy) kept in step with a store.
+
+    Subclasses build their indexes when ``_signature`` is stale and fold
+    the owning service's writes in through apply(). Stores without cheap
+    point reads get a record copy so results never need a full load.
+    """
+
+    def __init__(self, store: Any) -> None:
+        """Create empty views over ``store``."""
+        self.store = store
+        self.lock = threading.RLock()
+        self._records: Dict[str, Any] = {}
+        self._copy = not getattr(store, "point_reads", False)
+        self._signature: Any = _UNBUILT
+
+    def in_sync(self) -> bool:
+        """Return True if the views reflect the store's current state."""
+        with self.lock:
+            return self._signature == signature_of(self.store)
+
+    @abstractmethod
+    def apply(self, changes: Dict[str, Any], in_sync: bool) -> None:
+        """Fold committed {id: record} changes into the views."""
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next query."""
+        with self.lock:
+            self._signature = _UNBUILT
+
+    def _stale(self) -> bool:
+        """Return True if the views must be rebuilt (lock held)."""
+        return self._signature is _UNBUILT or (
+            signature_of(self.store) != self._signature
+        )
+
+    def _record(self, record_id: str) -> Any:
+        """Return one record for filtering and output."""
+        if self._copy:
+            record = self._records.get(record_id)
+        else:
+            record = self.store.get_record(record_id)
+        return dict(record) if isinstance(record, dict) else record
+
+
+class QueryViews(StoreViews):
+    """Sorted indexes (and a record copy) kept in step with a store."""
+
+    def __init__(self, store: Any) -> None:
+        """Create empty views over ``store``."""
+        super().__init__(store)
+        self._indexes: Dict[str, SortedIndex] = {}
+
+    def apply(self, changes: Dict[str, Any], in_sync: bool) -> None:
+        """Fold committed {id: record} changes into the views.
+
+        ``in_sync`` must say whether the views were current before the
+        change was written; if not, they are rebuilt on next use.
+        """
+        with self.lock:
+            if not in_sync:
+                self.invalidate()
+                return
+            changes = {
+                record_id: None if record is DELETED else record
+                for record_id, record in changes.items()
+            }
+            for record_id, record in changes.items():
+                if record is None:
+                    self._records.pop(record_id, None)
+                elif self._copy:
+                    self._records[record_id] = record
+            for index in self._indexes.values():
+                index.apply(changes)
+            self._signature = signature_of(self.store)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def query(
+        self,
+        where: Optional[Dict[str, Any]],
+        order_by: str,
+        descending: bool = False,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, Any]], Optional[str]]:
+        """Return one page of (id, record) pairs and the next cursor."""
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        conditions = parse_where(where)
+        low, high = _bounds(conditions.pop(order_by, {}))
+        after = decode_cursor(cursor) if cursor is not None else None
+
+        page: List[Tuple[str, Any]] = []
+        with self.lock:
+            index = self._index(order_by)
+            for record_id in index.scan(low, high, after, descending):
+                record = self._record(record_id)
+                if not matches(record, conditions):
+                    continue
+                if len(page) == limit:
+                    return page, _cursor_after(page[-1], order_by)
+                page.append((record_id, record))
+        return page, None
+
+    def _index(self, name: str) -> SortedIndex:
+        """Return the index on ``name``, rebuilding stale views first."""
+        if self._stale():
+            self._rebuild(list(self._indexes), signature_of(self.store))
+        if name not in self._indexes:
+            index = SortedIndex(name)
+            index.rebuild(self._scan())
+            self._indexes[name] = index
+        return self._indexes[name]
+
+    def _rebuild(self, names: List[str], signature: Any) -> None:
+        """Rebuild the record copy and the named indexes in one pass.
+
+        Without a record copy, only each record's indexed fields are kept
+        until the indexes are sorted.
+        """
+        self._records = {}
+        self._indexes = {name: SortedIndex(name) for name in names}
+        fields: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+            name: [] for name in names
+        }
+        for record_id, record in self.store.iter_records():
+            if self._copy:
+                self._records[record_id] = record
+            elif isinstance(record, dict):
+                for name, pairs in fields.items():
+                    pairs.append((record_id, {name: record.get(name)}))
+        for name, index in self._indexes.items():
+            index.rebuild(self._records if self._copy else fields[name])
+        self._signature = signature
+
+    def _scan(self) -> Iterator[Tuple[str, Any]]:
+        """Return all records, from the copy when one is kept."""
+        if self._copy:
+            return iter(self._records.items())
+        return self.store.iter_records()
@@ -0,0 +1,142 @@
+"""Customer lookups by email and by name prefix.
+
+CustomerSearch keeps two in-memory indexes over a customer store: a hash
+index on the normalized email and a sorted index on the normalized name.
+An email lookup is a dict access and a typeahead query is a bisect to
+the prefix plus one step per returned customer, so both stay fast as
+the collection grows.
+
+Like QueryViews, the indexes are rebuilt from one scan when the store
+changed behind the service's back, and updated record by record from
+the service's own writes otherwise.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.indexes import SecondaryIndex, SortedIndex, prefix_end
+from src.queries import StoreViews
+from src.storage import DELETED, signature_of
+
+
+def normalize_email(email: Any) -> Optional[str]:
+    """Return the comparable form of an email, or None if there is none."""
+    if not isinstance(email, str):
+        return None
+    return email.strip().casefold() or None
+
+
+def normalize_name(name: Any) -> Optional[str]:
+    """Return a name folded for typeahead: no case, accents or extra space.
+
+    "  José  Pérez" and "jose perez" normalize to the same key.
+    """
+    if not isinstance(name, str):
+        return None
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return " ".join(stripped.split()).casefold()
+
+
+class CustomerSearch(StoreViews):
+    """Email and name-prefix indexes kept in step with a customer store."""
+
+    def __init__(self, store: Any) -> None:
+        """Create empty indexes over ``store``; they build on first use."""
+        super().__init__(store)
+        self._emails = SecondaryIndex(["email"])
+        self._names = SortedIndex("name")
+
+    def apply(self, changes: Dict[str, Any], in_sync: bool) -> None:
+        """Fold committed {id: record} changes into the indexes.
+
+        Without ``in_sync`` (the indexes were stale before the write) they
+        are rebuilt on the next lookup instead.
+        """
+        with self.lock:
+            if in_sync:
+                for customer_id, record in changes.items():
+                    self._add(customer_id, record)
+                self._signature = signature_of(self.store)
+            else:
+                self.invalidate()
+
+    def owners(self, email: Any) -> List[str]:
+        """Return the ids of customers whose email normalizes alike."""
+        key = normalize_email(email)
+        if key is None:
+            return []
+        with self.lock:
+            self._current()
+            return sorted(self._emails.lookup("email", key))
+
+    def by_email(self, email: Any) -> List[Tuple[str, Any]]:
+        """Return (id, record) pairs for customers with ``email``."""
+        with self.lock:
+            return [(cid, self._record(cid)) for cid in self.owners(email)]
+
+    def by_name_prefix(
+        self, prefix: str, limit: int = 10
+    ) -> List[Tuple[str, Any]]:
+        """Return the first ``limit`` customers (by name) matching prefix.
+
+        Raises ValueError for a non-positive limit.
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        key = normalize_name(prefix) or ""
+        end = prefix_end(key)
+        high = (end, False) if end is not None else None
+        with self.lock:
+            self._current()
+            ids = list(islice(self._names.scan((key, True), high), limit))
+            return [(cid, self._record(cid)) for cid in ids]
+
+    def _current(self) -> None:
+        """Rebuild the indexes from the store if it changed (lock held)."""
+        if not self._stale():
+            return
+        signature = signature_of(self.store)
+        self._emails = SecondaryIndex(["email"])
+        self._records = {}
+        entries = {}
+        for customer_id, record in self.store.iter_records():
+            if not isinstance(record, dict):
+                continue
+            entry = _entry(record)
+            entries[customer_id] = entry
+            if entry["email"] is not None:
+                self._emails.add(customer_id, entry)
+            if self._copy:
+                self._records[customer_id] = record
+        self._names.rebuild(entries)
+        self._signature = signature
+
+    def _add(self, customer_id: str, record: Any) -> None:
+        """Index (or remove, for None/DELETED) one customer (lock held)."""
+        self._emails.remove(customer_id)
+        self._names.remove(customer_id)
+        self._records.pop(customer_id, None)
+        if record is None or record is DELETED or not isinstance(
+            record, dict
+        ):
+            return
+        entry = _entry(record)
+        if entry["email"] is not None:
+            self._emails.add(customer_id, entry)
+        self._names.add(customer_id, entry)
+        if self._copy:
+            self._records[customer_id] = record
+
+
+def _entry(record: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Return the normalized fields a customer is indexed under."""
+    return {
+        "email": normalize_email(record.get("email")),
+        "name": normalize_name(record.get("name")),
+    }
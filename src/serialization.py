@@ -0,0 +1,227 @@
+"""Pluggable codecs for FileStore snapshots.
+
+JSON files are recognised by their content; every other codec writes a
+header line (``MAGIC`` followed by the codec name), so a store reads any
+file no matter which codec it is configured to write. ``convert()``
+rewrites a file in place with another codec.
+
+Codecs:
+
+- ``json`` (default): pretty-printed JSON, as the store always wrote.
+- ``json-compact``: JSON without indentation.
+- ``orjson`` / ``msgspec-json``: fast JSON encoders, when installed.
+- ``msgpack``: MessagePack via msgspec, when installed.
+- ``marshal`` / ``pickle``: stdlib binary snapshots. Loading them can
+  execute code or crash on crafted input, so a file in one of these
+  formats is only decoded by a store configured to write it, or when the
+  caller trusts the codec explicitly (``trusted``); otherwise it is
+  rejected.
+
+Run:
+  python -m src.serialization data/reservations.json --codec marshal
+  python -m src.serialization data/reservations.json --trust marshal
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import marshal
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:  # Optional accelerators; the stdlib codecs always work.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+
+from src.durability import replace_file
+
+MAGIC = b"\x93HRS:"
+DEFAULT_CODEC = "json"
+
+# Codecs whose decoders are unsafe on untrusted input.
+UNSAFE_CODECS = frozenset({"marshal", "pickle"})
+
+
+class Codec:
+    """Named encoder/decoder pair, optionally behind a header line."""
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        binary: bool = False,
+    ) -> None:
+        """Create a codec; binary codecs get a ``MAGIC`` header."""
+        self.name = name
+        self.binary = binary
+        self.header = MAGIC + name.encode("ascii") + b"\n" if binary else b""
+        self._dumps = dumps
+        self._loads = loads
+
+    def encode(self, data: Any) -> bytes:
+        """Serialize ``data`` including the header."""
+        return self.header + self._dumps(data)
+
+    def decode(self, raw: bytes) -> Any:
+        """Deserialize bytes produced by encode().
+
+        Every failure is reported as ValueError.
+        """
+        if not raw.startswith(self.header):
+            raise ValueError(f"not a {self.name} file")
+        try:
+            return self._loads(raw[len(self.header):])
+        except ValueError:
+            raise
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            raise ValueError(f"invalid {self.name} data: {exc}") from exc
+
+
+# pylint: disable=no-member
+_FAST_JSON_ERRORS = (ValueError,) + (
+    (msgspec.DecodeError,) if msgspec is not None else ()
+)
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Decode JSON with the fastest available parser.
+
+    Inputs the fast parsers reject but json accepts (NaN, integers wider
+    than 64 bits) fall back to the stdlib parser.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(raw)
+        if msgspec is not None:
+            return msgspec.json.decode(raw)
+    except _FAST_JSON_ERRORS:
+        pass
+    return json.loads(raw)
+
+
+def _registry() -> Dict[str, Codec]:
+    """Return the codecs usable in this environment."""
+    codecs = [
+        Codec(
+            "json",
+            lambda data: json.dumps(data, indent=2).encode("utf-8"),
+            _json_loads,
+        ),
+        Codec(
+            "json-compact",
+            lambda data: json.dumps(
+                data, separators=(",", ":")
+            ).encode("utf-8"),
+            _json_loads,
+        ),
+        Codec("marshal", marshal.dumps, marshal.loads, binary=True),
+        Codec(
+            "pickle",
+            lambda data: pickle.dumps(data, pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+            binary=True,
+        ),
+    ]
+    if orjson is not None:
+        codecs.append(Codec("orjson", orjson.dumps, orjson.loads))
+    if msgspec is not None:
+        codecs.append(
+            Codec("msgspec-json", msgspec.json.encode, msgspec.json.decode)
+        )
+        codecs.append(
+            Codec(
+                "msgpack",
+                msgspec.msgpack.encode,
+                msgspec.msgpack.decode,
+                binary=True,
+            )
+        )
+    return {codec.name: codec for codec in codecs}
+# pylint: enable=no-member
+
+
+CODECS = _registry()
+
+
+def available_codecs() -> List[str]:
+    """Return the names of the codecs usable here."""
+    return sorted(CODECS)
+
+
+def get_codec(name: str) -> Codec:
+    """Return a codec by name; raise ValueError if unknown/unavailable."""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(
+            f"Unknown or unavailable codec: {name!r} "
+            f"(available: {', '.join(available_codecs())})"
+        )
+    return codec
+
+
+def is_json(raw: bytes) -> bool:
+    """Return True if ``raw`` has no codec header (plain JSON)."""
+    return not raw.startswith(MAGIC)
+
+
+def detect(raw: bytes) -> Codec:
+    """Return the codec that wrote ``raw``, judging by its header."""
+    if is_json(raw):
+        return CODECS[DEFAULT_CODEC]
+    name = raw[len(MAGIC):raw.find(b"\n")].decode("ascii", "replace")
+    return get_codec(name)
+
+
+def decode(raw: bytes, trusted: Iterable[str] = ()) -> Any:
+    """Deserialize ``raw`` with whichever codec wrote it.
+
+    Raises ValueError if that codec is in UNSAFE_CODECS but not listed
+    in ``trusted``.
+    """
+    codec = detect(raw)
+    if codec.name in UNSAFE_CODECS and codec.name not in trusted:
+        raise ValueError(f"refusing to decode untrusted {codec.name} data")
+    return codec.decode(raw)
+
+
+def convert(path: str, codec: str, trusted: Iterable[str] = ()) -> str:
+    """Rewrite the file at ``path`` with ``codec``; return the old codec.
+
+    ``trusted`` lists unsafe codecs the current file may be read with.
+    The new file is written beside the old one and renamed over it, so a
+    crash leaves either the old or the new file intact.
+    """
+    target = Path(path)
+    raw = target.read_bytes()
+    payload = get_codec(codec).encode(decode(raw, trusted))
+    replace_file(target, payload)
+    return detect(raw).name
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--codec", default=DEFAULT_CODEC,
+                        choices=available_codecs())
+    parser.add_argument("--trust", action="append", default=[],
+                        choices=sorted(UNSAFE_CODECS),
+                        help="allow reading files written by this codec")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        previous = convert(path, args.codec, args.trust)
+        print(f"{path}: {previous} -> {args.codec}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+"""HTTP/JSON API over the hotel, customer and reservation services.
+
+Built on the standard library only, so it runs offline:
+
+* each connection gets a lightweight reader thread, and HTTP/1.1
+  keep-alive lets a client reuse its connection for many requests (an
+  idle connection is closed after ``keep_alive`` seconds); the requests
+  themselves run on a fixed pool of worker threads, so idle connections
+  never hold a worker;
+* every worker shares one set of services over one cached store per
+  collection, guarded by a LockManager so concurrent writes are safe;
+* creates and cancellations go through a GroupCommitter, which folds the
+  requests that arrive while a commit is running into the next
+  create_many()/cancel_many() call, so a burst of bookings costs a few
+  file rewrites instead of one per request.
+
+Endpoints (``{kind}`` is hotels, customers or reservations)::
+
+    GET    /health, /stats        (liveness, group-commit counters)
+    GET    /{kind}?limit=&cursor=&order_by=&descending=&<field>=<value>
+    GET    /{kind}/{id}
+    POST   /{kind}                  (JSON body; Idempotency-Key header)
+    PATCH  /hotels/{id}, /customers/{id}    (If-Match: <version>)
+    DELETE /hotels/{id}, /customers/{id}
+    DELETE /reservations/{id}       (cancels the booking)
+
+Run with ``python -m src.server --config config.json --workers 8``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.backends import build_services, load_config
+from src.models import Customer, Hotel, Reservation
+from src.services import ItemResult
+
+Response = Tuple[int, Dict[str, Any]]
+
+MODELS = {"hotels": Hotel, "customers": Customer, "reservations": Reservation}
+
+
+@dataclass
+class Request:
+    """The parts of a request the routes need."""
+
+    item_id: Optional[str]
+    query: Dict[str, str]
+    body: bytes
+    headers: Dict[str, str]
+
+
+@dataclass
+class _Pending:
+    """One item waiting for a group commit."""
+
+    item: Any
+    result: Optional[ItemResult] = None
+    error: Optional[BaseException] = None
+    done: bool = False
+
+
+# pylint: disable-next=too-few-public-methods
+class GroupCommitter:
+    """Coalesces concurrent single-item writes into batch calls.
+
+    ``commit`` takes a list of items and returns one ItemResult per item
+    (e.g. ReservationService.create_many). The first caller becomes the
+    leader and commits everything queued, up to ``max_batch`` items;
+    callers that arrive meanwhile queue up and one of them leads the next
+    batch. With ``max_delay`` the leader also waits that many seconds for
+    more items before committing.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[List[Any]], List[ItemResult]],
+        max_batch: int = 256,
+        max_delay: float = 0.0,
+    ) -> None:
+        """Create a committer around a batch ``commit`` function."""
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        self.commit = commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {"items": 0, "batches": 0, "largest": 0}
+        self._cond = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._busy = False
+
+    def submit(self, item: Any) -> ItemResult:
+        """Queue ``item``, wait for its batch, and return its result.
+
+        An exception raised by the batch is re-raised in every caller.
+        """
+        pending = _Pending(item)
+        with self._cond:
+            self._queue.append(pending)
+            self._cond.notify_all()
+        while not pending.done:
+            batch = self._lead(pending)
+            if batch:
+                self._run(batch)
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self, pending: _Pending) -> List[_Pending]:
+        """Wait until ``pending`` is done or this caller should commit."""
+        with self._cond:
+            while self._busy and not pending.done:
+                self._cond.wait()
+            if pending.done:
+                return []
+            self._busy = True
+            deadline = time.monotonic() + self.max_delay
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            return batch
+
+    def _run(self, batch: List[_Pending]) -> None:
+        """Commit one batch and wake every waiting caller.
+
+        If the batch call raises, its items are retried one at a time so
+        the error reaches only the items that cause it.
+        """
+        try:
+            results = list(self.commit([entry.item for entry in batch]))
+            for entry, result in zip(batch, results):
+                entry.result = result
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            if len(batch) == 1:
+                batch[0].error = exc
+            else:
+                for entry in batch:
+                    self._run_one(entry)
+        with self._cond:
+            for entry in batch:
+                entry.done = True
+            self.stats["items"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest"] = max(self.stats["largest"], len(batch))
+            self._busy = False
+            self._cond.notify_all()
+
+    def _run_one(self, entry: _Pending) -> None:
+        """Commit a single item, keeping its result or error."""
+        try:
+            entry.result = self.commit([entry.item])[0]
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            entry.error = exc
+
+
+def _parse_value(raw: str) -> Any:
+    """Read a query-string value as JSON when possible, else as text."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+class Api:
+    """Routes decoded requests to the services.
+
+    ``handle`` takes the method, path, body and headers and returns
+    (status, JSON payload), so it can be used without a socket.
+    """
+
+    def __init__(
+        self,
+        services: Tuple[Any, Any, Any],
+        max_batch: int = 256,
+        max_delay: float = 0.0,
+    ) -> None:
+        """Wire the hotel, customer and reservation services."""
+        hotels, customers, reservations = services
+        self.services = {
+            "hotels": hotels,
+            "customers": customers,
+            "reservations": reservations,
+        }
+        batching = functools.partial(
+            GroupCommitter, max_batch=max_batch, max_delay=max_delay
+        )
+        self.creates = {
+            kind: batching(service.create_many)
+            for kind, service in self.services.items()
+        }
+        self.cancels = batching(reservations.cancel_many)
+        self._routes: Dict[Tuple[str, int], Callable[..., Response]] = {
+            ("GET", 1): self._list,
+            ("POST", 1): self._create,
+            ("GET", 2): self._get,
+            ("PATCH", 2): self._update,
+            ("DELETE", 2): self._delete,
+        }
+
+    def handle(
+        self,
+        method: str,
+        target: str,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Return the (status, payload) answer to one request."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return 200, {"ok": True}
+        if parts == ["stats"] and method == "GET":
+            return 200, self.stats()
+        if not parts or parts[0] not in self.services or len(parts) > 2:
+            return 404, {"error": "Not found."}
+
+        route = self._routes.get((method, len(parts)))
+        if route is None or (method, parts[0]) == ("PATCH", "reservations"):
+            return 405, {"error": "Method not allowed."}
+        request = Request(
+            parts[1] if len(parts) == 2 else None,
+            dict(parse_qsl(url.query)),
+            body,
+            {name.lower(): value for name, value in (headers or {}).items()},
+        )
+        try:
+            return route(parts[0], request)
+        except ValueError as exc:
+            return 400, {"error": str(exc)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return group-commit counters per write path."""
+        paths = {f"create_{kind}": c for kind, c in self.creates.items()}
+        paths["cancel_reservations"] = self.cancels
+        return {name: dict(c.stats) for name, c in paths.items()}
+
+    def _list(self, kind: str, request: Request) -> Response:
+        """Return one page of records; other params filter by equality."""
+        params = dict(request.query)
+        limit = int(params.pop("limit", 20))
+        cursor = params.pop("cursor", None)
+        order_by = params.pop("order_by", None)
+        descending = params.pop("descending", "false").lower() == "true"
+        where = {name: _parse_value(raw) for name, raw in params.items()}
+        page = self.services[kind].query(
+            where, order_by, descending, limit, cursor
+        )
+        return 200, {
+            "items": [record for _, record in page.items],
+            "next_cursor": page.next_cursor,
+        }
+
+    def _get(self, kind: str, request: Request) -> Response:
+        """Return one record or 404."""
+        item = self.services[kind].get(request.item_id)
+        if item is None:
+            return 404, {"error": "Not found."}
+        return 200, asdict(item)
+
+    def _create(self, kind: str, request: Request) -> Response:
+        """Create through the group committer, honoring idempotency."""
+        try:
+            item = MODELS[kind](
+                **_model_fields(MODELS[kind], _json_body(request.body))
+            )
+        except TypeError as exc:
+            return 400, {"error": f"Invalid {kind} payload: {exc}"}
+
+        outcome: Dict[str, Optional[str]] = {"error": None}
+
+        def create() -> bool:
+            result = self.creates[kind].submit(item)
+            outcome["error"] = result.message
+            return result.ok
+
+        ok = self.services[kind].idempotent(
+            request.headers.get("idempotency-key"), item, create
+        )
+        if not ok:
+            return 409, {"ok": False, "error": outcome["error"]}
+        return 201, {"ok": True, "item": asdict(item)}
+
+    def _update(self, kind: str, request: Request) -> Response:
+        """Apply a partial update, as compare-and-set with If-Match."""
+        expected = request.headers.get("if-match")
+        version = int(expected) if expected is not None else None
+        changes = _model_fields(MODELS[kind], _json_body(request.body))
+        result = self.services[kind].compare_and_set(
+            request.item_id, version, **changes
+        )
+        if result.ok:
+            return 200, {"ok": True, "version": result.version}
+        status = 404 if result.version is None else 409
+        return status, {
+            "ok": False, "version": result.version, "error": result.message
+        }
+
+    def _delete(self, kind: str, request: Request) -> Response:
+        """Delete a hotel/customer, or cancel a reservation."""
+        if kind == "reservations":
+            result = self.cancels.submit(request.item_id)
+        else:
+            result = self.services[kind].delete_many([request.item_id])[0]
+        if not result.ok:
+            return 404, {"ok": False, "error": result.message}
+        return 200, {"ok": True}
+
+
+def _model_fields(
+    model: type, data: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Check ``data`` against the fields of ``model``; return it coerced.
+
+    Integer fields also accept decimal strings. Raises ValueError for an
+    unknown field or a value of the wrong type.
+    """
+    hints = typing.get_type_hints(model)
+    fields = {}
+    for name, value in data.items():
+        if name not in hints:
+            raise ValueError(f"Unknown field: {name!r}.")
+        expected = hints[name]
+        if value is None and type(None) in typing.get_args(expected):
+            fields[name] = value
+            continue
+        kind = int if int in (expected, *typing.get_args(expected)) else str
+        if kind is int and isinstance(value, str) and (
+            value.strip().lstrip("-").isdigit()
+        ):
+            value = int(value)
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise ValueError(
+                f"Field {name!r} must be {kind.__name__}, "
+                f"not {type(value).__name__}."
+            )
+        fields[name] = value
+    return fields
+
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    """Decode a JSON object body; raise ValueError otherwise."""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError as exc:
+        raise ValueError(f"Invalid JSON body: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("JSON body must be an object.")
+    return data
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Keep-alive request handler that delegates to the server's Api."""
+
+    protocol_version = "HTTP/1.1"
+    server: "ApiServer"
+
+    def setup(self) -> None:
+        """Apply the server's idle timeout to the connection."""
+        self.timeout = self.server.keep_alive
+        super().setup()
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve a GET request."""
+        self._dispatch()
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Serve a POST request."""
+        self._dispatch()
+
+    def do_PATCH(self) -> None:  # pylint: disable=invalid-name
+        """Serve a PATCH request."""
+        self._dispatch()
+
+    def do_DELETE(self) -> None:  # pylint: disable=invalid-name
+        """Serve a DELETE request."""
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Read the body, run the request and write a JSON response."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            # The body cannot be framed, so the connection cannot be reused.
+            # pylint: disable-next=attribute-defined-outside-init
+            self.close_connection = True
+            self._reply(400, {"error": "Invalid Content-Length."})
+            return
+        body = self.rfile.read(length) if length > 0 else b""
+        try:
+            status, payload = self.server.run(
+                self.command, self.path, body, dict(self.headers.items())
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"[ERROR] {self.command} {self.path} failed: {exc}")
+            status, payload = 500, {"error": "Internal server error."}
+        self._reply(status, payload)
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        """Write a JSON response."""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    # pylint: disable-next=redefined-builtin
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests only when the server is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer(HTTPServer):
+    """HTTPServer that runs requests on a fixed worker pool.
+
+    Each connection is read by its own daemon thread, which hands every
+    complete request to the pool and writes back the answer.
+    """
+
+    daemon_threads = True
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        api: Api,
+        workers: int = 8,
+        keep_alive: float = 15.0,
+        verbose: bool = False,
+    ) -> None:
+        """Bind ``address`` and start ``workers`` request workers."""
+        super().__init__(address, ApiHandler)
+        self.api = api
+        self.keep_alive = keep_alive
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="api-worker"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Start a reader thread for the connection."""
+        threading.Thread(
+            target=self._serve,
+            args=(request, client_address),
+            name="api-connection",
+            daemon=True,
+        ).start()
+
+    def run(
+        self, method: str, target: str, body: bytes, headers: Dict[str, str]
+    ) -> Response:
+        """Run one request on a pool worker and return its response."""
+        return self.pool.submit(
+            self.api.handle, method, target, body, headers
+        ).result()
+
+    def _serve(self, request: Any, client_address: Any) -> None:
+        """Serve every request on one connection, then close it."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """Stop accepting connections and release the worker pool."""
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(
+    config: Dict[str, Any],
+    address: Tuple[str, int] = ("127.0.0.1", 8080),
+    workers: int = 8,
+    max_batch: int = 256,
+    max_delay: float = 0.0,
+) -> ApiServer:
+    """Build services from ``config`` and return a ready ApiServer.
+
+    JSON stores are opened with the cache on, and a LockManager under
+    ``lock_dir`` (default ``<data_dir>/.locks``) guards the shared stores.
+    """
+    config = dict(config)
+    config["cache"] = True
+    config.setdefault("lock_dir", None)
+    if not config["lock_dir"]:
+        config["lock_dir"] = str(Path(config.get("data_dir", "data"))
+                                 / ".locks")
+    api = Api(build_services(config), max_batch, max_delay)
+    return ApiServer(address, api, workers=workers)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Serve the API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay", type=float, default=0.0,
+                        help="seconds a batch leader waits for more writes")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = create_server(
+        load_config(args.config),
+        (args.host, args.port),
+        workers=args.workers,
+        max_batch=args.max_batch,
+        max_delay=args.max_delay,
+    )
+    server.verbose = args.verbose
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
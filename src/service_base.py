@@ -0,0 +1,387 @@
+"""Shared plumbing for the record services.
+
+_StreamingService gives every service bounded-memory iteration, paged
+queries and idempotent creates; _RecordService adds the CRUD and bulk
+operations HotelService and CustomerService share. The result types of
+bulk and compare-and-set calls live here too.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+from src.idempotency import IdempotencyCache, IdempotencyConflict, fingerprint
+from src.queries import Page, QueryViews
+from src.storage import VERSION_FIELD, FileStore, VersionConflict
+
+
+def _build(model: type, record: Any, label: str) -> Optional[Any]:
+    """Build a model from a stored record, or None if missing/invalid."""
+    if not isinstance(record, dict):
+        return None
+
+    try:
+        return model(**record)
+    except TypeError:
+        print(f"[WARN] {label} record malformed.")
+        return None
+
+
+@dataclass
+class ItemResult:
+    """Outcome of one item in a bulk operation."""
+
+    item_id: str
+    ok: bool
+    message: Optional[str] = None
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of a compare-and-set update.
+
+    ``version`` is the new version on success, the current version on a
+    conflict, and None when the record does not exist.
+    """
+
+    ok: bool
+    version: Optional[int]
+    message: Optional[str] = None
+
+
+def _chunked(items: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterator into lists of at most ``size`` items."""
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _StreamingService:
+    """Bounded-memory iteration shared by every service.
+
+    Records come from ``store.iter_records()``, which streams from disk or
+    pages through the database instead of materializing list_all().
+    """
+
+    model: type
+    label = "Record"
+    id_field = "id"
+    store: Any
+    idempotency: Optional[IdempotencyCache]
+    _views: QueryViews
+
+    def iter_all(
+        self, typed: bool = False, chunk_size: Optional[int] = None
+    ) -> Iterator[Any]:
+        """Yield every record incrementally.
+
+        Items are (id, record) pairs, or model objects when ``typed`` (a
+        malformed record is skipped with a warning). With ``chunk_size``
+        the items are yielded in lists of that many.
+        """
+        return self.iter_filtered(None, typed, chunk_size)
+
+    def iter_filtered(
+        self,
+        predicate: Optional[Callable[[Any], bool]],
+        typed: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Yield the records for which ``predicate`` is true.
+
+        The predicate receives the record dict, or the model when
+        ``typed``; items are shaped as in iter_all().
+        """
+        items = self._iter_items(predicate, typed)
+        if chunk_size is not None:
+            if chunk_size < 1:
+                raise ValueError("chunk_size must be positive")
+            return _chunked(items, chunk_size)
+        return items
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def query(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        typed: bool = False,
+    ) -> Page:
+        """Return one page of records matching ``where``.
+
+        ``where`` maps fields to a value or to {operator: value} using the
+        operators in src.queries. Results are sorted by ``order_by`` (ties
+        by id); without it, by the first filtered field, else by id. Pass
+        the returned ``next_cursor`` back to get the following page.
+
+        Raises ValueError for an unknown operator, a malformed cursor or a
+        non-positive limit.
+        """
+        if order_by is None:
+            order_by = next(iter(where or {}), self.id_field)
+        pairs, next_cursor = self._views.query(
+            where, order_by, descending, limit, cursor
+        )
+        items: List[Any] = pairs
+        if typed:
+            built = (_build(self.model, record, self.label)
+                     for _, record in pairs)
+            items = [item for item in built if item is not None]
+        return Page(items, next_cursor)
+
+    def idempotent(
+        self, key: Optional[str], item: Any, operation: Callable[[], bool]
+    ) -> bool:
+        """Run a create, or replay its result if ``key`` was seen before.
+
+        ``operation`` performs the create for ``item`` and returns whether
+        it succeeded; callers such as the HTTP server pass their own
+        (batched) variant. Raises ValueError if a key is given but the
+        service has no IdempotencyCache.
+        """
+        if key is None:
+            return operation()
+        if self.idempotency is None:
+            raise ValueError("idempotency_key needs an IdempotencyCache")
+        try:
+            return self.idempotency.run(
+                f"{self.label}:{key}", operation, fingerprint(asdict(item))
+            )
+        except IdempotencyConflict:
+            print("[ERROR] Idempotency key reused for another request.")
+            return False
+
+    def _iter_items(
+        self, predicate: Optional[Callable[[Any], bool]], typed: bool
+    ) -> Iterator[Any]:
+        """Stream matching items from the store."""
+        for item_id, record in self.store.iter_records():
+            item: Any = (item_id, record)
+            if typed:
+                item = _build(self.model, record, self.label)
+                if item is None:
+                    continue
+            if predicate is None or predicate(item if typed else record):
+                yield item
+
+
+class _RecordService(_StreamingService):
+    """CRUD operations shared by the hotel and customer services."""
+
+    def __init__(
+        self,
+        store: FileStore,
+        idempotency: Optional[IdempotencyCache] = None,
+    ) -> None:
+        self.store = store
+        self.idempotency = idempotency
+        self._views = QueryViews(store)
+
+    def _check_new(self, records: Dict[str, Any], item: Any) -> Optional[str]:
+        """Return why ``item`` cannot be created, or None if it can."""
+        if getattr(item, self.id_field) in records:
+            return f"{self.label} already exists."
+        return self._validate(item)
+
+    def _apply_changes(
+        self, records: Dict[str, Any], item_id: str, changes: Dict[str, Any]
+    ) -> Optional[str]:
+        """Merge changes into a loaded record; return an error on failure."""
+        if item_id not in records:
+            return f"{self.label} not found."
+
+        record = records[item_id]
+        if not isinstance(record, dict):
+            return f"{self.label} record invalid."
+
+        record.update(changes)
+        record[VERSION_FIELD] = record.get(VERSION_FIELD, 0) + 1
+        records[item_id] = record
+        return None
+
+    def _validate(self, item: Any) -> Optional[str]:
+        """Return why ``item`` is invalid, or None if it is valid."""
+        if not getattr(item, self.id_field, None):
+            return f"{self.label} id is required."
+        return None
+
+    def _changed(self, records: Dict[str, Any]) -> None:
+        """Hook called with {id: record or None} after each mutation."""
+
+    @contextmanager
+    def _mutation(self) -> Iterator[Dict[str, Any]]:
+        """Collect {id: record or None} changes for the query views.
+
+        Whether the views were current is checked before the write, so a
+        concurrent external change still triggers a rebuild.
+        """
+        views = self._tracked()
+        in_sync = [view.in_sync() for view in views]
+        changes: Dict[str, Any] = {}
+        try:
+            yield changes
+        except BaseException:
+            for view in views:
+                view.invalidate()
+            raise
+        if changes:
+            for view, fresh in zip(views, in_sync):
+                view.apply(changes, fresh)
+            self._changed(changes)
+
+    def _tracked(self) -> List[Any]:
+        """Return the in-memory views that mutations must keep current."""
+        return [self._views]
+
+    def _create(self, item: Any) -> bool:
+        """Create a new record if it doesn't exist and is valid."""
+        item_id = getattr(item, self.id_field)
+        error = self._validate(item)
+        with self._mutation() as changed:
+            if error is None and not self.store.put_record(
+                item_id, asdict(item), overwrite=False
+            ):
+                error = f"{self.label} already exists."
+            if error is not None:
+                print(f"[ERROR] {error}")
+                return False
+            changed[item_id] = asdict(item)
+        return True
+
+    def _get(self, item_id: str) -> Optional[Any]:
+        """Return a model by id, or None if not found/invalid."""
+        record = self.store.get_record(item_id)
+        return _build(self.model, record, self.label)
+
+    def delete(self, item_id: str) -> bool:
+        """Delete a record by id."""
+        with self._mutation() as changed:
+            if not self.store.delete_record(item_id):
+                print(f"[ERROR] {self.label} not found.")
+                return False
+            changed[item_id] = None
+        return True
+
+    def update(self, item_id: str, **changes) -> bool:
+        """Update an existing record with partial changes."""
+        result = self.compare_and_set(item_id, None, **changes)
+        if not result.ok:
+            print(f"[ERROR] {result.message}")
+        return result.ok
+
+    def compare_and_set(
+        self, item_id: str, expected_version: Optional[int], **changes
+    ) -> UpdateResult:
+        """Apply changes only if the record is still at expected_version.
+
+        Readers never block; a writer that loses the race gets the current
+        version back and can re-read and retry. ``None`` skips the check.
+        """
+        changes.pop(VERSION_FIELD, None)
+        with self._mutation() as changed:
+            try:
+                record = self.store.update_record(
+                    item_id,
+                    changes,
+                    expected_version=expected_version,
+                    bump_version=True,
+                )
+            except KeyError:
+                return UpdateResult(False, None, f"{self.label} not found.")
+            except TypeError:
+                return UpdateResult(
+                    False, None, f"{self.label} record invalid."
+                )
+            except VersionConflict as conflict:
+                return UpdateResult(
+                    False, conflict.current, f"{self.label} version conflict."
+                )
+            changed[item_id] = record
+        return UpdateResult(True, record[VERSION_FIELD])
+
+    def list_all(self) -> Dict[str, dict]:
+        """Return all records as a dict."""
+        data = self.store.load()
+        return data if isinstance(data, dict) else {}
+
+    def create_many(self, items: Iterable[Any]) -> List[ItemResult]:
+        """Create several records with one load and one save."""
+        with self._mutation() as changed, self.store.atomic():
+            records = self.store.load()
+            results = []
+            for item in items:
+                item_id = getattr(item, self.id_field)
+                error = self._check_new(records, item)
+                if error is None:
+                    records[item_id] = asdict(item)
+                results.append(ItemResult(item_id, error is None, error))
+
+            if any(result.ok for result in results):
+                self.store.save(records)
+            changed.update(
+                (result.item_id, records.get(result.item_id))
+                for result in results
+                if result.ok
+            )
+        return results
+
+    def update_many(
+        self, changes: Dict[str, Dict[str, Any]]
+    ) -> List[ItemResult]:
+        """Apply partial changes to several records in one save."""
+        with self._mutation() as changed, self.store.atomic():
+            records = self.store.load()
+            results = []
+            for item_id, item_changes in changes.items():
+                error = self._apply_changes(
+                    records, item_id, dict(item_changes)
+                )
+                results.append(ItemResult(item_id, error is None, error))
+
+            if any(result.ok for result in results):
+                self.store.save(records)
+            changed.update(
+                (result.item_id, records.get(result.item_id))
+                for result in results
+                if result.ok
+            )
+        return results
+
+    def delete_many(self, item_ids: Iterable[str]) -> List[ItemResult]:
+        """Delete several records with one load and one save."""
+        with self._mutation() as changed, self.store.atomic():
+            records = self.store.load()
+            results = []
+            for item_id in item_ids:
+                if item_id in records:
+                    del records[item_id]
+                    results.append(ItemResult(item_id, True))
+                else:
+                    message = f"{self.label} not found."
+                    results.append(ItemResult(item_id, False, message))
+
+            if any(result.ok for result in results):
+                self.store.save(records)
+            changed.update(
+                (result.item_id, records.get(result.item_id))
+                for result in results
+                if result.ok
+            )
+        return results
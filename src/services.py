@@ -2,195 +2,365 @@
 Business services for hotels, customers, and reservations.
 
 These services use FileStore for persistence and provide CRUD operations
-plus reservation logic with basic validations.
+plus reservation logic with basic validations. The shared base classes
+and result types are in src.service_base.
 """
 
 from __future__ import annotations
 
+import functools
+import threading
+from datetime import date
+from contextlib import contextmanager, nullcontext
 from dataclasses import asdict
-from typing import Dict, Optional
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from src.archive import ReservationArchive, archivable
+from src.compact import ReservationTable
+from src.idempotency import IdempotencyCache
+from src.indexes import SecondaryIndex
+from src.inventory import RoomNights, stay_nights
+from src.ledger import EventLedger
+from src.locking import LockManager
 from src.models import Customer, Hotel, Reservation
-from src.storage import FileStore
-
-
-class HotelService:
+from src.queries import QueryViews
+from src.search import CustomerSearch, normalize_email
+from src.service_base import (
+    ItemResult,
+    UpdateResult,
+    _build,
+    _RecordService,
+    _StreamingService,
+)
+from src.sharding import ShardedStore
+from src.storage import (
+    DELETED,
+    VERSION_FIELD,
+    FileStore,
+    VersionConflict,
+    signature_of,
+)
+from src.transactions import UnitOfWork, recover
+
+_UNBUILT = object()
+
+# Attempts a booking transaction gets before a version conflict is final.
+_CONFLICT_RETRIES = 10
+
+
+class HotelService(_RecordService):
     """Service for managing Hotel records."""
 
-    def __init__(self, store: FileStore) -> None:
-        self.store = store
+    model = Hotel
+    label = "Hotel"
+    id_field = "hotel_id"
 
-    def create(self, hotel: Hotel) -> bool:
-        """Create a new hotel if it doesn't exist and values are valid."""
-        hotels = self.store.load()
-        if hotel.hotel_id in hotels:
-            print("[ERROR] Hotel already exists.")
-            return False
-        if hotel.rooms_total < 0 or hotel.rooms_available < 0:
-            print("[ERROR] Invalid room values.")
-            return False
+    def __init__(
+        self,
+        store: FileStore,
+        ledger: Optional[EventLedger] = None,
+        idempotency: Optional[IdempotencyCache] = None,
+    ) -> None:
+        super().__init__(store, idempotency)
+        self.ledger = ledger
+
+    def _changed(self, records: Dict[str, Any]) -> None:
+        """Record HotelUpdated/HotelDeleted events in the ledger."""
+        if self.ledger is None or not records:
+            return
+        self.ledger.append_many(
+            ("HotelUpdated", record)
+            if isinstance(record, dict)
+            else ("HotelDeleted", {"hotel_id": hotel_id})
+            for hotel_id, record in records.items()
+        )
 
-        hotels[hotel.hotel_id] = asdict(hotel)
-        self.store.save(hotels)
-        return True
+    def _validate(self, item: Any) -> Optional[str]:
+        """Reject missing ids and negative room values."""
+        error = super()._validate(item)
+        if error is None and (
+            item.rooms_total < 0 or item.rooms_available < 0
+        ):
+            error = "Invalid room values."
+        return error
+
+    def create(
+        self, hotel: Hotel, idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Create a new hotel if it doesn't exist and values are valid.
+
+        A retry with the same ``idempotency_key`` returns the first result.
+        """
+        return self.idempotent(
+            idempotency_key, hotel, functools.partial(self._create, hotel)
+        )
 
     def get(self, hotel_id: str) -> Optional[Hotel]:
         """Return a Hotel by id, or None if not found/invalid."""
-        hotels = self.store.load()
-        record = hotels.get(hotel_id)
-        if not isinstance(record, dict):
-            return None
+        return self._get(hotel_id)
 
-        try:
-            return Hotel(**record)
-        except TypeError:
-            print("[WARN] Hotel record malformed.")
-            return None
 
-    def delete(self, hotel_id: str) -> bool:
-        """Delete a hotel by id."""
-        hotels = self.store.load()
-        if hotel_id not in hotels:
-            print("[ERROR] Hotel not found.")
-            return False
-
-        del hotels[hotel_id]
-        self.store.save(hotels)
-        return True
-
-    def update(self, hotel_id: str, **changes) -> bool:
-        """Update an existing hotel record with partial changes."""
-        hotels = self.store.load()
-        if hotel_id not in hotels:
-            print("[ERROR] Hotel not found.")
-            return False
-
-        record = hotels[hotel_id]
-        if not isinstance(record, dict):
-            print("[ERROR] Hotel record invalid.")
-            return False
+class CustomerService(_RecordService):
+    """Service for managing Customer records.
 
-        record.update(changes)
-        hotels[hotel_id] = record
-        self.store.save(hotels)
-        return True
-
-    def list_all(self) -> Dict[str, dict]:
-        """Return all hotels as a dict."""
-        data = self.store.load()
-        return data if isinstance(data, dict) else {}
+    Customers can be found by email (compared trimmed and case-folded)
+    and by name prefix through in-memory indexes (see src.search). With
+    ``unique_email`` a create or update that would give a second
+    customer the same email is rejected.
+    """
 
+    model = Customer
+    label = "Customer"
+    id_field = "customer_id"
 
-class CustomerService:
-    """Service for managing Customer records."""
+    def __init__(
+        self,
+        store: FileStore,
+        idempotency: Optional[IdempotencyCache] = None,
+        unique_email: bool = False,
+    ) -> None:
+        super().__init__(store, idempotency)
+        self.unique_email = unique_email
+        self._search = CustomerSearch(store)
+
+    def _tracked(self) -> List[Any]:
+        """Keep the email and name indexes current as well."""
+        return [self._views, self._search]
+
+    def _validate(self, item: Any) -> Optional[str]:
+        """Reject missing ids and, if unique, emails already in use."""
+        error = super()._validate(item)
+        if error is None:
+            error = self._email_error(item.customer_id, item.email)
+        return error
+
+    def _email_error(
+        self,
+        customer_id: str,
+        email: Any,
+        claimed: Optional[Dict[str, str]] = None,
+    ) -> Optional[str]:
+        """Return an error if ``email`` belongs to another customer.
+
+        ``claimed`` maps emails taken earlier in the same batch to their
+        customer and is updated when the email is free.
+        """
+        key = normalize_email(email)
+        if not self.unique_email or key is None:
+            return None
+        owners = set(self._search.owners(key))
+        if claimed is not None and key in claimed:
+            owners.add(claimed[key])
+        owners.discard(customer_id)
+        if owners:
+            return "Customer email already in use."
+        if claimed is not None:
+            claimed[key] = customer_id
+        return None
+
+    def _create(self, item: Any) -> bool:
+        """Create a customer, checking email uniqueness under the lock."""
+        with self.store.atomic():
+            return super()._create(item)
+
+    def compare_and_set(
+        self, item_id: str, expected_version: Optional[int], **changes
+    ) -> UpdateResult:
+        """Apply changes at ``expected_version``; keep emails unique."""
+        with self.store.atomic():
+            if "email" in changes:
+                error = self._email_error(item_id, changes["email"])
+                if error is not None:
+                    return UpdateResult(False, None, error)
+            return super().compare_and_set(
+                item_id, expected_version, **changes
+            )
+
+    def create_many(self, items: Iterable[Any]) -> List[ItemResult]:
+        """Create several customers; a batch cannot reuse one email."""
+        items = list(items)
+        with self.store.atomic():
+            rejected = self._email_conflicts(
+                (item.customer_id, item.email) for item in items
+            )
+            created = iter(super().create_many(
+                item for position, item in enumerate(items)
+                if position not in rejected
+            ))
+            return [rejected.get(position) or next(created)
+                    for position in range(len(items))]
+
+    def update_many(
+        self, changes: Dict[str, Dict[str, Any]]
+    ) -> List[ItemResult]:
+        """Apply partial changes; a batch cannot reuse one email."""
+        pairs = list(changes.items())
+        with self.store.atomic():
+            rejected = self._email_conflicts(
+                (item_id, item_changes.get("email"))
+                for item_id, item_changes in pairs
+            )
+            updated = iter(super().update_many({
+                item_id: item_changes
+                for position, (item_id, item_changes) in enumerate(pairs)
+                if position not in rejected
+            }))
+            return [rejected.get(position) or next(updated)
+                    for position in range(len(pairs))]
+
+    def _email_conflicts(
+        self, emails: Iterable[Tuple[str, Any]]
+    ) -> Dict[int, ItemResult]:
+        """Return failed results, by position, for emails already taken."""
+        claimed: Dict[str, str] = {}
+        rejected = {}
+        for position, (customer_id, email) in enumerate(emails):
+            error = self._email_error(customer_id, email, claimed)
+            if error is not None:
+                rejected[position] = ItemResult(customer_id, False, error)
+        return rejected
+
+    def find_by_email(self, email: str) -> List[Customer]:
+        """Return the customers whose email matches (trimmed, any case)."""
+        return self._typed(self._search.by_email(email))
+
+    def search_by_name(self, prefix: str, limit: int = 10) -> List[Customer]:
+        """Return up to ``limit`` customers whose name starts with prefix.
+
+        Matching ignores case, accents and repeated spaces; results are
+        ordered by name. Raises ValueError for a non-positive limit.
+        """
+        return self._typed(self._search.by_name_prefix(prefix, limit))
 
-    def __init__(self, store: FileStore) -> None:
-        self.store = store
+    def _typed(self, pairs: List[Tuple[str, Any]]) -> List[Customer]:
+        """Build Customer objects, skipping malformed records."""
+        built = (_build(Customer, record, self.label) for _, record in pairs)
+        return [customer for customer in built if customer is not None]
 
-    def create(self, customer: Customer) -> bool:
-        """Create a new customer if it doesn't exist."""
-        customers = self.store.load()
-        if customer.customer_id in customers:
-            print("[ERROR] Customer already exists.")
-            return False
+    def create(
+        self, customer: Customer, idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Create a new customer if it doesn't exist.
 
-        customers[customer.customer_id] = asdict(customer)
-        self.store.save(customers)
-        return True
+        A retry with the same ``idempotency_key`` returns the first result.
+        """
+        return self.idempotent(
+            idempotency_key,
+            customer,
+            functools.partial(self._create, customer),
+        )
 
     def get(self, customer_id: str) -> Optional[Customer]:
         """Return a Customer by id, or None if not found/invalid."""
-        customers = self.store.load()
-        record = customers.get(customer_id)
-        if not isinstance(record, dict):
-            return None
-
-        try:
-            return Customer(**record)
-        except TypeError:
-            print("[WARN] Customer record malformed.")
-            return None
+        return self._get(customer_id)
 
-    def delete(self, customer_id: str) -> bool:
-        """Delete a customer by id."""
-        customers = self.store.load()
-        if customer_id not in customers:
-            print("[ERROR] Customer not found.")
-            return False
 
-        del customers[customer_id]
-        self.store.save(customers)
-        return True
-
-    def update(self, customer_id: str, **changes) -> bool:
-        """Update an existing customer record with partial changes."""
-        customers = self.store.load()
-        if customer_id not in customers:
-            print("[ERROR] Customer not found.")
-            return False
-
-        record = customers[customer_id]
-        if not isinstance(record, dict):
-            print("[ERROR] Customer record invalid.")
-            return False
-
-        record.update(changes)
-        customers[customer_id] = record
-        self.store.save(customers)
-        return True
-
-    def list_all(self) -> Dict[str, dict]:
-        """Return all customers as a dict."""
-        data = self.store.load()
-        return data if isinstance(data, dict) else {}
-
-
-class ReservationService:
+# pylint: disable-next=too-many-instance-attributes
+class ReservationService(_StreamingService):
     """
 Service for managing Reservation records and
 room availability updates.
+
+Each booking runs in a UnitOfWork, so every store is read at most once
+and the hotel and reservation files are committed together; with an
+EventLedger, the changes are appended as events by the same commit (and
+by recovery, if it was interrupted). Secondary
+indexes on hotel_id, customer_id and status are built on first query and
+then kept up to date by create/cancel, as are the sorted views behind
+query().
+
+With a LockManager, bookings take a per-hotel lock (threads and
+processes) around the availability check, and whole-file stores take a
+short store lock for the final read-merge-write, so concurrent workers
+cannot overbook.
+
+Undated reservations take a room off the hotel's ``rooms_available``
+counter and hold it on every night. Dated reservations are checked
+against a per-hotel RoomNights tree whose nightly capacity is that
+counter, so the two kinds never overbook each other; the trees are
+rebuilt and maintained together with the secondary indexes.
+
+With a ReservationArchive, archive_inactive() moves canceled (and
+optionally completed) reservations out of the store; get() still finds
+them, but the indexes, queries and list_all() cover the store only.
 """
 
+    model = Reservation
+    label = "Reservation"
+    id_field = "reservation_id"
+    INDEXED_FIELDS = ("hotel_id", "customer_id", "status")
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
     def __init__(
         self,
         reservations_store: FileStore,
         hotel_service: HotelService,
         customer_service: CustomerService,
+        locks: Optional[LockManager] = None,
+        ledger: Optional[EventLedger] = None,
+        idempotency: Optional[IdempotencyCache] = None,
+        archive: Optional[ReservationArchive] = None,
     ) -> None:
         self.store = reservations_store
         self.hotels = hotel_service
         self.customers = customer_service
+        self.locks = locks
+        self.ledger = ledger
+        self.idempotency = idempotency
+        self.archive = archive
+        if locks is not None:
+            for store in (self.store, hotel_service.store,
+                          customer_service.store):
+                locks.guard(store)
+        self._index = SecondaryIndex(self.INDEXED_FIELDS)
+        self._views = QueryViews(reservations_store)
+        self._index_signature: Any = _UNBUILT
+        self._index_lock = threading.RLock()
+        self._nights: Dict[str, RoomNights] = {}
+        self._stays: Dict[str, Tuple[str, int, int]] = {}
+        # Commit intents live next to the reservations file; that is the
+        # one directory recover() has to scan.
+        self._intent_dir: Optional[str] = None
+        if isinstance(self.store, (FileStore, ShardedStore)):
+            self._intent_dir = str(self.store.path.parent)
+            recover(self._intent_dir, ledger)
+
+    def create(
+        self,
+        reservation: Reservation,
+        idempotency_key: Optional[str] = None,
+    ) -> bool:
+        """Create a reservation if ids exist and rooms are available.
 
-    def create(self, reservation: Reservation) -> bool:
-        """Create a reservation if ids exist and rooms are available."""
-        reservations = self.store.load()
-        if reservation.reservation_id in reservations:
-            print("[ERROR] Reservation already exists.")
-            return False
-
-        hotel = self.hotels.get(reservation.hotel_id)
-        if hotel is None:
-            print("[ERROR] Hotel not found.")
-            return False
+        A retry with the same ``idempotency_key`` returns the first result
+        without reading or writing any store.
+        """
+        return self.idempotent(
+            idempotency_key,
+            reservation,
+            functools.partial(self._create, reservation),
+        )
 
-        customer = self.customers.get(reservation.customer_id)
-        if customer is None:
-            print("[ERROR] Customer not found.")
-            return False
+    def _create(self, reservation: Reservation) -> bool:
+        """Book one reservation in a transaction."""
+        def attempt() -> Optional[str]:
+            with self._transaction() as uow:
+                return self._book(uow, reservation, [])
 
-        if not hotel.reserve_room():
-            print("[ERROR] No rooms available.")
+        with self._hotel_locks([reservation.hotel_id]):
+            error = self._retrying(attempt, _conflict_message)
+        if error is not None:
+            print(f"[ERROR] {error}")
             return False
-
-        self.hotels.update(
-            hotel.hotel_id,
-            rooms_total=hotel.rooms_total,
-            rooms_available=hotel.rooms_available,
-            name=hotel.name,
-        )
-
-        reservations[reservation.reservation_id] = asdict(reservation)
-        self.store.save(reservations)
         return True
 
     def cancel(self, reservation_id: str) -> bool:
@@ -198,41 +368,455 @@ room availability updates.
         Cancel an existing reservation and release a room
         back to the hotel.
         """
-        reservations = self.store.load()
-        record = reservations.get(reservation_id)
+        hotel_ids = self._hotels_of([reservation_id])
+
+        def attempt() -> Tuple[bool, Optional[str]]:
+            with self._transaction() as uow:
+                return self._release(uow, reservation_id)
+
+        with self._hotel_locks(hotel_ids):
+            ok, message = self._retrying(
+                attempt, lambda conflict: (False, _conflict_message(conflict))
+            )
+        if message is not None:
+            print(f"[{'WARN' if ok else 'ERROR'}] {message}")
+        return ok
+
+    def create_many(
+        self, reservations: Iterable[Reservation]
+    ) -> List[ItemResult]:
+        """Book several reservations in a single transaction.
+
+        Room decrements accumulate, so several bookings for the same
+        hotel in one batch see each other's effect.
+        """
+        reservations = list(reservations)
+        hotel_ids = [reservation.hotel_id for reservation in reservations]
+
+        def attempt() -> List[ItemResult]:
+            results = []
+            staged: List[Tuple[str, int, int]] = []
+            with self._transaction() as uow:
+                for reservation in reservations:
+                    item_id = reservation.reservation_id
+                    error = self._book(uow, reservation, staged)
+                    results.append(ItemResult(item_id, error is None, error))
+            return results
+
+        with self._hotel_locks(hotel_ids):
+            return self._retrying(attempt, lambda conflict: [
+                ItemResult(reservation.reservation_id, False,
+                           _conflict_message(conflict))
+                for reservation in reservations
+            ])
+
+    def cancel_many(self, reservation_ids: Iterable[str]) -> List[ItemResult]:
+        """Cancel several reservations in a single transaction."""
+        reservation_ids = list(reservation_ids)
+        hotel_ids = self._hotels_of(reservation_ids)
+
+        def attempt() -> List[ItemResult]:
+            results = []
+            with self._transaction() as uow:
+                for reservation_id in reservation_ids:
+                    ok, message = self._release(uow, reservation_id)
+                    results.append(ItemResult(reservation_id, ok, message))
+            return results
+
+        with self._hotel_locks(hotel_ids):
+            return self._retrying(attempt, lambda conflict: [
+                ItemResult(reservation_id, False, _conflict_message(conflict))
+                for reservation_id in reservation_ids
+            ])
+
+    def list_all(self) -> Dict[str, dict]:
+        """Return all reservations as a dict."""
+        data = self.store.load()
+        return data if isinstance(data, dict) else {}
+
+    def load_table(self) -> ReservationTable:
+        """Stream every reservation into a compact columnar table."""
+        return ReservationTable.from_records(self.store.iter_records())
+
+    def get(self, reservation_id: str) -> Optional[Reservation]:
+        """Return a Reservation by id, or None if not found/invalid.
+
+        Reservations missing from the store are looked up in the archive,
+        if there is one.
+        """
+        record = self.store.get_record(reservation_id)
+        if record is None and self.archive is not None:
+            record = self.archive.get(reservation_id)
+        return _build(Reservation, record, "Reservation")
+
+    def archive_inactive(
+        self, include_completed: bool = False, today: Optional[str] = None
+    ) -> int:
+        """Move canceled reservations to the archive; return how many.
+
+        With ``include_completed``, active dated reservations whose
+        check-out is on or before ``today`` (ISO date, default today) move
+        too. Records are archived before they leave the store, and a
+        record changed in between stays in the store. Raises ValueError
+        if the service has no archive.
+        """
+        if self.archive is None:
+            raise ValueError("archive_inactive needs a ReservationArchive")
+        today = today or date.today().isoformat()
+        candidates = {
+            reservation_id: record
+            for reservation_id, record in self.store.iter_records()
+            if archivable(record, include_completed, today)
+        }
+        self.archive.add(candidates)
+
+        def attempt() -> int:
+            moved = 0
+            with self._transaction() as uow:
+                for reservation_id, record in candidates.items():
+                    if uow.get(self.store, reservation_id) == record:
+                        uow.delete(self.store, reservation_id)
+                        moved += 1
+            return moved
+
+        return self._retrying(attempt, lambda conflict: 0)
+
+    def availability(
+        self, hotel_id: str, check_in: str, check_out: str
+    ) -> Optional[int]:
+        """Return the fewest free rooms on any night of the stay.
+
+        Returns None if the hotel does not exist or the dates are invalid.
+        """
+        try:
+            stay = stay_nights(check_in, check_out)
+        except (TypeError, ValueError) as exc:
+            print(f"[ERROR] Invalid stay dates: {exc}.")
+            return None
+        hotel = self.hotels.get(hotel_id)
+        if hotel is None or stay is None:
+            return None
+        with self._index_lock:
+            self._current_index()
+            nights = self._nights.get(hotel_id, RoomNights())
+            return nights.min_available(hotel.rooms_available, *stay)
+
+    def can_book(
+        self, hotel_id: str, check_in: str, check_out: str, rooms: int = 1
+    ) -> bool:
+        """Return True if ``rooms`` are free on every night of the stay."""
+        available = self.availability(hotel_id, check_in, check_out)
+        return available is not None and available >= rooms
+
+    def find_by_hotel(
+        self, hotel_id: str, status: Optional[str] = None
+    ) -> List[str]:
+        """Return reservation ids for a hotel, optionally by status."""
+        return self._find("hotel_id", hotel_id, status)
+
+    def find_by_customer(
+        self, customer_id: str, status: Optional[str] = None
+    ) -> List[str]:
+        """Return reservation ids for a customer, optionally by status."""
+        return self._find("customer_id", customer_id, status)
+
+    def find_by_status(self, status: str) -> List[str]:
+        """Return reservation ids with the given status."""
+        with self._index_lock:
+            return sorted(self._current_index().lookup("status", status))
+
+    def _find(
+        self, field: str, value: str, status: Optional[str]
+    ) -> List[str]:
+        """Look up ``field == value`` and intersect with ``status``."""
+        with self._index_lock:
+            index = self._current_index()
+            ids = index.lookup(field, value)
+            if status is not None:
+                by_status = index.lookup("status", status)
+                small, large = sorted((ids, by_status), key=len)
+                ids = {item for item in small if item in large}
+            return sorted(ids)
+
+    def _current_index(self) -> SecondaryIndex:
+        """Return the index, rebuilding it if the store changed."""
+        signature = signature_of(self.store)
+        if self._index_signature is _UNBUILT or (
+            signature != self._index_signature
+        ):
+            self._nights.clear()
+            self._stays.clear()
+            self._index.rebuild(
+                self._counting_stays(self.store.iter_records())
+            )
+            self._index_signature = signature
+        return self._index
+
+    def _counting_stays(
+        self, records: Iterable[Tuple[str, Any]]
+    ) -> Iterator[Tuple[str, Any]]:
+        """Pass records through while adding their stays to the trees."""
+        for key, record in records:
+            self._count_stay(key, record)
+            yield key, record
+
+    def _count_stay(self, reservation_id: str, record: Any) -> None:
+        """Make the night trees reflect ``record`` (None if deleted)."""
+        previous = self._stays.pop(reservation_id, None)
+        if previous is not None:
+            hotel_id, start, end = previous
+            self._nights[hotel_id].add(start, end, -1)
+
+        if not isinstance(record, dict) or record.get("status") != "ACTIVE":
+            return
+        try:
+            stay = stay_nights(record.get("check_in"), record.get("check_out"))
+        except (TypeError, ValueError):
+            return
+        if stay is None:
+            return
+        hotel_id = record.get("hotel_id")
+        self._nights.setdefault(hotel_id, RoomNights()).add(*stay, 1)
+        self._stays[reservation_id] = (hotel_id, *stay)
+
+    def _nights_free(
+        self,
+        hotel: Hotel,
+        stay: Optional[Tuple[int, int]],
+        staged: List[Tuple[str, int, int]],
+    ) -> bool:
+        """Check a stay against stored and ``staged`` bookings.
+
+        Rooms held by undated stays are already off ``rooms_available``;
+        an undated stay (``stay`` None) needs a room free on every night
+        from today on.
+        """
+        with self._index_lock:
+            self._current_index()
+            nights = self._nights.setdefault(hotel.hotel_id, RoomNights())
+            pending = [
+                (start, end)
+                for hotel_id, start, end in staged
+                if hotel_id == hotel.hotel_id
+            ]
+            for start, end in pending:
+                nights.add(start, end, 1)
+            try:
+                if stay is None:
+                    today = date.today().toordinal()
+                    return nights.peak(today) < hotel.rooms_available
+                return nights.can_book(hotel.rooms_available, *stay)
+            finally:
+                for start, end in pending:
+                    nights.add(start, end, -1)
+
+    @staticmethod
+    def _retrying(
+        attempt: Callable[[], Any],
+        on_conflict: Callable[[VersionConflict], Any],
+    ) -> Any:
+        """Run a transaction, starting over while its commit conflicts.
+
+        Returns ``on_conflict(conflict)`` if the last attempt conflicts.
+        """
+        for _ in range(_CONFLICT_RETRIES - 1):
+            try:
+                return attempt()
+            except VersionConflict:
+                continue
+        try:
+            return attempt()
+        except VersionConflict as conflict:
+            return on_conflict(conflict)
+
+    def _hotel_locks(self, hotel_ids: Iterable[str]):
+        """Return a context holding the given hotels' locks, if enabled."""
+        if self.locks is None:
+            return nullcontext()
+        return self.locks.hotels(hotel_ids)
+
+    def _hotels_of(self, reservation_ids: List[str]) -> List[str]:
+        """Return the hotel ids referenced by existing reservations."""
+        if self.locks is None:
+            return []
+        if getattr(self.store, "point_reads", False):
+            records = [self.store.get_record(rid) for rid in reservation_ids]
+        else:
+            data = self.store.load()
+            records = [data.get(rid) for rid in reservation_ids]
+        return [
+            record["hotel_id"]
+            for record in records
+            if isinstance(record, dict) and "hotel_id" in record
+        ]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[UnitOfWork]:
+        """Run a UnitOfWork and keep the index in step with its commit."""
+        with self._index_lock:
+            # Build the index first so this commit can be applied to it.
+            self._current_index()
+        views_in_sync = self._views.in_sync()
+        try:
+            with UnitOfWork(self._intent_dir) as uow:
+                yield uow
+                if self.ledger is not None:
+                    uow.publish(self.ledger, self._events(uow))
+        except BaseException:
+            with self._index_lock:
+                self._index_signature = _UNBUILT
+            self._views.invalidate()
+            raise
+        self._views.apply(
+            uow.committed(self.store),
+            views_in_sync and not uow.stats["reloads"],
+        )
+
+        with self._index_lock:
+            if uow.stats["reloads"]:
+                # Someone else wrote the store; rebuild on the next query.
+                self._index_signature = _UNBUILT
+                return
+            for key, record in uow.committed(self.store).items():
+                if record is DELETED:
+                    self._index.remove(key)
+                    self._count_stay(key, None)
+                else:
+                    self._index.add(key, record)
+                    self._count_stay(key, record)
+            self._index_signature = signature_of(self.store)
+
+    def _events(self, uow: UnitOfWork) -> List[Tuple[str, Any]]:
+        """Return the ledger events for the changes staged in ``uow``."""
+        events = []
+        for record in uow.pending(self.store).values():
+            if isinstance(record, dict):
+                canceled = record.get("status") == "CANCELED"
+                events.append((
+                    "ReservationCanceled" if canceled
+                    else "ReservationCreated",
+                    record,
+                ))
+        for hotel_id, record in uow.pending(self.hotels.store).items():
+            if isinstance(record, dict):
+                events.append(("HotelUpdated", record))
+            else:
+                events.append(("HotelDeleted", {"hotel_id": hotel_id}))
+        return events
+
+    def _book(
+        self,
+        uow: UnitOfWork,
+        reservation: Reservation,
+        staged: List[Tuple[str, int, int]],
+    ) -> Optional[str]:
+        """Stage a booking in ``uow``; return an error message on failure.
+
+        ``staged`` collects the dated stays booked earlier in the same
+        transaction, so a batch sees its own bookings.
+        """
+        if uow.get(self.store, reservation.reservation_id) is not None or (
+            self.archive is not None
+            and reservation.reservation_id in self.archive
+        ):
+            return "Reservation already exists."
+
+        try:
+            stay = stay_nights(reservation.check_in, reservation.check_out)
+        except (TypeError, ValueError):
+            return "Invalid stay dates."
+
+        hotel_record = uow.get(self.hotels.store, reservation.hotel_id)
+        hotel = _build(Hotel, hotel_record, "Hotel")
+        if hotel is None:
+            return "Hotel not found."
+
+        customer = _build(
+            Customer,
+            uow.get(self.customers.store, reservation.customer_id),
+            "Customer",
+        )
+        if customer is None:
+            return "Customer not found."
+
+        error = self._reserve(uow, hotel_record, hotel, stay, staged)
+        if error is None:
+            uow.put(
+                self.store, reservation.reservation_id, asdict(reservation)
+            )
+        return error
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _reserve(
+        self,
+        uow: UnitOfWork,
+        hotel_record: Dict[str, Any],
+        hotel: Hotel,
+        stay: Optional[Tuple[int, int]],
+        staged: List[Tuple[str, int, int]],
+    ) -> Optional[str]:
+        """Claim a room for the stay (or the global counter if undated)."""
+        if stay is not None:
+            if not self._nights_free(hotel, stay, staged):
+                return "No rooms available for those nights."
+            staged.append((hotel.hotel_id, *stay))
+            return None
+
+        if not self._nights_free(hotel, None, staged) or (
+            not hotel.reserve_room()
+        ):
+            return "No rooms available."
+        self._stage_hotel(uow, hotel_record, hotel)
+        return None
+
+    def _release(
+        self, uow: UnitOfWork, reservation_id: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Stage a cancellation in ``uow``; return (ok, message)."""
+        record = uow.get(self.store, reservation_id)
         if not isinstance(record, dict):
-            print("[ERROR] Reservation not found.")
-            return False
+            return False, "Reservation not found."
 
         try:
             reservation = Reservation(**record)
         except TypeError:
-            print("[WARN] Reservation record malformed.")
-            return False
+            return False, "Reservation record malformed."
 
         if reservation.status == "CANCELED":
-            print("[WARN] Reservation already canceled.")
-            return True
+            return True, "Reservation already canceled."
 
-        hotel = self.hotels.get(reservation.hotel_id)
+        if reservation.check_in is not None:
+            # Dated stays free their nights when the index sees the cancel.
+            reservation.cancel()
+            uow.put(self.store, reservation_id, asdict(reservation))
+            return True, None
+
+        hotel_record = uow.get(self.hotels.store, reservation.hotel_id)
+        hotel = _build(Hotel, hotel_record, "Hotel")
         if hotel is None:
-            print("[ERROR] Hotel not found.")
-            return False
+            return False, "Hotel not found."
 
         hotel.release_room()
-        self.hotels.update(
-            hotel.hotel_id,
+        self._stage_hotel(uow, hotel_record, hotel)
+
+        reservation.cancel()
+        uow.put(self.store, reservation_id, asdict(reservation))
+        return True, None
+
+    def _stage_hotel(
+        self, uow: UnitOfWork, hotel_record: Dict[str, Any], hotel: Hotel
+    ) -> None:
+        """Stage the hotel's room counters on top of its stored record."""
+        record = dict(hotel_record)
+        record.update(
             rooms_total=hotel.rooms_total,
             rooms_available=hotel.rooms_available,
             name=hotel.name,
         )
+        record[VERSION_FIELD] = record.get(VERSION_FIELD, 0) + 1
+        uow.put(self.hotels.store, hotel.hotel_id, record)
 
-        reservation.cancel()
-        reservations[reservation_id] = asdict(reservation)
-        self.store.save(reservations)
-        return True
 
-    def list_all(self) -> Dict[str, dict]:
-        """Return all reservations as a dict."""
-        data = self.store.load()
-        return data if isinstance(data, dict) else {}
+def _conflict_message(conflict: VersionConflict) -> str:
+    """Describe a booking that kept losing races for a record."""
+    return f"Record {conflict.key!r} kept changing; try again."
@@ -0,0 +1,311 @@
+"""Collections split across several files by hashing the record id.
+
+ShardedStore keeps record ``key`` in shard ``crc32(key) % shards``; each
+shard is an ordinary FileStore. Record-level writes (put/update/delete
+and apply()) rewrite only the shards they touch, and save() skips shards
+whose cached content did not change. A full load() parses the shards in a
+process pool once they are large enough to pay for it.
+
+The shard count is recorded in ``<name>.shards.json``; changing it is an
+offline operation done with reshard(), which writes the new layout next
+to the old one and switches over by replacing that manifest.
+
+    python -m src.sharding data hotels --shards 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from src.durability import replace_file
+from src.locking import FileLock
+from src.serialization import DEFAULT_CODEC, Codec
+from src.storage import FileStore, PointRecordMixin
+
+DEFAULT_SHARDS = 8
+
+# Stale shards smaller than this in total are parsed in-process: below it,
+# starting workers and pickling results costs more than it saves.
+PARALLEL_BYTES = 8 * 1024 * 1024
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Return the shard index that holds ``key``."""
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def _read_shard(path: str) -> Dict[str, Any]:
+    """Parse one shard file (runs in a worker process)."""
+    return FileStore(path).load()
+
+
+def _manifest_path(directory: Path, name: str) -> Path:
+    """Return the path of a collection's shard manifest."""
+    return directory / f"{name}.shards.json"
+
+
+def _shard_path(directory: Path, name: str, index: int, shards: int) -> Path:
+    """Return the path of one shard in a layout of ``shards`` files."""
+    return directory / f"{name}.{index:04d}-of-{shards:04d}.json"
+
+
+def _read_manifest(path: Path) -> Optional[int]:
+    """Return the shard count stored in a manifest, or None if missing."""
+    if not path.exists():
+        return None
+    try:
+        count = int(json.loads(path.read_text(encoding="utf-8"))["shards"])
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"Unreadable shard manifest {path}: {exc}") from exc
+    if count < 1:
+        raise ValueError(f"Invalid shard count in {path}: {count}")
+    return count
+
+
+def _write_manifest(path: Path, shards: int) -> None:
+    """Durably replace the manifest with a new shard count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    replace_file(path, json.dumps({"shards": shards}).encode("utf-8"))
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ShardedStore(PointRecordMixin):
+    """A collection stored as N FileStore shards.
+
+    Offers the FileStore contract the services rely on: load/save,
+    record-level operations, iter_records(), atomic() and signature().
+    ``path`` is the manifest. Like a FileStore, ``lock`` defaults to a
+    FileLock on the hidden ``.<name>.shards.json.lock`` file beside it,
+    and a LockManager can replace it.
+
+    Raises ValueError if ``shards`` disagrees with an existing manifest;
+    use reshard() to change the count.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        shards: Optional[int] = None,
+        cache: bool = False,
+        codec: Union[str, Codec] = DEFAULT_CODEC,
+        workers: Optional[int] = None,
+    ) -> None:
+        """Open (or create) the sharded collection ``name``."""
+        self.directory = Path(directory)
+        self.name = name
+        self.path = _manifest_path(self.directory, name)
+        existing = _read_manifest(self.path)
+        if existing is None:
+            self.count = shards or DEFAULT_SHARDS
+            _write_manifest(self.path, self.count)
+        elif shards is not None and shards != existing:
+            raise ValueError(
+                f"{name} has {existing} shards, not {shards}; "
+                f"run reshard() to change it"
+            )
+        else:
+            self.count = existing
+
+        self.shards = [
+            FileStore(
+                str(_shard_path(self.directory, name, index, self.count)),
+                cache=cache,
+                codec=codec,
+            )
+            for index in range(self.count)
+        ]
+        self.workers = workers or os.cpu_count() or 1
+        self.lock: Optional[ContextManager] = FileLock(
+            str(self.path.with_name(f".{self.path.name}.lock"))
+        )
+        self.stats = {"parallel_loads": 0, "skipped_writes": 0}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def signature(self) -> Tuple[Any, ...]:
+        """Return a token that changes when any shard file changes."""
+        return tuple(shard.signature() for shard in self.shards)
+
+    def shard(self, key: str) -> FileStore:
+        """Return the shard that holds ``key``."""
+        return self.shards[shard_of(key, self.count)]
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return one record, reading only its shard."""
+        return self.shard(key).get_record(key)
+
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Stream every record, one shard after another."""
+        for shard in self.shards:
+            yield from shard.iter_records()
+
+    def split_changes(
+        self, changes: Dict[str, Any]
+    ) -> List[Tuple[FileStore, Dict[str, Any]]]:
+        """Return (shard, change set) pairs for the shards ``changes`` touch.
+
+        UnitOfWork uses it to commit the shards in one atomic file commit.
+        """
+        parts: Dict[int, Dict[str, Any]] = {}
+        for key, record in changes.items():
+            parts.setdefault(shard_of(key, self.count), {})[key] = record
+        return [(self.shards[index], part)
+                for index, part in sorted(parts.items())]
+
+    def apply(self, changes: Dict[str, Any]) -> None:
+        """Apply a change set, rewriting only the shards it touches.
+
+        Shards are written one after another; use a UnitOfWork to
+        replace them atomically.
+        """
+        with self.atomic():
+            for shard, part in self.split_changes(changes):
+                shard.apply(part)
+
+    def load(self) -> Dict[str, Any]:
+        """Return every record, parsing stale shards in parallel."""
+        parts: List[Optional[Dict[str, Any]]] = [None] * self.count
+        stale = []
+        for index, shard in enumerate(self.shards):
+            if shard.is_cached():
+                parts[index] = shard.load()
+            else:
+                stale.append(index)
+
+        if self._parallel(stale):
+            paths = [str(self.shards[index].path) for index in stale]
+            for index, data in zip(stale, self._executor().map(
+                _read_shard, paths
+            )):
+                self.shards[index].stats["reads"] += 1
+                self.shards[index].remember(data)
+                parts[index] = data
+            self.stats["parallel_loads"] += 1
+        else:
+            for index in stale:
+                parts[index] = self.shards[index].load()
+
+        data: Dict[str, Any] = {}
+        for part in parts:
+            data.update(part or {})
+        return data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Write ``data``; shards whose cached content is equal are kept."""
+        parts = _partition(iter(data.items()), self.count)
+        for shard, part in zip(self.shards, parts):
+            if shard.is_cached() and shard.load() == part:
+                self.stats["skipped_writes"] += 1
+                continue
+            if part or shard.path.exists():
+                shard.save(part)
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _parallel(self, stale: List[int]) -> bool:
+        """Return True if parsing ``stale`` shards is worth a pool."""
+        if self.workers < 2 or len(stale) < 2:
+            return False
+        size = 0
+        for index in stale:
+            try:
+                size += self.shards[index].path.stat().st_size
+            except OSError:
+                continue
+        return size >= PARALLEL_BYTES
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Return the worker pool, starting it on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=min(self.workers, self.count),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+
+def reshard(
+    directory: str,
+    name: str,
+    shards: int,
+    codec: Union[str, Codec] = DEFAULT_CODEC,
+) -> int:
+    """Rewrite collection ``name`` into ``shards`` files; return records.
+
+    Run it while no process uses the collection. The new shard files are
+    written first and the manifest is switched last, so an interrupted
+    run leaves the old layout intact. A collection without a manifest is
+    created from ``<name>.json`` in ``directory`` when that file exists.
+    """
+    if shards < 1:
+        raise ValueError("shards must be positive")
+    root = Path(directory)
+    manifest = _manifest_path(root, name)
+    if _read_manifest(manifest) is None:
+        source: Any = FileStore(str(root / f"{name}.json"), codec=codec)
+        old_paths = []
+    else:
+        source = ShardedStore(directory, name, codec=codec)
+        old_paths = [shard.path for shard in source.shards]
+        if source.count == shards:
+            return sum(1 for _ in source.iter_records())
+
+    parts = _partition(source.iter_records(), shards)
+    for index, part in enumerate(parts):
+        target = FileStore(
+            str(_shard_path(root, name, index, shards)), codec=codec
+        )
+        target.path.parent.mkdir(parents=True, exist_ok=True)
+        replace_file(target.path, target.dumps(part))
+    _write_manifest(manifest, shards)
+    for path in old_paths:
+        path.unlink(missing_ok=True)
+    return sum(len(part) for part in parts)
+
+
+def _partition(
+    records: Iterator[Tuple[str, Any]], shards: int
+) -> List[Dict[str, Any]]:
+    """Split records into one dict per shard."""
+    parts: List[Dict[str, Any]] = [{} for _ in range(shards)]
+    for key, record in records:
+        parts[shard_of(key, shards)][key] = record
+    return parts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Reshard one collection from the command line."""
+    parser = argparse.ArgumentParser(description=reshard.__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("name")
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--codec", default=DEFAULT_CODEC)
+    args = parser.parse_args(argv)
+    total = reshard(args.directory, args.name, args.shards, args.codec)
+    print(f"{args.name}: {total} records in {args.shards} shards")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+"""SQLite-backed store implementing the FileStore contract.
+
+Each collection lives in its own table of (key, JSON value) rows, so
+record-level reads and writes touch a single row instead of the whole
+dataset. Stores opened from the same SQLiteDatabase share a connection,
+which lets a UnitOfWork commit several of them in one SQL transaction.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple, Union
+
+from src.storage import DELETED, PointRecordMixin
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Per-table change counters, bumped by triggers in the writing transaction.
+_VERSIONS = "_store_versions"
+
+
+class SQLiteDatabase:
+    """Shared SQLite connection with reentrant transactions."""
+
+    def __init__(self, path: str) -> None:
+        """Open (and create if needed) the database file."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in one transaction; nested blocks join the outer."""
+        with self._lock:
+            outer = self._depth == 0
+            if outer:
+                self.connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.connection
+            except BaseException:
+                self._depth -= 1
+                if outer:
+                    self.connection.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outer:
+                self.connection.execute("COMMIT")
+
+    @contextmanager
+    def reading(self) -> Iterator[sqlite3.Connection]:
+        """Give serialized access to the connection for plain reads."""
+        with self._lock:
+            yield self.connection
+
+    def store(self, table: str) -> "SQLiteStore":
+        """Return a store for ``table`` on this connection."""
+        return SQLiteStore(self, table)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self.connection.close()
+
+
+class SQLiteStore(PointRecordMixin):
+    """Key/record store kept in one SQLite table."""
+
+    # Rows fetched per query by iter_records().
+    PAGE_SIZE = 500
+
+    def __init__(
+        self, database: Union[SQLiteDatabase, str], table: str
+    ) -> None:
+        """Bind the store to ``table``, creating it if needed."""
+        if not _TABLE_NAME.match(table) or table == _VERSIONS:
+            raise ValueError(f"Invalid table name: {table!r}")
+        if isinstance(database, str):
+            database = SQLiteDatabase(database)
+        self.database = database
+        self.table = table
+        self.path = database.path
+        with self.database.transaction() as conn:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" '
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{_VERSIONS}" '
+                "(name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                f'INSERT OR IGNORE INTO "{_VERSIONS}" VALUES (?, 0)',
+                (table,),
+            )
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{table}_{event.lower()}" '
+                    f'AFTER {event} ON "{table}" BEGIN '
+                    f'UPDATE "{_VERSIONS}" SET version = version + 1 '
+                    f"WHERE name = '{table}'; END"
+                )
+
+    def signature(self) -> Tuple[int]:
+        """Return a token that changes whenever this table is written.
+
+        Writes to other tables, from any connection, leave it unchanged.
+        """
+        with self.database.reading() as conn:
+            row = conn.execute(
+                f'SELECT version FROM "{_VERSIONS}" WHERE name = ?',
+                (self.table,),
+            ).fetchone()
+        return (row[0] if row is not None else 0,)
+
+    def load(self) -> Dict[str, Any]:
+        """Return every record in the table. Empty dict on error."""
+        try:
+            with self.database.reading() as conn:
+                rows = conn.execute(
+                    f'SELECT key, value FROM "{self.table}"'
+                ).fetchall()
+        except sqlite3.Error as exc:
+            print(f"[WARN] Could not load {self.table}: {exc}. Using empty.")
+            return {}
+        return {key: json.loads(value) for key, value in rows}
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Make the table match ``data``, writing only changed rows."""
+        if not isinstance(data, dict):
+            print(f"[WARN] Invalid data structure for {self.table}. Ignored.")
+            return
+
+        try:
+            with self.database.transaction() as conn:
+                current = dict(
+                    conn.execute(f'SELECT key, value FROM "{self.table}"')
+                )
+                changes: Dict[str, Any] = {
+                    key: DELETED for key in current if key not in data
+                }
+                for key, record in data.items():
+                    if current.get(key) != _encode(record):
+                        changes[key] = record
+                self.apply(changes)
+        except sqlite3.Error as exc:
+            print(f"[WARN] Could not save {self.table}: {exc}.")
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return one record, or None if missing."""
+        with self.database.reading() as conn:
+            row = conn.execute(
+                f'SELECT value FROM "{self.table}" WHERE key = ?', (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, record) pairs in key order, one page at a time.
+
+        Pages are fetched by key range, so no read transaction is held
+        open between pages and writers are never blocked by iteration.
+        """
+        last = None
+        while True:
+            with self.database.reading() as conn:
+                if last is None:
+                    rows = conn.execute(
+                        f'SELECT key, value FROM "{self.table}" '
+                        "ORDER BY key LIMIT ?",
+                        (self.PAGE_SIZE,),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        f'SELECT key, value FROM "{self.table}" '
+                        "WHERE key > ? ORDER BY key LIMIT ?",
+                        (last, self.PAGE_SIZE),
+                    ).fetchall()
+            for key, value in rows:
+                yield key, json.loads(value)
+            if len(rows) < self.PAGE_SIZE:
+                return
+            last = rows[-1][0]
+
+    def apply(self, changes: Dict[str, Any]) -> None:
+        """Upsert or delete the given records in one transaction."""
+        upserts = [
+            (key, _encode(record))
+            for key, record in changes.items()
+            if record is not DELETED
+        ]
+        deletes = [
+            (key,) for key, record in changes.items() if record is DELETED
+        ]
+        with self.database.transaction() as conn:
+            if upserts:
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO "{self.table}" (key, value) '
+                    "VALUES (?, ?)",
+                    upserts,
+                )
+            if deletes:
+                conn.executemany(
+                    f'DELETE FROM "{self.table}" WHERE key = ?', deletes
+                )
+
+    def count(self) -> int:
+        """Return the number of records in the table."""
+        with self.database.reading() as conn:
+            return conn.execute(
+                f'SELECT COUNT(*) FROM "{self.table}"'
+            ).fetchone()[0]
+
+    def atomic(self) -> ContextManager:
+        """Run read-modify-write helpers in one SQL transaction."""
+        return self.database.transaction()
+
+
+def _encode(record: Any) -> str:
+    """Serialize one record the same way every time."""
+    return json.dumps(record, separators=(",", ":"), sort_keys=True)
@@ -1,28 +1,431 @@
 """JSON file persistence layer with basic error handling."""
 
-import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Any, Dict
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from src.durability import (
+    DURABILITY_LEVELS,
+    GroupSync,
+    LatencyStats,
+    fsync_write,
+    replace_file,
+)
+from src.locking import FileLock
+from src.serialization import (
+    DEFAULT_CODEC,
+    MAGIC,
+    Codec,
+    decode,
+    get_codec,
+    is_json,
+)
+from src.streaming import iter_json_object
 
-class FileStore:
-    """Simple JSON file store with graceful error handling."""
+# Marker used in apply() change sets for records that must be removed.
+DELETED = object()
 
-    def __init__(self, filepath: str) -> None:
+# Record field holding the optimistic-concurrency version number.
+VERSION_FIELD = "version"
+
+
+class VersionConflict(Exception):
+    """Raised when an update sees a newer version of its record.
+
+    ``current`` is None when the record no longer exists.
+    """
+
+    def __init__(self, key: str, current: Optional[int]) -> None:
+        super().__init__(f"record {key!r} is at version {current}")
+        self.key = key
+        self.current = current
+
+
+def _copy_records(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a two-level copy so callers can mutate records safely."""
+    return {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in data.items()
+    }
+
+
+def _merge_changes(data: Dict[str, Any], changes: Dict[str, Any]) -> None:
+    """Apply a change set produced by a unit of work to ``data``."""
+    for key, record in changes.items():
+        if record is DELETED:
+            data.pop(key, None)
+        else:
+            data[key] = record
+
+
+def _updated_record(
+    key: str,
+    record: Any,
+    changes: Dict[str, Any],
+    expected_version: Optional[int],
+    bump_version: bool,
+) -> Dict[str, Any]:
+    """Validate and merge an update into ``record`` (shared helper)."""
+    if record is None:
+        raise KeyError(key)
+    if not isinstance(record, dict):
+        raise TypeError(f"record {key!r} is not a dict")
+
+    current = record.get(VERSION_FIELD, 0)
+    if expected_version is not None and current != expected_version:
+        raise VersionConflict(key, current)
+
+    record.update(changes)
+    if bump_version:
+        record[VERSION_FIELD] = current + 1
+    return record
+
+
+def signature_of(store: Any) -> Optional[Any]:
+    """Return the store's change token, or None if it exposes none."""
+    signature = getattr(store, "signature", None)
+    return signature() if callable(signature) else None
+
+
+class RecordStoreMixin:
+    """Record-level operations built on a store's load()/save().
+
+    ``point_reads`` tells callers whether get_record() is cheaper than a
+    full load(); whole-file stores leave it False.
+    """
+
+    point_reads = False
+
+    def atomic(self) -> ContextManager:
+        """Return a context manager that serializes read-modify-write."""
+        lock = getattr(self, "lock", None)
+        return lock if lock is not None else nullcontext()
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return one stored record, or None if missing."""
+        return self.load().get(key)
+
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, record) pairs; stores override this to stream."""
+        yield from self.load().items()
+
+    def put_record(
+        self, key: str, record: Any, overwrite: bool = True
+    ) -> bool:
+        """Store one record; return False if it exists and not overwrite."""
+        with self.atomic():
+            data = self.load()
+            if not overwrite and key in data:
+                return False
+            data[key] = record
+            self.save(data)
+            return True
+
+    def update_record(
+        self,
+        key: str,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        bump_version: bool = False,
+    ) -> Dict:
+        """Merge changes into one record and return it.
+
+        Raises KeyError if the record is missing, TypeError if the stored
+        value is not a dict and VersionConflict if ``expected_version`` is
+        given and does not match the stored version.
+        """
+        with self.atomic():
+            data = self.load()
+            record = _updated_record(
+                key, data.get(key), changes, expected_version, bump_version
+            )
+            data[key] = record
+            self.save(data)
+            return record
+
+    def delete_record(self, key: str) -> bool:
+        """Remove one record; return False if it did not exist."""
+        with self.atomic():
+            data = self.load()
+            if key not in data:
+                return False
+            del data[key]
+            self.save(data)
+            return True
+
+    def apply(self, changes: Dict[str, Any]) -> None:
+        """Apply a change set of records (DELETED removes a record)."""
+        with self.atomic():
+            data = self.load()
+            _merge_changes(data, changes)
+            self.save(data)
+
+
+class PointRecordMixin(RecordStoreMixin):
+    """Record-level operations for stores with cheap point access.
+
+    Subclasses implement get_record() and apply(); the read-modify-write
+    helpers run inside ``atomic()`` so they never touch other records.
+    """
+
+    point_reads = True
+
+    def put_record(
+        self, key: str, record: Any, overwrite: bool = True
+    ) -> bool:
+        """Store one record; return False if it exists and not overwrite."""
+        with self.atomic():
+            if not overwrite and self.get_record(key) is not None:
+                return False
+            self.apply({key: record})
+            return True
+
+    def update_record(
+        self,
+        key: str,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        bump_version: bool = False,
+    ) -> Dict:
+        """Merge changes into one record and return it."""
+        with self.atomic():
+            record = _updated_record(
+                key,
+                self.get_record(key),
+                changes,
+                expected_version,
+                bump_version,
+            )
+            self.apply({key: record})
+            return record
+
+    def delete_record(self, key: str) -> bool:
+        """Remove one record; return False if it did not exist."""
+        with self.atomic():
+            if self.get_record(key) is None:
+                return False
+            self.apply({key: DELETED})
+            return True
+
+
+# pylint: disable-next=too-many-instance-attributes
+class FileStore(RecordStoreMixin):
+    """Simple JSON file store with graceful error handling.
+
+    With ``cache=True`` the parsed data is kept in memory and only
+    re-read when the file's mtime, size or inode changes, so edits made
+    by other processes are still picked up.
+
+    iter_records() parses JSON files incrementally, ``READ_SIZE``
+    characters at a time, so iterating never holds the whole text or dict
+    in memory.
+
+    ``codec`` (a name from src.serialization or a Codec) picks the format
+    save() writes; load() detects the format of whatever file it finds.
+    Files in an unsafe format (pickle, marshal) are only read when it is
+    the store's own codec or listed in ``trusted_codecs``.
+
+    save() always writes a temporary file and renames it over the old
+    one. ``durability`` picks how hard it tries to reach the disk:
+
+    * ``"none"`` (default): no fsync, so a power loss may lose recent
+      saves (but a crash still never leaves a truncated file);
+    * ``"fsync"``: the data and the rename are fsynced before save()
+      returns, at the cost of a disk flush per save;
+    * ``"group"``: save() updates the in-memory copy and waits while one
+      caller writes, in one fsynced write, every save made in the last
+      ``group_window`` seconds. Inside ``atomic()`` the wait happens when
+      the block exits, so other writers can stage meanwhile. A failed
+      write is reported to every save it covered. This mode keeps the
+      cache on and assumes this process is the file's only writer.
+
+    The record helpers and UnitOfWork commits hold ``lock`` across their
+    read-modify-write. By default it is a FileLock on the hidden
+    ``.<name>.lock`` file next to the store, so threads and processes
+    sharing the file never interleave; a LockManager may replace it.
+
+    ``commit_stats`` reports save latency until durable.
+    """
+
+    READ_SIZE = 64 * 1024
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        filepath: str,
+        cache: bool = False,
+        codec: Union[str, Codec] = DEFAULT_CODEC,
+        durability: str = "none",
+        group_window: float = 0.002,
+        trusted_codecs: Iterable[str] = (),
+    ) -> None:
         """Initialize store with a file path."""
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability!r}")
         self.path = Path(filepath)
+        self.cache = cache or durability == "group"
+        self.codec = get_codec(codec) if isinstance(codec, str) else codec
+        self.trusted_codecs = frozenset(trusted_codecs) | {self.codec.name}
+        self.durability = durability
+        self.lock: Optional[ContextManager] = FileLock(
+            str(self.path.with_name(f".{self.path.name}.lock"))
+        )
+        self.commit_stats = LatencyStats()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._signature: Optional[Tuple] = None
+        self._group = (
+            GroupSync(self._flush, group_window)
+            if durability == "group" else None
+        )
+        self._local = threading.local()
+        self._version = 0
+        self._written: Optional[Tuple[int, int, int]] = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "reads": 0,
+            "writes": 0,
+        }
+
+    def signature(self) -> Optional[Tuple]:
+        """Return (mtime_ns, size, inode) of the file, or None if missing.
+
+        In group mode a file last written by this store is identified by
+        a local version instead, so a flush alone does not look like a
+        change to callers comparing signatures.
+        """
+        stat = self._stat()
+        if self._group is not None and stat == self._written:
+            return ("local", self._version)
+        return stat
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Return (mtime_ns, size, inode) of the file, or None if missing."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def is_cached(self) -> bool:
+        """Return True if load() would be served from the cache."""
+        return (
+            self.cache
+            and self._cached is not None
+            and self.signature() == self._signature
+        )
+
+    def atomic(self) -> ContextManager:
+        """Return a context that serializes read-modify-write.
+
+        In group mode, saves made inside the block wait for their durable
+        write after the lock is released.
+        """
+        if self._group is None:
+            return super().atomic()
+        return self._deferring()
+
+    @contextmanager
+    def _deferring(self) -> Iterator[None]:
+        """Hold the lock, then wait for the saves staged inside."""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            with super().atomic():
+                yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                pending = getattr(self._local, "pending", [])
+                self._local.pending = []
+                self._await(pending)
+
+    def sync(self) -> None:
+        """Block until every save staged so far is durable."""
+        if self._group is not None:
+            self._await([(self._group.staged, None)])
+
+    def _defer(self, pending: List[Tuple[int, Optional[float]]]) -> None:
+        """Wait for staged saves now, or when the atomic() block exits."""
+        if getattr(self._local, "depth", 0):
+            self._local.pending = (
+                getattr(self._local, "pending", []) + pending
+            )
+        else:
+            self._await(pending)
+
+    def _await(self, pending: List[Tuple[int, Optional[float]]]) -> None:
+        """Wait for staged saves and record their commit latency."""
+        if not pending:
+            return
+        try:
+            self._group.wait(max(seq for seq, _ in pending))
+        except OSError as exc:
+            print(f"[WARN] Could not save {self.path}: {exc}.")
+            return
+        now = time.perf_counter()
+        for _, started in pending:
+            if started is not None:
+                self.commit_stats.record(now - started)
 
     def load(self) -> Dict[str, Any]:
         """Load JSON data from file. Return empty dict on error."""
+        if not self.cache:
+            return self._read()
+
+        signature = self.signature()
+        if self._cached is not None and signature == self._signature:
+            self.stats["hits"] += 1
+            return _copy_records(self._cached)
+
+        if self._cached is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["reloads"] += 1
+
+        if self._group is not None:
+            self._written = self._stat()
+            signature = self.signature()
+        data = self._read()
+        self._cached = data
+        self._signature = signature
+        return _copy_records(data)
+
+    def get_record(self, key: str) -> Optional[Any]:
+        """Return one record, copying only that record from a valid cache."""
+        cached = self._cached
+        if cached is None or not self.is_cached():
+            return super().get_record(key)
+        self.stats["hits"] += 1
+        value = cached.get(key)
+        return dict(value) if isinstance(value, dict) else value
+
+    def _read(self) -> Dict[str, Any]:
+        """Read and parse the file without consulting the cache."""
         if not self.path.exists():
             return {}
 
         try:
-            raw = self.path.read_text(encoding="utf-8").strip()
-            if not raw:
+            self.stats["reads"] += 1
+            raw = self._read_bytes()
+            if not raw.strip():
                 return {}
 
-            data = json.loads(raw)
+            data = self.parse(raw)
 
             if not isinstance(data, dict):
                 print(
@@ -33,23 +436,138 @@ class FileStore:
 
             return data
 
-        except (OSError, json.JSONDecodeError) as exc:
+        except (OSError, ValueError) as exc:
             print(
                 f"[WARN] Could not load {self.path}: "
                 f"{exc}. Using empty."
             )
             return {}
 
+    def iter_records(self) -> Iterator[Tuple[str, Any]]:
+        """Stream (key, record) pairs from the file (or a valid cache).
+
+        A malformed file yields what could be parsed, then warns. Files
+        written by a binary codec are decoded whole.
+        """
+        if self.is_cached():
+            self.stats["hits"] += 1
+            for key, value in self._cached.items():
+                yield key, dict(value) if isinstance(value, dict) else value
+            return
+
+        if not self.path.exists():
+            return
+
+        try:
+            with self.path.open("rb") as handle:
+                head = handle.read(len(MAGIC))
+            if not is_json(head):
+                yield from self._read().items()
+                return
+            with self.path.open(encoding="utf-8") as handle:
+                self.stats["reads"] += 1
+                yield from iter_json_object(handle, self.READ_SIZE)
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Could not stream {self.path}: {exc}.")
+
+    def _read_bytes(self) -> bytes:
+        """Return the raw file contents."""
+        return self.path.read_bytes()
+
+    def _write_bytes(self, payload: bytes) -> None:
+        """Atomically replace the file contents with ``payload``."""
+        replace_file(self.path, payload, sync=self.durability != "none")
+
+    def stage_bytes(self, tmp_path: Path, payload: bytes) -> None:
+        """Write ``payload`` beside the file for a UnitOfWork.
+
+        The commit renames ``tmp_path`` over the file afterwards. Only
+        the "fsync" level syncs it here; group mode leaves that to the
+        group flush started by after_commit().
+        """
+        if self.durability == "fsync":
+            fsync_write(tmp_path, payload)
+        else:
+            tmp_path.write_bytes(payload)
+
+    def after_commit(self, data: Dict[str, Any]) -> None:
+        """Adopt ``data`` that a UnitOfWork just renamed into place.
+
+        In group mode the commit then waits for a group flush, like a
+        save(), so concurrent commits share one durable write.
+        """
+        self.stats["writes"] += 1
+        self.remember(data)
+        if self._group is not None:
+            self._defer([(self._group.stage(), None)])
+
+    def parse(self, raw: bytes) -> Any:
+        """Deserialize file contents with the codec that wrote them."""
+        return decode(raw, self.trusted_codecs)
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        """Serialize data the way save() writes it."""
+        return self.codec.encode(data)
+
     def save(self, data: Dict[str, Any]) -> None:
-        """Save dictionary as formatted JSON."""
+        """Save dictionary with the store's codec (pretty JSON default)."""
+        started = time.perf_counter()
+        if self._group is not None:
+            self._keep(data)
+            self._defer([(self._group.stage(), started)])
+            return
+
         try:
             self.path.parent.mkdir(parents=True, exist_ok=True)
-            self.path.write_text(
-                json.dumps(data, indent=2),
-                encoding="utf-8",
-            )
+            self.stats["writes"] += 1
+            self._write_bytes(self.dumps(data))
         except OSError as exc:
             print(
                 f"[WARN] Could not save {self.path}: "
                 f"{exc}."
             )
+            self.invalidate()
+            return
+
+        self.remember(data)
+        self.commit_stats.record(time.perf_counter() - started)
+
+    def _flush(self) -> None:
+        """Write the in-memory copy once for a group of saves.
+
+        Raises OSError if the write fails; GroupSync hands it to every
+        save the write covered.
+        """
+        with super().atomic():
+            data = self._cached
+            if data is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.stats["writes"] += 1
+                self._write_bytes(self.dumps(data))
+            except OSError:
+                self.invalidate()
+                raise
+            self._written = self._stat()
+
+    def remember(self, data: Dict[str, Any]) -> None:
+        """Record data just written to the file as the cached copy."""
+        if self._group is not None:
+            self._written = self._stat()
+        self._keep(data)
+
+    def _keep(self, data: Dict[str, Any]) -> None:
+        """Make ``data`` the cached copy (staged, in group mode)."""
+        if self.cache:
+            self._cached = (
+                _copy_records(data) if isinstance(data, dict) else {}
+            )
+            if self._group is not None:
+                self._version += 1
+            self._signature = self.signature()
+
+    def invalidate(self) -> None:
+        """Drop the cached data so the next load reads the file."""
+        self._cached = None
+        self._signature = None
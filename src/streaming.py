@@ -0,0 +1,99 @@
+"""Incremental parsing of a top-level JSON object.
+
+``iter_json_object`` yields the (key, value) pairs of a ``{...}`` document
+while reading the file in fixed-size chunks, so memory stays bounded by
+the chunk size plus the largest single record.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator, TextIO, Tuple
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Sliding text buffer over a file handle."""
+
+    def __init__(self, handle: TextIO, chunk_size: int) -> None:
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read one more chunk; return False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            size = len(self.buf)
+            while self.pos < size and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume ``char`` or raise ValueError."""
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number cut at the buffer edge may continue in the next chunk.
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_object(
+    handle: TextIO, chunk_size: int = 64 * 1024
+) -> Iterator[Tuple[str, Any]]:
+    """Yield the members of the JSON object read from ``handle``.
+
+    Raises ValueError (or json.JSONDecodeError) if the document is not a
+    well-formed object; pairs before the error have already been yielded.
+    """
+    reader = _Reader(handle, chunk_size)
+    if reader.peek() == "":
+        return
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("object keys must be strings")
+        reader.expect(":")
+        yield key, reader.value()
+
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
@@ -0,0 +1,421 @@
+"""Unit of work spanning several stores.
+
+A UnitOfWork loads each store at most once, stages record-level changes
+in memory and flushes every dirty store together on commit. For
+FileStore-backed collections the commit is atomic: all new files are
+written next to their targets first, an intent file lists the renames,
+and only then are the files swapped in. If the process dies half-way,
+``recover`` rolls the pending renames forward.
+
+Intent files are written to the UnitOfWork's ``intent_dir``; services
+pass their reservations directory, which is also where they run
+``recover`` on startup. Intents hold absolute paths and a digest of each
+new file, so recovery works from any working directory and can tell a
+finished rename from a lost one.
+
+Commits are only as durable as their stores: staged files, the intent
+and the directories are fsynced only for stores at the "fsync" level,
+and stores in "group" mode make the commit durable in their next group
+flush.
+
+The version of every record read and then changed is remembered. If its
+store was written by someone else before the commit, the records are
+re-read and a VersionConflict is raised when any of them moved on, so a
+commit never silently overwrites a concurrent update.
+
+Events staged with ``publish()`` are appended to the event ledger once
+the files are in place, and are also kept in the intent: ``recover``
+appends them (the ledger skips commit tokens it already has), so a crash
+cannot leave a committed booking without its ledger entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.durability import fsync_directory, replace_file
+from src.storage import (
+    DELETED,
+    VERSION_FIELD,
+    FileStore,
+    VersionConflict,
+    _merge_changes,
+    signature_of,
+)
+
+INTENT_PREFIX = ".uow-intent-"
+
+
+def recover(directory: str, ledger: Optional[Any] = None) -> bool:
+    """Finish commits interrupted in ``directory``.
+
+    Returns True when a pending commit was rolled forward. An intent whose
+    staged file is gone while its target does not hold the committed data
+    is kept (and reported), so the half-commit is never silently dropped.
+    Ledger events recorded in an intent are appended to ``ledger``.
+    """
+    recovered = False
+    for intent_path in sorted(Path(directory).glob(INTENT_PREFIX + "*.json")):
+        try:
+            intent = json.loads(intent_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Could not read {intent_path}: {exc}. Ignored.")
+            intent_path.unlink(missing_ok=True)
+            continue
+        if isinstance(intent, list):  # Older intents hold only renames.
+            intent = {"renames": intent}
+        renames = intent.get("renames", [])
+
+        failed = [
+            target for tmp, target, *digest in renames
+            if not _roll_forward(Path(directory), tmp, target, digest)
+        ]
+        if failed:
+            print(f"[ERROR] Could not finish commit {intent_path.name}: "
+                  f"staged data for {', '.join(failed)} is missing. "
+                  f"Intent kept.")
+            continue
+        if intent.get("events"):
+            if ledger is None:
+                print(f"[WARN] No ledger to replay {intent_path.name}; "
+                      f"its events are dropped.")
+            else:
+                ledger.append_many(intent["events"], tx=intent.get("tx"))
+        intent_path.unlink(missing_ok=True)
+        recovered = True
+    return recovered
+
+
+def _roll_forward(
+    directory: Path, tmp_name: str, target_name: str, digest: List[str]
+) -> bool:
+    """Rename one staged file into place; return False if it is lost.
+
+    Relative names (from older intents) are taken relative to the intent
+    directory. A missing staged file counts as renamed only if the target
+    holds the committed bytes.
+    """
+    tmp_path = directory / tmp_name
+    target_path = directory / target_name
+    try:
+        os.replace(tmp_path, target_path)
+        return True
+    except FileNotFoundError:
+        pass
+    try:
+        content = target_path.read_bytes()
+    except OSError:
+        return False
+    return not digest or _digest(content) == digest[0]
+
+
+def _stage_files(
+    pending: List[Tuple[FileStore, Dict[str, Any]]], token: str
+) -> List[Tuple[str, str, str]]:
+    """Write each store's new file beside it; return the intent entries."""
+    renames = []
+    for store, data in pending:
+        target = store.path.resolve()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{token}.uow.tmp")
+        payload = store.dumps(data)
+        store.stage_bytes(tmp_path, payload)
+        renames.append((str(tmp_path), str(target), _digest(payload)))
+    return renames
+
+
+def _version_of(record: Any) -> Optional[int]:
+    """Return a record's version, or None if there is no such record."""
+    return record.get(VERSION_FIELD, 0) if isinstance(record, dict) else None
+
+
+def _digest(payload: bytes) -> str:
+    """Return the hex digest recorded for a staged file."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class UnitOfWork:
+    """Load-once, commit-together transaction over several stores.
+
+    Use as a context manager; changes are committed when the block exits
+    without an exception and discarded otherwise. ``intent_dir`` is where
+    commit intents go (run ``recover`` on it at startup); without it they
+    go next to the first FileStore by absolute path.
+    """
+
+    def __init__(self, intent_dir: Optional[str] = None) -> None:
+        """Start an empty transaction."""
+        self.intent_dir = Path(intent_dir) if intent_dir else None
+        self._stores: Dict[int, Any] = {}
+        self._loaded: Dict[int, Tuple[Dict[str, Any], Any]] = {}
+        self._reads: Dict[int, Tuple[Dict[str, Any], Any]] = {}
+        self._versions: Dict[int, Dict[str, Optional[int]]] = {}
+        self._changes: Dict[int, Dict[str, Any]] = {}
+        self._committed: Dict[int, Dict[str, Any]] = {}
+        self._events: Optional[Tuple[Any, List[Tuple[str, Any]]]] = None
+        self.stats = {"loads": 0, "point_reads": 0, "reloads": 0, "writes": 0}
+
+    def __enter__(self) -> "UnitOfWork":
+        """Enter the transaction block."""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        """Commit on success, discard staged changes on error."""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def load(self, store: Any) -> Dict[str, Any]:
+        """Return the working copy of ``store``, loading it only once."""
+        key = id(store)
+        if key not in self._loaded:
+            self._stores[key] = store
+            signature = signature_of(store)
+            data = store.load()
+            _merge_changes(data, self._changes.get(key, {}))
+            self._loaded[key] = (data, signature)
+            self.stats["loads"] += 1
+        return self._loaded[key][0]
+
+    def get(self, store: Any, key: str) -> Optional[Any]:
+        """Return one record as seen by this transaction.
+
+        Stores with cheap point reads are queried per record; whole-file
+        stores are loaded once and served from the working copy.
+        """
+        store_key = id(store)
+        changes = self._changes.get(store_key, {})
+        if key in changes:
+            record = changes[key]
+            return None if record is DELETED else record
+        if store_key in self._loaded:
+            return self._loaded[store_key][0].get(key)
+        if not getattr(store, "point_reads", False):
+            return self.load(store).get(key)
+
+        if store_key not in self._reads:
+            self._reads[store_key] = ({}, signature_of(store))
+        reads = self._reads[store_key][0]
+        if key not in reads:
+            self._stores[store_key] = store
+            reads[key] = store.get_record(key)
+            self.stats["point_reads"] += 1
+        return reads[key]
+
+    def put(self, store: Any, key: str, record: Any) -> None:
+        """Stage an insert or replacement of one record."""
+        self._stage(store, key, record)
+
+    def delete(self, store: Any, key: str) -> None:
+        """Stage removal of one record."""
+        self._stage(store, key, DELETED)
+
+    def pending(self, store: Any) -> Dict[str, Any]:
+        """Return the changes staged for ``store`` (DELETED for removals)."""
+        return self._changes.get(id(store), {})
+
+    def publish(self, ledger: Any, events: List[Tuple[str, Any]]) -> None:
+        """Append ``events`` to ``ledger`` as part of the commit.
+
+        File commits record them in their intent first, so recover()
+        appends them if the process stops before the commit does.
+        """
+        self._events = (ledger, list(events)) if events else None
+
+    def rollback(self) -> None:
+        """Discard staged changes and working copies."""
+        self._events = None
+        self._changes.clear()
+        self._loaded.clear()
+        self._reads.clear()
+        self._versions.clear()
+
+    def commit(self) -> None:
+        """Flush every dirty store together.
+
+        FileStores, and the FileStore shards of stores that offer
+        ``split_changes()`` (ShardedStore), share one atomic file commit.
+        Raises VersionConflict, writing nothing, if a record read by this
+        transaction was changed by someone else in the meantime. Published
+        events are appended to their ledger after the stores are written.
+        """
+        if not self._changes:
+            return
+
+        files: Dict[int, Tuple[FileStore, Dict[str, Any]]] = {}
+        parents = []
+        others: List[Tuple[Any, Dict[str, Any]]] = []
+        for key, changes in self._changes.items():
+            store = self._stores[key]
+            split = getattr(store, "split_changes", None)
+            if isinstance(store, FileStore):
+                files[key] = (store, changes)
+            elif callable(split):
+                parents.append(store)
+                for shard, part in split(changes):
+                    files.setdefault(id(shard), (shard, {}))[1].update(part)
+            else:
+                others.append((store, changes))
+
+        if files:
+            file_keys = sorted(files, key=lambda key: str(files[key][0].path))
+            with ExitStack() as stack:
+                # Hold every store-file lock (in path order, to avoid
+                # deadlocks) across the read-merge-write.
+                for store in sorted(parents, key=lambda s: str(s.path)):
+                    stack.enter_context(store.atomic())
+                    self._check_versions(store)
+                for key in file_keys:
+                    stack.enter_context(files[key][0].atomic())
+                self._commit_files([
+                    (files[key][0], self._file_data(key, *files[key]))
+                    for key in file_keys
+                ])
+        self._commit_records(others)
+        if not files and self._events is not None:
+            self._events[0].append_many(self._events[1])
+        self._events = None
+        self.stats["writes"] += len(files) + len(others)
+        self._committed.update(self._changes)
+        self._changes = {}
+
+    def committed(self, store: Any) -> Dict[str, Any]:
+        """Return the change set committed for ``store``."""
+        return self._committed.get(id(store), {})
+
+    def _stage(self, store: Any, key: str, record: Any) -> None:
+        """Record a change and reflect it in the working copy."""
+        store_key = id(store)
+        self._stores[store_key] = store
+        changes = self._changes.setdefault(store_key, {})
+        if key not in changes:
+            self._remember_version(store_key, key)
+        changes[key] = record
+        if store_key in self._loaded:
+            _merge_changes(self._loaded[store_key][0], {key: record})
+
+    def _remember_version(self, store_key: int, key: str) -> None:
+        """Note the version this transaction read for ``key``, if any."""
+        if store_key in self._loaded:
+            record = self._loaded[store_key][0].get(key)
+        else:
+            reads = self._reads.get(store_key, ({}, None))[0]
+            if key not in reads:
+                return  # A blind write depends on nothing we read.
+            record = reads[key]
+        self._versions.setdefault(store_key, {})[key] = _version_of(record)
+
+    def _check_versions(
+        self, store: Any, data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Raise VersionConflict if a record we read has moved on.
+
+        ``data`` is a fresh copy of a whole-file store; without it the
+        records are re-read one by one, unless the store's signature shows
+        nobody wrote it since our first read.
+        """
+        key = id(store)
+        versions = self._versions.get(key)
+        if not versions:
+            return
+        if data is None:
+            signature = self._reads.get(key, ({}, None))[1]
+            if signature is not None and signature_of(store) == signature:
+                return
+        for record_key, seen in versions.items():
+            current = _version_of(
+                data.get(record_key) if data is not None
+                else store.get_record(record_key)
+            )
+            if current != seen:
+                raise VersionConflict(record_key, current)
+
+    def _file_data(
+        self, key: int, store: FileStore, changes: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Return the full dict to write for a whole-file store."""
+        if key in self._loaded:
+            data, signature = self._loaded[key]
+            if signature_of(store) == signature:
+                return data
+            self.stats["reloads"] += 1
+
+        # Someone else wrote the store since we loaded it (or we never
+        # loaded it): merge our record-level changes on a fresh copy,
+        # unless a record we read was changed meanwhile.
+        data = store.load()
+        self._check_versions(store, data)
+        _merge_changes(data, changes)
+        return data
+
+    def _commit_records(
+        self, pending: List[Tuple[Any, Dict[str, Any]]]
+    ) -> None:
+        """Apply change sets to record-level stores.
+
+        Stores sharing a database are committed in one transaction.
+        """
+        groups: Dict[int, List[Tuple[Any, Dict[str, Any]]]] = {}
+        for store, changes in pending:
+            database = getattr(store, "database", None)
+            groups.setdefault(id(database), []).append((store, changes))
+
+        for group in groups.values():
+            database = getattr(group[0][0], "database", None)
+            scope = (
+                database.transaction() if database is not None
+                else nullcontext()
+            )
+            with scope:
+                for store, _ in group:
+                    self._check_versions(store)
+                for store, changes in group:
+                    store.apply(changes)
+
+    def _write_intent(self, intent: Dict[str, Any], sync: bool) -> Path:
+        """Write a commit intent and return its path."""
+        intent_dir = self.intent_dir or Path(min(
+            target for _, target, _ in intent["renames"]
+        )).parent
+        intent_dir.mkdir(parents=True, exist_ok=True)
+        intent_path = intent_dir / f"{INTENT_PREFIX}{intent['tx']}.json"
+        replace_file(intent_path, json.dumps(intent).encode("utf-8"), sync)
+        return intent_path
+
+    def _commit_files(
+        self, pending: List[Tuple[FileStore, Dict[str, Any]]]
+    ) -> None:
+        """Atomically replace several JSON files."""
+        token = uuid.uuid4().hex
+        synced = [store.durability == "fsync" for store, _ in pending]
+        renames = _stage_files(pending, token)
+        ledger, events = self._events or (None, [])
+        intent_path = self._write_intent(
+            {"renames": renames, "tx": token, "events": events}, any(synced)
+        )
+
+        for tmp_name, target_name, digest in renames:
+            # A recover() starting elsewhere may already have renamed it.
+            if not _roll_forward(
+                intent_path.parent, tmp_name, target_name, [digest]
+            ):
+                raise FileNotFoundError(tmp_name)
+        for directory in {
+            Path(target).parent
+            for (_, target, _), sync in zip(renames, synced) if sync
+        }:
+            fsync_directory(directory)
+        if ledger is not None:
+            ledger.append_many(events, tx=token)
+        intent_path.unlink(missing_ok=True)
+
+        for store, data in pending:
+            store.after_commit(data)
@@ -0,0 +1,91 @@
+"""Unit tests for occupancy analytics (pure-Python and NumPy paths)."""
+
+import shutil
+import tempfile
+import unittest
+
+from src.analytics import build_report, compute_report, numpy_available
+from src.compact import ReservationTable
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+
+def _table():
+    """Return a small table with dated, undated and canceled rows."""
+    return ReservationTable([
+        Reservation("R1", "H1", "C1"),
+        Reservation("R2", "H1", "C2", "CANCELED"),
+        Reservation("R3", "H1", "C1", check_in="2026-02-01",
+                    check_out="2026-02-03"),
+        Reservation("R4", "H2", "C1", check_in="2026-02-03",
+                    check_out="2026-02-04"),
+        Reservation("R5", "H9", "C3"),
+    ])
+
+
+class TestAnalytics(unittest.TestCase):
+    """Tests for the occupancy report."""
+
+    def test_python_report(self):
+        """Counts, ratios and customer totals on the fallback path."""
+        report = compute_report({"H1": 4, "H2": 2, "H3": 1}, _table(),
+                                use_numpy=False)
+
+        self.assertEqual(report.engine, "python")
+        self.assertEqual((report.active, report.canceled), (4, 1))
+        self.assertAlmostEqual(report.cancellation_ratio, 0.2)
+        hotel = report.by_hotel["H1"]
+        self.assertEqual((hotel.active, hotel.canceled), (2, 1))
+        self.assertAlmostEqual(hotel.occupancy_rate, 0.5)
+        self.assertAlmostEqual(hotel.cancellation_ratio, 1 / 3)
+        self.assertEqual(report.by_hotel["H3"].active, 0)
+        self.assertNotIn("H9", report.by_hotel)
+        self.assertEqual(report.customer_bookings,
+                         {"C1": 3, "C2": 1, "C3": 1})
+
+    def test_night_counts_covering_and_undated_stays(self):
+        """A night counts the stays covering it plus every undated stay."""
+        rooms = {"H1": 4, "H2": 2}
+        covered = compute_report(rooms, _table(), night="2026-02-02",
+                                 use_numpy=False)
+        later = compute_report(rooms, _table(), night="2026-03-01",
+                               use_numpy=False)
+
+        self.assertAlmostEqual(covered.by_hotel["H1"].occupancy_rate, 0.5)
+        self.assertEqual(covered.by_hotel["H2"].occupancy_rate, 0.0)
+        self.assertAlmostEqual(later.by_hotel["H1"].occupancy_rate, 0.25)
+        self.assertEqual(later.by_hotel["H2"].occupancy_rate, 0.0)
+
+    @unittest.skipUnless(numpy_available(), "NumPy is not installed")
+    def test_numpy_matches_python(self):
+        """Both engines produce the same report."""
+        rooms = {"H1": 4, "H2": 2}
+        for night in (None, "2026-02-03", "2026-03-01"):
+            fast = compute_report(rooms, _table(), night)
+            slow = compute_report(rooms, _table(), night, use_numpy=False)
+            self.assertEqual(fast.engine, "numpy")
+            slow.engine = "numpy"
+            self.assertEqual(fast, slow)
+
+    def test_build_report_from_services(self):
+        """build_report streams hotels and reservations from the stores."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        hotels = HotelService(FileStore(f"{tmp_dir}/hotels.json"))
+        customers = CustomerService(FileStore(f"{tmp_dir}/customers.json"))
+        reservations = ReservationService(
+            FileStore(f"{tmp_dir}/reservations.json"), hotels, customers
+        )
+        hotels.create(Hotel("H1", "A", 2, 2))
+        customers.create(Customer("C1", "Ana"))
+        reservations.create(Reservation("R1", "H1", "C1"))
+
+        report = build_report(hotels, reservations)
+
+        self.assertAlmostEqual(report.by_hotel["H1"].occupancy_rate, 0.5)
+        self.assertEqual(report.customer_bookings, {"C1": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
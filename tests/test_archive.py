@@ -0,0 +1,142 @@
+"""Unit tests for the reservation archive and its service integration."""
+
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.archive import ReservationArchive, archivable
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+# 2026-10-17T00:00:00Z
+OCTOBER = 1792195200.0
+
+
+class TestReservationArchive(unittest.TestCase):
+    """Tests for monthly partitions and lazy lookups."""
+
+    def setUp(self):
+        """Create a temporary archive directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def open(self, **kwargs):
+        """Open an archive with a fixed clock."""
+        return ReservationArchive(self.tmp_dir, clock=lambda: OCTOBER,
+                                  **kwargs)
+
+    def test_records_are_partitioned_by_month(self):
+        """Dated records go to their check-in month, others to today's."""
+        archive = self.open()
+        archive.add({
+            "R1": {"reservation_id": "R1", "check_in": "2026-03-02"},
+            "R2": {"reservation_id": "R2", "check_in": "2026-03-30"},
+            "R3": {"reservation_id": "R3"},
+        })
+
+        self.assertEqual(archive.partitions(), ["2026-03", "2026-10"])
+        raw = Path(self.tmp_dir, "reservations-2026-03.json.gz").read_bytes()
+        self.assertEqual(set(json.loads(gzip.decompress(raw))),
+                         {"R1", "R2"})
+        self.assertEqual(len(archive), 3)
+
+    def test_lookup_reads_one_partition(self):
+        """A fresh archive decodes only the partition holding the id."""
+        self.open().add({
+            "R1": {"reservation_id": "R1", "check_in": "2026-01-05"},
+            "R2": {"reservation_id": "R2", "check_in": "2026-02-05"},
+        })
+        archive = self.open()
+
+        self.assertEqual(archive.get("R2")["check_in"], "2026-02-05")
+        self.assertIsNone(archive.get("R9"))
+        self.assertEqual(archive.stats["partition_reads"], 1)
+        self.assertIn("R1", archive)
+
+    def test_readd_moves_record_between_months(self):
+        """Archiving a record again replaces it, even across months."""
+        archive = self.open()
+        archive.add({"R1": {"reservation_id": "R1",
+                            "check_in": "2026-01-05"}})
+        archive.add({"R1": {"reservation_id": "R1",
+                            "check_in": "2026-05-05"}})
+
+        reopened = self.open()
+        self.assertEqual(reopened.get("R1")["check_in"], "2026-05-05")
+        self.assertEqual(dict(reopened.iter_records()),
+                         {"R1": {"reservation_id": "R1",
+                                 "check_in": "2026-05-05"}})
+
+    def test_archivable(self):
+        """Canceled always; completed only when asked and past."""
+        done = {"status": "ACTIVE", "check_out": "2026-10-01"}
+
+        self.assertTrue(archivable({"status": "CANCELED"}))
+        self.assertFalse(archivable(done, False, "2026-10-17"))
+        self.assertTrue(archivable(done, True, "2026-10-17"))
+        self.assertFalse(archivable(done, True, "2026-09-30"))
+        self.assertFalse(archivable({"status": "ACTIVE"}, True, "2026"))
+
+
+class TestServiceArchiving(unittest.TestCase):
+    """ReservationService.archive_inactive() and the get() fallback."""
+
+    def setUp(self):
+        """Book three reservations and cancel one."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.store = FileStore(f"{self.tmp_dir}/reservations.json")
+        hotels = HotelService(FileStore(f"{self.tmp_dir}/hotels.json"))
+        customers = CustomerService(
+            FileStore(f"{self.tmp_dir}/customers.json")
+        )
+        self.archive = ReservationArchive(f"{self.tmp_dir}/archive")
+        self.service = ReservationService(
+            self.store, hotels, customers, archive=self.archive
+        )
+        hotels.create(Hotel("H1", "A", 3, 3))
+        customers.create(Customer("C1", "Ana"))
+        for number, dates in ((1, ("2026-01-01", "2026-01-03")),
+                              (2, ("2026-12-01", "2026-12-02")),
+                              (3, (None, None))):
+            self.service.create(Reservation(f"R{number}", "H1", "C1",
+                                            check_in=dates[0],
+                                            check_out=dates[1]))
+        self.service.cancel("R3")
+
+    def test_canceled_reservations_leave_the_store(self):
+        """Only active bookings stay hot; archived ones remain readable."""
+        self.assertEqual(self.service.archive_inactive(), 1)
+
+        self.assertEqual(sorted(self.store.load()), ["R1", "R2"])
+        self.assertEqual(self.service.get("R3").status, "CANCELED")
+        self.assertEqual(self.service.find_by_hotel("H1"), ["R1", "R2"])
+        self.assertFalse(
+            self.service.create(Reservation("R3", "H1", "C1"))
+        )
+
+    def test_completed_reservations_are_optional(self):
+        """Past stays move only with include_completed."""
+        moved = self.service.archive_inactive(include_completed=True,
+                                              today="2026-10-17")
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(list(self.store.load()), ["R2"])
+        self.assertEqual(len(self.archive), 2)
+        self.assertEqual(self.archive.partitions()[0], "2026-01")
+        self.assertEqual(self.service.get("R1").check_in, "2026-01-01")
+
+    def test_archive_is_required(self):
+        """Without an archive, archive_inactive() raises ValueError."""
+        self.service.archive = None
+
+        with self.assertRaises(ValueError):
+            self.service.archive_inactive()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Unit tests for the asyncio service facade."""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.async_services import (
+    AsyncCustomerService,
+    AsyncHotelService,
+    AsyncReservationService,
+    AsyncRunner,
+)
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+
+class SlowStore(FileStore):
+    """FileStore whose load blocks long enough for callers to overlap."""
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.loads = 0
+        self.delay = 0.05
+        self._count_lock = threading.Lock()
+
+    def load(self):
+        """Count calls and sleep after loading, so the data can age."""
+        with self._count_lock:
+            self.loads += 1
+        data = super().load()
+        time.sleep(self.delay)
+        return data
+
+
+class TestAsyncServices(unittest.TestCase):
+    """Tests for offloading, coalescing and the async API."""
+
+    def setUp(self):
+        """Wire async services over temporary stores."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.runner = AsyncRunner(max_workers=4)
+        self.addCleanup(self.runner.shutdown)
+
+        self.hotel_store = SlowStore(f"{self.tmp_dir}/hotels.json")
+        hotels = HotelService(self.hotel_store)
+        customers = CustomerService(
+            FileStore(f"{self.tmp_dir}/customers.json")
+        )
+        reservations = ReservationService(
+            FileStore(f"{self.tmp_dir}/reservations.json"), hotels, customers
+        )
+        self.hotels = AsyncHotelService(hotels, self.runner)
+        self.customers = AsyncCustomerService(customers, self.runner)
+        self.reservations = AsyncReservationService(
+            reservations, self.runner
+        )
+
+    def test_crud_and_booking(self):
+        """The async API mirrors the synchronous services."""
+        async def scenario():
+            self.assertTrue(await self.hotels.create(Hotel("H1", "A", 2, 2)))
+            self.assertTrue(
+                await self.customers.create(Customer("C1", "Ana"))
+            )
+            self.assertTrue(
+                await self.reservations.create(Reservation("R1", "H1", "C1"))
+            )
+            self.assertEqual((await self.hotels.get("H1")).rooms_available, 1)
+            self.assertEqual(
+                await self.reservations.find_by_hotel("H1"), ["R1"]
+            )
+            self.assertTrue(await self.reservations.cancel("R1"))
+            self.assertEqual(
+                (await self.reservations.get("R1")).status, "CANCELED"
+            )
+            self.assertIsNone(await self.customers.get("C404"))
+
+        asyncio.run(scenario())
+
+    def test_concurrent_reads_are_coalesced(self):
+        """Many concurrent gets share one in-flight load."""
+        self.hotel_store.save(
+            {"H1": {"hotel_id": "H1", "name": "A",
+                    "rooms_total": 1, "rooms_available": 1}}
+        )
+
+        async def scenario():
+            return await asyncio.gather(
+                *(self.hotels.get("H1") for _ in range(20))
+            )
+
+        results = asyncio.run(scenario())
+
+        self.assertTrue(all(hotel.name == "A" for hotel in results))
+        self.assertEqual(self.hotel_store.loads, 1)
+        self.assertEqual(self.runner.stats["coalesced"], 19)
+
+    def test_reads_after_a_write_do_not_join_older_loads(self):
+        """A get issued after an update sees it, despite a load in flight."""
+        self.hotel_store.save(
+            {"H1": {"hotel_id": "H1", "name": "A",
+                    "rooms_total": 1, "rooms_available": 1}}
+        )
+
+        async def scenario():
+            self.hotel_store.delay = 0.3
+            early = asyncio.ensure_future(self.hotels.get("H1"))
+            await asyncio.sleep(0.05)
+            self.hotel_store.delay = 0
+            self.assertTrue(await self.hotels.update("H1", name="B"))
+            late = await self.hotels.get("H1")
+            return (await early).name, late.name
+
+        self.assertEqual(asyncio.run(scenario()), ("A", "B"))
+
+    def test_event_loop_stays_responsive(self):
+        """Blocking storage work does not stall other coroutines."""
+        async def heartbeat(stop, lags):
+            while not stop.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        async def scenario():
+            await self.hotels.create(Hotel("H1", "A", 50, 50))
+            await self.customers.create(Customer("C1", "Ana"))
+            stop, lags = asyncio.Event(), []
+            beat = asyncio.create_task(heartbeat(stop, lags))
+            await asyncio.gather(*(
+                self.reservations.create(Reservation(f"R{i}", "H1", "C1"))
+                for i in range(20)
+            ))
+            stop.set()
+            await beat
+            return lags
+
+        lags = asyncio.run(scenario())
+
+        self.assertTrue(lags)
+        self.assertLess(max(lags), 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Unit tests for the benchmark data generator and runner."""
+
+import json
+import unittest
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from benchmarks import codecs, run
+from benchmarks.datagen import generate
+from src.services import ReservationService
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Tests for deterministic data and the JSON report."""
+
+    def test_generate_is_deterministic(self):
+        """The same seed gives the same data; hotels have free rooms."""
+        first = generate(5, 8, 50, seed=3)
+
+        self.assertEqual(first, generate(5, 8, 50, seed=3))
+        self.assertNotEqual(first, generate(5, 8, 50, seed=4))
+        self.assertEqual(len(first["reservations"]), 50)
+        self.assertTrue(all(
+            hotel["rooms_available"] > 0
+            for hotel in first["hotels"].values()
+        ))
+
+    def test_percentile_nearest_rank(self):
+        """Percentiles use the nearest-rank definition."""
+        samples = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(run.percentile(samples, 0.5), 50.0)
+        self.assertEqual(run.percentile(samples, 0.99), 99.0)
+        self.assertEqual(run.percentile([], 0.5), 0.0)
+
+    def test_main_writes_report(self):
+        """A tiny run reports every scenario as JSON."""
+        with TemporaryDirectory() as tmp:
+            output = f"{tmp}/bench.json"
+            run.main(["--sizes", "30", "--ops", "3", "--output", output])
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+
+        scenarios = [row["scenario"] for row in report["results"]]
+        self.assertEqual(scenarios, list(run.SCENARIOS))
+        self.assertEqual(report["results"][0]["ops"], 3)
+        self.assertTrue(all(row["ops_per_sec"] for row in report["results"]))
+
+    def test_cancel_runs_on_its_own(self):
+        """The cancel scenario seeds the bookings it cancels."""
+        cancel = ReservationService.cancel
+        outcomes = []
+
+        def cancel_and_record(service, reservation_id):
+            outcomes.append(cancel(service, reservation_id))
+            return outcomes[-1]
+
+        with mock.patch.object(ReservationService, "cancel",
+                               cancel_and_record):
+            rows = run.run_size(30, ops=3, scenarios=["cancel"])
+
+        self.assertEqual([row["scenario"] for row in rows], ["cancel"])
+        self.assertEqual(outcomes, [True, True, True])
+
+    def test_codec_benchmark_covers_save_and_load(self):
+        """The codec benchmark times both directions per codec."""
+        rows = codecs.run_codecs([20], ["json", "marshal"], repeat=2)
+
+        self.assertEqual(
+            [row["scenario"] for row in rows],
+            ["json:save", "json:load", "marshal:save", "marshal:load"],
+        )
+        self.assertLess(rows[2]["bytes"], rows[0]["bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Unit tests for slotted models and the columnar reservation table."""
+
+import sys
+import unittest
+from dataclasses import asdict
+
+from src.compact import ReservationTable
+from src.models import Hotel, Reservation
+
+
+class TestReservationTable(unittest.TestCase):
+    """Tests for conversion, updates and queries on ReservationTable."""
+
+    def setUp(self):
+        """Fill a table with a few reservations."""
+        self.reservations = [
+            Reservation("R1", "H1", "C1"),
+            Reservation("R2", "H1", "C2", "CANCELED"),
+            Reservation("R3", "H2", "C1", check_in="2026-01-30",
+                        check_out="2026-02-02"),
+        ]
+        self.table = ReservationTable(self.reservations)
+
+    def test_roundtrip_to_dataclasses_and_records(self):
+        """Rows convert back to the same dataclasses and dicts."""
+        self.assertEqual(list(self.table), self.reservations)
+        self.assertEqual(self.table.get("R2"), self.reservations[1])
+        self.assertIsNone(self.table.get("R404"))
+        records = self.table.to_records()
+        self.assertEqual(records["R3"], asdict(self.reservations[2]))
+        self.assertEqual(
+            list(ReservationTable.from_records(records.items())),
+            self.reservations,
+        )
+
+    def test_ids_are_interned_and_status_coded(self):
+        """Repeated ids share one code; status uses a byte column."""
+        self.assertEqual(len(self.table.hotels), 2)
+        self.assertEqual(len(self.table.customers), 2)
+        self.assertEqual(
+            self.table.count_by_status(), {"ACTIVE": 2, "CANCELED": 1}
+        )
+
+    def test_updates_and_column_queries(self):
+        """set_status, add (replace) and remove keep rows consistent."""
+        self.assertTrue(self.table.set_status("R1", "CANCELED"))
+        self.table.add(Reservation("R2", "H2", "C2"))
+        self.assertTrue(self.table.remove("R1"))
+        self.assertFalse(self.table.remove("R1"))
+
+        self.assertEqual(len(self.table), 2)
+        self.assertNotIn("R1", self.table)
+        self.assertEqual(sorted(self.table.ids_where(hotel_id="H2")),
+                         ["R2", "R3"])
+        self.assertEqual(
+            self.table.ids_where(customer_id="C1", status="ACTIVE"), ["R3"]
+        )
+        self.assertEqual(self.table.ids_where(hotel_id="H404"), [])
+
+    def test_smaller_than_dict_of_dicts(self):
+        """The table uses less memory than the persisted layout."""
+        table = ReservationTable(
+            Reservation(f"R{i}", f"H{i % 10}", f"C{i % 100}")
+            for i in range(2000)
+        )
+        records = table.to_records()
+        dict_bytes = sys.getsizeof(records) + sum(
+            sys.getsizeof(key) + sys.getsizeof(record)
+            for key, record in records.items()
+        )
+
+        self.assertLess(table.nbytes(), dict_bytes / 2)
+
+    def test_models_are_slotted(self):
+        """Model instances have no per-instance __dict__."""
+        self.assertFalse(hasattr(Hotel("H1", "A", 1, 1), "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
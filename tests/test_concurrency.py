@@ -0,0 +1,119 @@
+"""Stress tests for concurrent bookings with per-hotel locking."""
+
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.locking import FileLock, LockManager
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+HOTELS = {"H001": 5, "H002": 3}
+
+
+def _services(tmp_dir):
+    """Build services with locking over the files in ``tmp_dir``."""
+    hotel_service = HotelService(FileStore(f"{tmp_dir}/hotels.json"))
+    customer_service = CustomerService(FileStore(f"{tmp_dir}/customers.json"))
+    reservation_service = ReservationService(
+        FileStore(f"{tmp_dir}/reservations.json"),
+        hotel_service,
+        customer_service,
+        locks=LockManager(f"{tmp_dir}/locks"),
+    )
+    return hotel_service, customer_service, reservation_service
+
+
+def _book_many(tmp_dir, worker, attempts):
+    """Try ``attempts`` bookings per hotel from several threads."""
+    _, _, reservations = _services(tmp_dir)
+    jobs = [
+        Reservation(f"R-{worker}-{hotel_id}-{i}", hotel_id, "C001")
+        for hotel_id in HOTELS
+        for i in range(attempts)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return sum(pool.map(reservations.create, jobs))
+
+
+class TestConcurrentBooking(unittest.TestCase):
+    """No hotel is ever overbooked under concurrent load."""
+
+    def setUp(self):
+        """Create hotels with a few rooms and one customer."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        hotels, customers, _ = _services(self.tmp_dir)
+        for hotel_id, rooms in HOTELS.items():
+            hotels.create(Hotel(hotel_id, hotel_id, rooms, rooms))
+        customers.create(Customer("C001", "Customer"))
+
+    def assert_not_overbooked(self):
+        """Active reservations match each hotel's capacity exactly."""
+        hotels, _, reservations = _services(self.tmp_dir)
+        for hotel_id, rooms in HOTELS.items():
+            active = reservations.find_by_hotel(hotel_id, status="ACTIVE")
+            self.assertEqual(len(active), rooms)
+            self.assertEqual(hotels.get(hotel_id).rooms_available, 0)
+
+    def test_threads_do_not_overbook(self):
+        """Many threads booking the same hotels never exceed capacity."""
+        booked = _book_many(self.tmp_dir, "t", attempts=10)
+
+        self.assertEqual(booked, sum(HOTELS.values()))
+        self.assert_not_overbooked()
+
+    def test_processes_do_not_overbook(self):
+        """Several processes with their own threads share the rooms."""
+        context = multiprocessing.get_context("fork")
+        with context.Pool(4) as pool:
+            booked = pool.starmap(
+                _book_many, [(self.tmp_dir, w, 4) for w in range(4)]
+            )
+
+        self.assertEqual(sum(booked), sum(HOTELS.values()))
+        self.assert_not_overbooked()
+
+    def test_cancel_and_rebook_under_contention(self):
+        """Concurrent cancels release exactly the rooms they held."""
+        _book_many(self.tmp_dir, "a", attempts=5)
+        _, _, reservations = _services(self.tmp_dir)
+        active = reservations.find_by_hotel("H001", status="ACTIVE")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            self.assertTrue(all(pool.map(reservations.cancel, active)))
+
+        self.assertEqual(_book_many(self.tmp_dir, "b", attempts=10),
+                         HOTELS["H001"])
+        self.assert_not_overbooked()
+
+
+class TestFileLock(unittest.TestCase):
+    """FileLock is re-entrant and mutually exclusive."""
+
+    def test_reentrant_and_exclusive(self):
+        """The owner can re-acquire; other threads must wait."""
+        with tempfile.TemporaryDirectory() as tmp:
+            lock = FileLock(f"{tmp}/x.lock")
+            acquired = []
+
+            def contend():
+                with lock:
+                    acquired.append(True)
+
+            with lock:
+                with lock:
+                    thread = threading.Thread(target=contend)
+                    thread.start()
+                    thread.join(timeout=0.1)
+                    self.assertEqual(acquired, [])
+            thread.join()
+            self.assertEqual(acquired, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,8 +5,11 @@ Covers create/get/update/delete and edge cases using an isolated
 temporary JSON store per test.
 """
 
+import shutil
+import threading
 import unittest
-from tempfile import TemporaryDirectory
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory, mkdtemp
 
 from src.models import Customer
 from src.services import CustomerService
@@ -110,6 +113,130 @@ class TestCustomerService(unittest.TestCase):
             service = CustomerService(store)
             self.assertEqual(service.list_all(), {})
 
+    def test_create_many_rejects_duplicates_within_batch(self):
+        """A repeated id inside one batch is reported, not saved twice."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/customers.json")
+            service = CustomerService(store)
+
+            results = service.create_many([
+                Customer("C001", "Andrea"),
+                Customer("C001", "Other"),
+            ])
+
+            self.assertTrue(results[0].ok)
+            self.assertFalse(results[1].ok)
+            self.assertEqual(service.get("C001").name, "Andrea")
+
+    def test_compare_and_set_on_legacy_record(self):
+        """Records saved without a version start at version 0."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/customers.json")
+            store.save({"C001": {"customer_id": "C001", "name": "Old"}})
+            service = CustomerService(store)
+
+            self.assertFalse(service.compare_and_set("C001", 3, name="X").ok)
+            self.assertTrue(service.compare_and_set("C001", 0, name="X").ok)
+            self.assertEqual(service.get("C001").version, 1)
+
+
+class TestCustomerSearch(unittest.TestCase):
+    """Tests for the email and name-prefix indexes."""
+
+    def setUp(self):
+        """Create a service over a temporary store with a few customers."""
+        tmp_dir = mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.path = f"{tmp_dir}/customers.json"
+        self.service = CustomerService(FileStore(self.path))
+        for customer in (
+            Customer("C1", "José Pérez", " Jose@Example.com "),
+            Customer("C2", "Josefa  Ruiz", "josefa@example.com"),
+            Customer("C3", "Ana", None),
+            Customer("C4", "jorge", "jorge@example.com"),
+        ):
+            self.service.create(customer)
+
+    def ids(self, customers):
+        """Return the ids of a list of customers."""
+        return [customer.customer_id for customer in customers]
+
+    def test_find_by_email_is_normalized(self):
+        """Lookups ignore surrounding spaces and case."""
+        self.assertEqual(
+            self.ids(self.service.find_by_email("JOSE@example.com")), ["C1"]
+        )
+        self.assertEqual(self.service.find_by_email("nobody@x.com"), [])
+
+    def test_search_by_name_prefix(self):
+        """Prefix search ignores case and accents, in name order."""
+        self.assertEqual(
+            self.ids(self.service.search_by_name("jos")), ["C1", "C2"]
+        )
+        self.assertEqual(
+            self.ids(self.service.search_by_name("JO", limit=2)),
+            ["C4", "C1"],
+        )
+        self.assertEqual(
+            self.ids(self.service.search_by_name("josefa r")), ["C2"]
+        )
+        with self.assertRaises(ValueError):
+            self.service.search_by_name("a", limit=0)
+
+    def test_indexes_follow_writes(self):
+        """Updates, deletes and external writes are reflected."""
+        self.service.update("C3", name="Joaquín", email="ana@example.com")
+        self.service.delete("C4")
+
+        self.assertEqual(
+            self.ids(self.service.search_by_name("jo")), ["C3", "C1", "C2"]
+        )
+        self.assertEqual(
+            self.ids(self.service.find_by_email("ana@example.com")), ["C3"]
+        )
+        FileStore(self.path).put_record(
+            "C5", {"customer_id": "C5", "name": "Jo", "version": 0}
+        )
+        self.assertEqual(self.ids(self.service.search_by_name("jo"))[0],
+                         "C5")
+
+    def test_unique_email_is_enforced(self):
+        """With unique_email, no two customers share an email."""
+        service = CustomerService(FileStore(self.path), unique_email=True)
+
+        self.assertFalse(
+            service.create(Customer("C9", "X", "JOSE@example.com"))
+        )
+        self.assertFalse(service.update("C3", email="jorge@example.com"))
+        self.assertTrue(service.update("C1", email="jose@example.com"))
+        results = service.create_many([
+            Customer("C7", "Y", "new@example.com"),
+            Customer("C8", "Z", "New@Example.com"),
+        ])
+        self.assertEqual([r.ok for r in results], [True, False])
+        updated = service.update_many({"C3": {"email": "new@example.com"},
+                                       "C2": {"name": "Josefina"}})
+        self.assertEqual([r.ok for r in updated], [False, True])
+        self.assertIsNone(service.get("C3").email)
+
+    def test_concurrent_creates_cannot_share_an_email(self):
+        """Racing creates with one email: exactly one customer wins."""
+        barrier = threading.Barrier(6)
+
+        def create(number):
+            service = CustomerService(FileStore(self.path), unique_email=True)
+            barrier.wait()
+            return service.create(
+                Customer(f"N{number}", "N", "same@example.com")
+            )
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(create, range(6)))
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(len(self.service.find_by_email("same@example.com")),
+                         1)
+
 
 if __name__ == "__main__":
     unittest.main()
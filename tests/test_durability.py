@@ -0,0 +1,211 @@
+"""Unit tests for atomic saves, durability levels and group commit."""
+
+import json
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src import durability
+from src.durability import GroupSync, LatencyStats, replace_file
+from src.storage import FileStore
+from src.transactions import UnitOfWork
+
+
+class TestReplaceFile(unittest.TestCase):
+    """Tests for the write-to-temp-and-rename helper."""
+
+    def test_replace_leaves_no_temporary_files(self):
+        """The new contents land in place and no .tmp file remains."""
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            path.write_text("old", encoding="utf-8")
+
+            replace_file(path, b"new")
+
+            self.assertEqual(path.read_text(encoding="utf-8"), "new")
+            self.assertEqual(os.listdir(tmp), ["data.json"])
+
+    def test_failed_rename_keeps_old_contents(self):
+        """A failure before the rename leaves the old file intact."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+
+            with mock.patch.object(
+                durability.os, "replace", side_effect=OSError("disk")
+            ):
+                store.save({"B": {"value": 2}})
+
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+            self.assertEqual(os.listdir(tmp), ["data.json"])
+
+
+class TestDurabilityLevels(unittest.TestCase):
+    """Tests for FileStore durability options and commit stats."""
+
+    def test_unknown_level_raises(self):
+        """Only the documented levels are accepted."""
+        with self.assertRaises(ValueError):
+            FileStore("unused.json", durability="eventually")
+
+    def test_none_level_skips_fsync(self):
+        """durability='none' (the default) renames without fsync."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+
+            with mock.patch.object(durability.os, "fsync") as fsync:
+                store.save({"A": {"value": 1}})
+
+            fsync.assert_not_called()
+            self.assertEqual(store.durability, "none")
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+
+    def test_unit_of_work_follows_durability(self):
+        """UoW commits fsync only for stores at the "fsync" level."""
+        for level, expected in (("none", 0), ("fsync", 5)):
+            with TemporaryDirectory() as tmp:
+                first = FileStore(f"{tmp}/first.json", durability=level)
+                second = FileStore(f"{tmp}/second.json", durability=level)
+
+                with mock.patch.object(durability.os, "fsync") as fsync:
+                    with UnitOfWork(tmp) as uow:
+                        uow.put(first, "A", {"value": 1})
+                        uow.put(second, "B", {"value": 2})
+
+                self.assertEqual(fsync.call_count, expected, level)
+                self.assertEqual(second.load(), {"B": {"value": 2}})
+
+    def test_output_is_unchanged_pretty_json(self):
+        """Atomic saves still write indent=2 JSON."""
+        with TemporaryDirectory() as tmp:
+            data = {"A": {"value": 1}}
+            FileStore(f"{tmp}/data.json").save(data)
+
+            self.assertEqual(
+                Path(f"{tmp}/data.json").read_text(encoding="utf-8"),
+                json.dumps(data, indent=2, ensure_ascii=False),
+            )
+
+    def test_commit_stats_count_saves(self):
+        """Every save records one commit latency."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            for number in range(3):
+                store.put_record(str(number), {"value": number})
+
+            stats = store.commit_stats.snapshot()
+
+            self.assertEqual(stats["count"], 3)
+            self.assertGreaterEqual(stats["max_ms"], stats["p50_ms"])
+
+    def test_latency_percentiles(self):
+        """snapshot() reports milliseconds over the recorded samples."""
+        stats = LatencyStats()
+        for seconds in (0.001, 0.002, 0.003, 0.004):
+            stats.record(seconds)
+
+        snapshot = stats.snapshot()
+
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["mean_ms"], 2.5)
+        self.assertAlmostEqual(snapshot["p50_ms"], 3.0)
+        self.assertAlmostEqual(snapshot["max_ms"], 4.0)
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Tests for batching concurrent saves into one durable write."""
+
+    def test_group_sync_folds_waiters(self):
+        """Changes staged before a flush starts share that flush."""
+        flushed = []
+        group = GroupSync(lambda: flushed.append(1), window=0)
+        first, second = group.stage(), group.stage()
+
+        group.wait(second)
+        group.wait(first)
+
+        self.assertEqual(len(flushed), 1)
+        self.assertEqual(group.flushes, 1)
+
+    def test_failed_flush_reaches_every_waiter(self):
+        """Each change covered by a failed flush sees its error."""
+        outcomes = [OSError("disk"), None]
+
+        def flush():
+            error = outcomes.pop(0)
+            if error is not None:
+                raise error
+
+        group = GroupSync(flush, window=0)
+        first, second = group.stage(), group.stage()
+
+        for seq in (second, first):
+            with self.assertRaisesRegex(OSError, "disk"):
+                group.wait(seq)
+        group.wait(group.stage())
+        self.assertEqual(group.flushes, 1)
+
+    def test_group_save_reports_failed_write(self):
+        """A save whose group write fails warns instead of succeeding."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json", durability="group",
+                              group_window=0)
+
+            with mock.patch.object(
+                durability.os, "replace", side_effect=OSError("disk")
+            ), mock.patch("builtins.print") as warn:
+                store.save({"A": {"value": 1}})
+
+            self.assertIn("Could not save", str(warn.call_args))
+            self.assertFalse(store.path.exists())
+
+    def test_concurrent_writes_share_flushes(self):
+        """Concurrent record writes need fewer writes than saves."""
+        with TemporaryDirectory() as tmp:
+            path = f"{tmp}/data.json"
+            store = FileStore(path, durability="group", group_window=0.01)
+
+            def write(number):
+                store.put_record(f"R{number:02d}", {"value": number})
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(write, range(40)))
+
+            self.assertLess(store.stats["writes"], 40)
+            self.assertEqual(store.commit_stats.snapshot()["count"], 40)
+            self.assertEqual(len(FileStore(path).load()), 40)
+            self.assertEqual(sorted(os.listdir(tmp)),
+                             [".data.json.lock", "data.json"])
+
+    def test_unit_of_work_syncs_through_the_group(self):
+        """A UoW commit on a group store waits for one group flush."""
+        with TemporaryDirectory() as tmp:
+            path = f"{tmp}/data.json"
+            store = FileStore(path, durability="group", group_window=0)
+
+            with mock.patch.object(durability.os, "fsync") as fsync:
+                with UnitOfWork(tmp) as uow:
+                    uow.put(store, "A", {"value": 1})
+
+            # One data fsync and one directory fsync, from the flush.
+            self.assertEqual(fsync.call_count, 2)
+            self.assertEqual(FileStore(path).load(), {"A": {"value": 1}})
+
+    def test_group_save_is_durable_on_return(self):
+        """A plain save() returns only after the file holds the data."""
+        with TemporaryDirectory() as tmp:
+            path = f"{tmp}/data.json"
+            store = FileStore(path, durability="group", group_window=0)
+
+            store.save({"A": {"value": 1}})
+            store.update_record("A", {"value": 2})
+
+            self.assertEqual(FileStore(path).load(), {"A": {"value": 2}})
+            self.assertEqual(store.stats["reads"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
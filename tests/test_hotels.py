@@ -5,7 +5,9 @@ Covers create/get/update/delete and edge cases using an isolated
 temporary JSON store per test.
 """
 
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import TemporaryDirectory
 
 from src.models import Hotel
@@ -118,6 +120,141 @@ class TestHotelService(unittest.TestCase):
             service = HotelService(store)
             self.assertEqual(service.list_all(), {})
 
+    def test_create_many_reports_each_item(self):
+        """create_many saves valid hotels and reports failures."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/hotels.json")
+            service = HotelService(store)
+
+            results = service.create_many([
+                Hotel("H001", "A", 1, 1),
+                Hotel("H001", "A again", 1, 1),
+                Hotel("HNEG", "Bad", -1, 0),
+                Hotel("H002", "B", 2, 2),
+            ])
+
+            self.assertEqual([r.ok for r in results],
+                             [True, False, False, True])
+            self.assertEqual(results[1].message, "Hotel already exists.")
+            self.assertEqual(results[2].message, "Invalid room values.")
+            self.assertEqual(set(service.list_all()), {"H001", "H002"})
+            self.assertEqual(store.stats["writes"], 1)
+
+    def test_update_and_delete_many(self):
+        """update_many and delete_many apply in one save each."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/hotels.json")
+            service = HotelService(store)
+            service.create_many([Hotel("H001", "A", 1, 1),
+                                 Hotel("H002", "B", 1, 1)])
+
+            updated = service.update_many({"H001": {"name": "A2"},
+                                           "H404": {"name": "X"}})
+            self.assertEqual([r.ok for r in updated], [True, False])
+            self.assertEqual(service.get("H001").name, "A2")
+
+            deleted = service.delete_many(["H002", "H404"])
+            self.assertEqual([r.ok for r in deleted], [True, False])
+            self.assertEqual(set(service.list_all()), {"H001"})
+
+    def test_iter_all_skips_malformed_typed_records(self):
+        """Typed iteration skips records that cannot build a Hotel."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/hotels.json")
+            service = HotelService(store)
+            service.create(Hotel("H001", "A", 2, 2))
+            store.put_record("H002", {"hotel_id": "H002", "bad": 1})
+
+            hotels = list(service.iter_all(typed=True))
+            raw = dict(service.iter_all())
+
+            self.assertEqual([hotel.hotel_id for hotel in hotels], ["H001"])
+            self.assertEqual(set(raw), {"H001", "H002"})
+
+    def test_update_bumps_version(self):
+        """Every successful update increments the record version."""
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+            service.create(Hotel("H001", "A", 1, 1))
+
+            service.update("H001", name="B")
+            service.update("H001", name="C")
+
+            self.assertEqual(service.get("H001").version, 2)
+
+    def test_compare_and_set_rejects_stale_version(self):
+        """A writer holding an old version is rejected with the current."""
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+            service.create(Hotel("H001", "A", 1, 1))
+            seen = service.get("H001").version
+
+            first = service.compare_and_set("H001", seen, name="First")
+            stale = service.compare_and_set("H001", seen, name="Second")
+            retry = service.compare_and_set("H001", stale.version,
+                                            name="Second")
+
+            self.assertTrue(first.ok)
+            self.assertEqual(first.version, 1)
+            self.assertFalse(stale.ok)
+            self.assertEqual(stale.version, 1)
+            self.assertTrue(retry.ok)
+            self.assertEqual(service.get("H001").name, "Second")
+
+    def test_concurrent_compare_and_set_has_one_winner(self):
+        """Writers racing from the same version: exactly one succeeds."""
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+            service.create(Hotel("H001", "A", 1, 1))
+            barrier = threading.Barrier(8)
+
+            def write(number):
+                barrier.wait()
+                return service.compare_and_set("H001", 0, name=f"N{number}")
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(write, range(8)))
+
+            self.assertEqual([result.ok for result in results].count(True), 1)
+            self.assertEqual(service.get("H001").version, 1)
+
+    def test_compare_and_set_missing_hotel(self):
+        """A missing hotel has no version."""
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+
+            result = service.compare_and_set("H404", 0, name="X")
+
+            self.assertFalse(result.ok)
+            self.assertIsNone(result.version)
+
+    def test_query_filters_sorts_and_paginates(self):
+        """query() pages follow mutations made through the service."""
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+            service.create_many(
+                Hotel(f"H{i}", f"Hotel {i}", i, i) for i in range(1, 6)
+            )
+
+            first = service.query(
+                {"rooms_total": {"gte": 2}}, order_by="rooms_total",
+                descending=True, limit=2, typed=True,
+            )
+            service.update("H3", rooms_total=10)
+            service.delete("H2")
+            second = service.query(
+                {"rooms_total": {"gte": 2}}, order_by="rooms_total",
+                descending=True, limit=2, cursor=first.next_cursor,
+            )
+
+            self.assertEqual([h.hotel_id for h in first.items], ["H5", "H4"])
+            self.assertEqual([key for key, _ in second.items], [])
+            self.assertIsNone(second.next_cursor)
+            self.assertEqual(
+                [key for key, _ in service.query().items],
+                ["H1", "H3", "H4", "H5"],
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
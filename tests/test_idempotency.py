@@ -0,0 +1,143 @@
+"""Unit tests for IdempotencyCache and idempotent creates."""
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.idempotency import IdempotencyCache, IdempotencyConflict
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+
+class TestIdempotencyCache(unittest.TestCase):
+    """Tests for replay, eviction, expiry and persistence."""
+
+    def setUp(self):
+        """Create a temporary directory for cache files."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = f"{self.tmp_dir}/keys.jsonl"
+
+    def test_run_replays_first_result(self):
+        """A repeated key returns the recorded result without running."""
+        cache = IdempotencyCache()
+        calls = []
+
+        first = cache.run("k", lambda: calls.append(1) or True, "req")
+        second = cache.run("k", lambda: calls.append(2) or False, "req")
+
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertEqual(calls, [1])
+        self.assertEqual(cache.stats["hits"], 1)
+        with self.assertRaises(IdempotencyConflict):
+            cache.run("k", lambda: True, "other")
+
+    def test_lru_eviction_and_ttl(self):
+        """Old keys are evicted past capacity and expire after the TTL."""
+        now = [1000.0]
+        cache = IdempotencyCache(capacity=2, ttl=60, clock=lambda: now[0])
+        cache.run("a", lambda: 1)
+        cache.run("b", lambda: 2)
+        cache.get("a")
+        cache.run("c", lambda: 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+        now[0] += 60
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.stats["evicted"], 1)
+
+    def test_results_survive_restart(self):
+        """A new cache on the same file replays live entries."""
+        cache = IdempotencyCache(self.path, capacity=2)
+        for key in ("a", "b", "c"):
+            cache.run(key, lambda key=key: key.upper())
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write('{"key": "torn"')
+
+        reopened = IdempotencyCache(self.path, capacity=2)
+
+        self.assertEqual(reopened.get("c"), "C")
+        self.assertIsNone(reopened.get("a"))
+        with open(self.path, encoding="utf-8") as handle:
+            self.assertEqual(len(handle.readlines()), 2)
+
+    def test_concurrent_calls_run_once(self):
+        """Callers racing on one key share a single execution."""
+        cache = IdempotencyCache()
+        calls = []
+
+        def operation():
+            calls.append(1)
+            time.sleep(0.05)
+            return "done"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.run("k", operation))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["done"] * 5)
+
+
+class TestIdempotentCreate(unittest.TestCase):
+    """Retried creates do not touch the stores."""
+
+    def setUp(self):
+        """Wire services that share one persisted cache."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        cache = IdempotencyCache(f"{self.tmp_dir}/keys.jsonl")
+        self.hotels = FileStore(f"{self.tmp_dir}/hotels.json")
+        self.reservations = FileStore(f"{self.tmp_dir}/reservations.json")
+        hotel_service = HotelService(self.hotels, idempotency=cache)
+        customer_service = CustomerService(
+            FileStore(f"{self.tmp_dir}/customers.json"), idempotency=cache
+        )
+        self.service = ReservationService(
+            self.reservations, hotel_service, customer_service,
+            idempotency=cache,
+        )
+        hotel_service.create(Hotel("H1", "A", 1, 1), idempotency_key="h")
+        customer_service.create(Customer("C1", "Ana"))
+
+    def test_retry_returns_original_result(self):
+        """The retry succeeds again and reads or writes nothing."""
+        booking = Reservation("R1", "H1", "C1")
+        self.assertTrue(self.service.create(booking, idempotency_key="k1"))
+        reads = (self.hotels.stats["reads"], self.reservations.stats["reads"])
+        writes = self.hotels.stats["writes"]
+
+        self.assertTrue(self.service.create(booking, idempotency_key="k1"))
+        self.assertEqual(
+            (self.hotels.stats["reads"], self.reservations.stats["reads"]),
+            reads,
+        )
+        self.assertEqual(self.hotels.stats["writes"], writes)
+        self.assertFalse(self.service.create(
+            Reservation("R2", "H1", "C1"), idempotency_key="k1"
+        ))
+
+    def test_key_without_cache_is_rejected(self):
+        """Passing a key to a service without a cache is a config error."""
+        service = HotelService(self.hotels)
+
+        with self.assertRaises(ValueError):
+            service.create(Hotel("H2", "B", 1, 1), idempotency_key="x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""Unit tests for SecondaryIndex, SortedIndex and QueryViews."""
+
+import shutil
+import tempfile
+import unittest
+
+from src.indexes import SecondaryIndex, SortedIndex, prefix_end
+from src.journal import JournalStore
+from src.queries import QueryViews, decode_cursor, encode_cursor
+
+
+class TestSecondaryIndex(unittest.TestCase):
+    """Tests for add/remove/rebuild and lookups."""
+
+    def setUp(self):
+        """Build a small index over two fields."""
+        self.index = SecondaryIndex(("hotel_id", "status"))
+        self.index.rebuild({
+            "R1": {"hotel_id": "H1", "status": "ACTIVE"},
+            "R2": {"hotel_id": "H1", "status": "CANCELED"},
+            "R3": {"hotel_id": "H2", "status": "ACTIVE"},
+            "BAD": "not-a-dict",
+        })
+
+    def test_lookup_by_field(self):
+        """lookup() returns every id with the value."""
+        self.assertEqual(self.index.lookup("hotel_id", "H1"), {"R1", "R2"})
+        self.assertEqual(self.index.count("status", "ACTIVE"), 2)
+        self.assertEqual(self.index.lookup("hotel_id", "H9"), set())
+        self.assertEqual(len(self.index), 3)
+
+    def test_add_reindexes_changed_record(self):
+        """Re-adding a record moves it between postings."""
+        self.index.add("R1", {"hotel_id": "H1", "status": "CANCELED"})
+
+        self.assertEqual(self.index.lookup("status", "ACTIVE"), {"R3"})
+        self.assertEqual(
+            self.index.lookup("status", "CANCELED"), {"R1", "R2"}
+        )
+
+    def test_remove_drops_empty_postings(self):
+        """Removing the last id for a value forgets the value."""
+        self.index.remove("R3")
+        self.index.remove("R404")
+
+        self.assertEqual(self.index.lookup("hotel_id", "H2"), set())
+        self.assertEqual(len(self.index), 2)
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Tests for ordered scans with bounds and cursors."""
+
+    def setUp(self):
+        """Index five records by name, including ties and a None."""
+        self.index = SortedIndex("name")
+        self.index.rebuild({
+            "H1": {"name": "Beta"},
+            "H2": {"name": "Alpha"},
+            "H3": {"name": "Beta"},
+            "H4": {"name": None},
+            "H5": {"name": "Gamma"},
+            "BAD": "not-a-dict",
+        })
+
+    def test_scan_orders_by_value_then_id(self):
+        """None sorts first and ties are broken by id."""
+        self.assertEqual(
+            list(self.index.scan()), ["H4", "H2", "H1", "H3", "H5"]
+        )
+        self.assertEqual(
+            list(self.index.scan(descending=True)),
+            ["H5", "H3", "H1", "H2", "H4"],
+        )
+        self.assertEqual(len(self.index), 5)
+
+    def test_scan_bounds_and_after(self):
+        """Bounds respect inclusivity and ``after`` resumes past an entry."""
+        self.assertEqual(
+            list(self.index.scan(("Beta", True), ("Beta", True))),
+            ["H1", "H3"],
+        )
+        self.assertEqual(
+            list(self.index.scan(("Alpha", False), ("Gamma", False))),
+            ["H1", "H3"],
+        )
+        self.assertEqual(
+            list(self.index.scan(after=("Beta", "H1"))), ["H3", "H5"]
+        )
+        self.assertEqual(
+            list(self.index.scan(after=("Beta", "H1"), descending=True)),
+            ["H2", "H4"],
+        )
+
+    def test_add_moves_and_remove_drops(self):
+        """Re-adding a record moves it; removing forgets it."""
+        self.index.add("H2", {"name": "Zeta"})
+        self.index.remove("H5")
+        self.index.remove("H404")
+
+        self.assertEqual(list(self.index.scan()), ["H4", "H1", "H3", "H2"])
+
+    def test_bulk_apply_matches_single_adds(self):
+        """A large change set ends up exactly like one add per record."""
+        changes = {f"N{i:02d}": {"name": f"n{i % 7}"} for i in range(40)}
+        changes.update({"H1": {"name": "Omega"}, "H5": None})
+        single = SortedIndex("name")
+        single.rebuild({
+            "H1": {"name": "Beta"}, "H4": {"name": None},
+            "H5": {"name": "Gamma"},
+        })
+        self.index.remove("H2")
+        self.index.remove("H3")
+
+        self.index.apply(changes)
+        for record_id, record in changes.items():
+            single.add(record_id, record)
+
+        self.assertEqual(list(self.index.scan()), list(single.scan()))
+        self.index.apply({"H1": None})
+        self.assertNotIn("H1", list(self.index.scan()))
+
+    def test_prefix_end(self):
+        """prefix_end() bounds every string starting with the prefix."""
+        self.assertEqual(prefix_end("ab"), "ac")
+        self.assertIsNone(prefix_end(""))
+
+
+class TestQueryViews(unittest.TestCase):
+    """Tests for filtered pages over a store."""
+
+    def setUp(self):
+        """Fill a journal store with ten numbered records."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.store = JournalStore(f"{tmp_dir}/data.json", background=False)
+        self.addCleanup(self.store.close)
+        self.store.apply({
+            f"K{i:02d}": {"id": f"K{i:02d}", "n": i % 4, "tag": f"t{i}"}
+            for i in range(10)
+        })
+        self.views = QueryViews(self.store)
+
+    def test_pages_cover_matches_once(self):
+        """Following cursors returns every match exactly once, in order."""
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.views.query(
+                {"n": {"gte": 2}}, "n", limit=2, cursor=cursor
+            )
+            seen.extend(key for key, _ in page)
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            seen, ["K02", "K06", "K03", "K07"]
+        )
+
+    def test_filters_on_other_fields(self):
+        """Conditions outside the sort field are checked per record."""
+        page, cursor = self.views.query(
+            {"n": 1, "tag": {"prefix": "t"}}, "id", descending=True
+        )
+
+        self.assertEqual([key for key, _ in page], ["K09", "K05", "K01"])
+        self.assertIsNone(cursor)
+
+    def test_apply_and_external_changes(self):
+        """Applied changes update the views; foreign writes rebuild them."""
+        self.views.query(None, "n")
+        in_sync = self.views.in_sync()
+        self.store.apply({"K00": {"id": "K00", "n": 9}})
+        self.views.apply({"K00": {"id": "K00", "n": 9}}, in_sync)
+
+        self.store.apply({"K01": {"id": "K01", "n": 8}})
+
+        page, _ = self.views.query({"n": {"gt": 3}}, "n")
+        self.assertEqual([key for key, _ in page], ["K01", "K00"])
+
+    def test_invalid_input_raises(self):
+        """Unknown operators, bad cursors and limits raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.views.query({"n": {"like": 1}}, "n")
+        with self.assertRaises(ValueError):
+            self.views.query(None, "n", cursor="%%%")
+        with self.assertRaises(ValueError):
+            self.views.query(None, "n", limit=0)
+        self.assertEqual(decode_cursor(encode_cursor(1, "K")), (1, "K"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Unit tests for the per-night room inventory."""
+
+import random
+import unittest
+
+from src.inventory import RoomNights, stay_nights
+
+
+class TestRoomNights(unittest.TestCase):
+    """Tests for range bookings and availability queries."""
+
+    def test_matches_brute_force(self):
+        """Range add/max agree with a plain per-night list."""
+        rng = random.Random(7)
+        base = 738000
+        tree, nights = RoomNights(), [0] * 120
+        for _ in range(500):
+            start = rng.randrange(119)
+            end = rng.randrange(start + 1, 120)
+            rooms = rng.randint(1, 3)
+            tree.add(base + start, base + end, rooms)
+            for night in range(start, end):
+                nights[night] += rooms
+
+            low = rng.randrange(119)
+            high = rng.randrange(low + 1, 120)
+            self.assertEqual(
+                tree.max_booked(base + low, base + high),
+                max(nights[low:high]),
+            )
+
+    def test_can_book_respects_capacity(self):
+        """Overlapping stays are refused once a night is full."""
+        tree = RoomNights()
+        tree.add(10, 13)
+        tree.add(12, 15)
+
+        self.assertEqual(tree.min_available(2, 10, 15), 0)
+        self.assertTrue(tree.can_book(2, 13, 20))
+        self.assertFalse(tree.can_book(2, 12, 13))
+        self.assertTrue(tree.can_book(2, 10, 12))
+        tree.add(12, 15, -1)
+        self.assertTrue(tree.can_book(2, 12, 13))
+
+
+class TestStayNights(unittest.TestCase):
+    """Tests for parsing check-in/check-out dates."""
+
+    def test_parses_and_validates(self):
+        """Dates map to [start, end) ordinals; bad stays raise."""
+        start, end = stay_nights("2026-01-30", "2026-02-02")
+        self.assertEqual(end - start, 3)
+        self.assertIsNone(stay_nights(None, None))
+        for check_in, check_out in (
+            ("2026-01-02", "2026-01-02"),
+            ("2026-01-02", None),
+            ("02/01/2026", "2026-01-05"),
+        ):
+            with self.assertRaises(ValueError):
+                stay_nights(check_in, check_out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Unit tests for the JournalStore append-only persistence layer."""
+
+import unittest
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.journal import JournalStore
+from src.models import Customer
+from src.services import CustomerService
+
+
+class TestJournalStore(unittest.TestCase):
+    """Tests for journaling, recovery and compaction."""
+
+    def test_save_and_load_roundtrip(self):
+        """load() returns what was saved."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+            store.close()
+
+    def test_save_appends_only_changed_records(self):
+        """Unchanged records are not written to the log again."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}, "B": {"value": 2}})
+
+            data = store.load()
+            data["B"]["value"] = 3
+            del data["A"]
+            store.save(data)
+            store.close()
+
+            self.assertEqual(store.stats["appends"], 4)
+            lines = store.log_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 4)
+
+    def test_reopen_replays_log(self):
+        """A new instance rebuilds state from the log."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}, "B": {"value": 2}})
+            store.save({"B": {"value": 5}})
+            store.close()
+
+            reopened = JournalStore(f"{tmp}/data.json")
+            self.assertEqual(reopened.load(), {"B": {"value": 5}})
+            reopened.close()
+
+    def test_corrupt_tail_is_skipped(self):
+        """A torn last line does not prevent recovery."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+            store.close()
+            with store.log_path.open("a", encoding="utf-8") as handle:
+                handle.write('{"op": "put", "key"')
+
+            reopened = JournalStore(f"{tmp}/data.json")
+            self.assertEqual(reopened.load(), {"A": {"value": 1}})
+            reopened.close()
+
+    def test_append_after_torn_tail_survives_reopen(self):
+        """Recovery cuts the torn line, so the next append is kept."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+            store.close()
+            with store.log_path.open("a", encoding="utf-8") as handle:
+                handle.write('{"op": "put", "key"')
+
+            with mock.patch("builtins.print"):
+                reopened = JournalStore(f"{tmp}/data.json")
+            reopened.put_record("C", {"value": 3})
+            reopened.close()
+
+            again = JournalStore(f"{tmp}/data.json")
+            self.assertEqual(
+                again.load(), {"A": {"value": 1}, "C": {"value": 3}}
+            )
+            again.close()
+
+    def test_compaction_writes_snapshot_and_truncates_log(self):
+        """Passing the threshold folds the log into a snapshot."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/data.json", compact_threshold=200)
+            for i in range(20):
+                data = store.load()
+                data[f"K{i}"] = {"value": i}
+                store.save(data)
+            store.close()
+
+            self.assertGreaterEqual(store.stats["compactions"], 1)
+            self.assertTrue(store.path.exists())
+
+            reopened = JournalStore(f"{tmp}/data.json")
+            self.assertEqual(len(reopened.load()), 20)
+            self.assertEqual(reopened.load()["K19"], {"value": 19})
+            reopened.close()
+
+    def test_services_work_on_journal_store(self):
+        """CustomerService runs unchanged on top of JournalStore."""
+        with TemporaryDirectory() as tmp:
+            store = JournalStore(f"{tmp}/customers.json")
+            service = CustomerService(store)
+
+            self.assertTrue(service.create(Customer("C001", "Andrea")))
+            self.assertTrue(service.update("C001", name="Ana"))
+            self.assertEqual(service.get("C001").name, "Ana")
+            self.assertEqual(
+                [c.name for c in service.iter_all(typed=True)], ["Ana"]
+            )
+            self.assertTrue(service.delete("C001"))
+            store.close()
+
+            reopened = JournalStore(f"{tmp}/customers.json")
+            self.assertEqual(reopened.load(), {})
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
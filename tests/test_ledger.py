@@ -0,0 +1,153 @@
+"""Unit tests for the event ledger and its service integration."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.ledger import EventLedger
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+from src.transactions import INTENT_PREFIX
+
+
+class TestEventLedger(unittest.TestCase):
+    """Tests for appends, snapshots, replay and tailing."""
+
+    def setUp(self):
+        """Use a fresh ledger directory per test."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_snapshot_plus_tail_rebuilds_state(self):
+        """Reopening replays only the events after the snapshot."""
+        ledger = EventLedger(self.tmp_dir, snapshot_every=3)
+        ledger.append("HotelUpdated", {"hotel_id": "H1", "rooms_total": 3})
+        for i in range(4):
+            ledger.append("ReservationCreated", {
+                "reservation_id": f"R{i}", "hotel_id": "H1",
+                "status": "ACTIVE",
+            })
+        ledger.append("ReservationCanceled", {
+            "reservation_id": "R0", "hotel_id": "H1", "status": "CANCELED",
+        })
+
+        reopened = EventLedger(self.tmp_dir, snapshot_every=3)
+
+        self.assertEqual(ledger.stats["snapshots"], 2)
+        self.assertEqual(reopened.stats["replayed"], 0)
+        self.assertEqual(reopened.seq, 6)
+        self.assertEqual(reopened.state.rooms_available("H1"), 0)
+        self.assertEqual(
+            reopened.state.reservations["R0"]["status"], "CANCELED"
+        )
+        with self.assertRaises(ValueError):
+            ledger.append("Unknown", {})
+
+    def test_read_tails_incrementally(self):
+        """A cursor returns only the events appended since."""
+        ledger = EventLedger(self.tmp_dir)
+        ledger.append("HotelUpdated", {"hotel_id": "H1", "rooms_total": 1})
+        events, cursor = ledger.read()
+        ledger.append("HotelDeleted", {"hotel_id": "H1"})
+
+        newer, cursor = ledger.read(cursor)
+
+        self.assertEqual([event["seq"] for event in events], [1])
+        self.assertEqual([event["type"] for event in newer], ["HotelDeleted"])
+        self.assertEqual(ledger.read(cursor), ([], cursor))
+
+    def test_partial_line_is_repaired_on_open(self):
+        """A torn write is cut off and appends continue cleanly."""
+        ledger = EventLedger(self.tmp_dir)
+        ledger.append("HotelUpdated", {"hotel_id": "H1", "rooms_total": 1})
+        log_path = Path(self.tmp_dir) / "events.log"
+        with log_path.open("ab") as handle:
+            handle.write(b'{"seq": 2, "type": "Hot')
+
+        reopened = EventLedger(self.tmp_dir)
+        reopened.append("HotelDeleted", {"hotel_id": "H1"})
+
+        events, _ = reopened.read()
+        self.assertEqual([event["seq"] for event in events], [1, 2])
+
+    def test_commit_token_is_appended_once(self):
+        """Replaying a commit's events with the same token is a no-op."""
+        ledger = EventLedger(self.tmp_dir, snapshot_every=1)
+        events = [("HotelUpdated", {"hotel_id": "H1", "rooms_total": 1})]
+
+        self.assertEqual(ledger.append_many(events, tx="t1"), 1)
+        self.assertEqual(ledger.append_many(events, tx="t1"), 1)
+        reopened = EventLedger(self.tmp_dir)
+        self.assertEqual(reopened.append_many(events, tx="t1"), 1)
+        self.assertEqual(reopened.append_many(events, tx="t2"), 2)
+
+
+class TestLedgerServices(unittest.TestCase):
+    """Services publish their committed changes as events."""
+
+    def test_bookings_and_hotel_updates_are_recorded(self):
+        """create/cancel/update emit events; drift spots bad counters."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        ledger = EventLedger(f"{tmp_dir}/ledger")
+        hotels = HotelService(FileStore(f"{tmp_dir}/hotels.json"), ledger)
+        customers = CustomerService(FileStore(f"{tmp_dir}/customers.json"))
+        reservations = ReservationService(
+            FileStore(f"{tmp_dir}/reservations.json"), hotels, customers,
+            ledger=ledger,
+        )
+        hotels.create(Hotel("H1", "A", 2, 2))
+        customers.create(Customer("C1", "Ana"))
+        reservations.create(Reservation("R1", "H1", "C1"))
+        reservations.cancel("R1")
+        reservations.create(Reservation("R2", "H1", "C1"))
+
+        types = [event["type"] for event in ledger.read()[0]]
+        self.assertEqual(types, [
+            "HotelUpdated",
+            "ReservationCreated", "HotelUpdated",
+            "ReservationCanceled", "HotelUpdated",
+            "ReservationCreated", "HotelUpdated",
+        ])
+        self.assertEqual(ledger.drift(hotels.list_all()), {})
+
+        hotels.update("H1", rooms_available=2)
+        self.assertEqual(ledger.drift(hotels.list_all()), {"H1": (2, 1)})
+
+    def test_recovery_appends_events_of_a_torn_commit(self):
+        """A booking whose ledger append never ran is recorded on restart."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        ledger = EventLedger(f"{tmp_dir}/ledger")
+        hotels = HotelService(FileStore(f"{tmp_dir}/hotels.json"))
+        customers = CustomerService(FileStore(f"{tmp_dir}/customers.json"))
+        hotels.create(Hotel("H1", "A", 2, 2))
+        customers.create(Customer("C1", "Ana"))
+
+        def open_service():
+            return ReservationService(
+                FileStore(f"{tmp_dir}/reservations.json"), hotels,
+                customers, ledger=ledger,
+            )
+
+        with mock.patch.object(ledger, "append_many",
+                               side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                open_service().create(Reservation("R1", "H1", "C1"))
+        self.assertEqual(len(list(Path(tmp_dir).glob(INTENT_PREFIX + "*"))),
+                         1)
+
+        open_service()
+        open_service()
+
+        types = [event["type"] for event in ledger.read()[0]]
+        self.assertEqual(types, ["ReservationCreated", "HotelUpdated"])
+        self.assertEqual(ledger.drift(hotels.list_all()), {})
+        self.assertEqual(list(Path(tmp_dir).glob(INTENT_PREFIX + "*")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
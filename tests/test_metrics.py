@@ -0,0 +1,116 @@
+"""Unit tests for the metrics registry and instrumentation."""
+
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.metrics import (
+    MetricsRegistry,
+    instrument,
+    is_instrumented,
+    uninstrument,
+)
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.storage import FileStore
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Tests for counters, histograms and exporters."""
+
+    def test_histogram_and_exports(self):
+        """Values land in cumulative buckets and export cleanly."""
+        registry = MetricsRegistry()
+        registry.inc("calls_total", method="get")
+        registry.inc("calls_total", 2, method="get")
+        registry.observe("latency_seconds", 0.002, method="get")
+        registry.observe("latency_seconds", 3.0, method="get")
+
+        self.assertEqual(registry.counter("calls_total", method="get"), 3)
+        histogram = registry.histogram("latency_seconds", method="get")
+        self.assertEqual((histogram.count, histogram.sum), (2, 3.002))
+        self.assertEqual(dict(histogram.cumulative())["0.005"], 1)
+        self.assertEqual(dict(histogram.cumulative())["+Inf"], 2)
+
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE calls_total counter", text)
+        self.assertIn('calls_total{method="get"} 3', text)
+        self.assertIn(
+            'latency_seconds_bucket{le="+Inf",method="get"} 2', text
+        )
+        self.assertEqual(
+            json.loads(registry.to_json())["counters"][0]["value"], 3
+        )
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests for patching FileStore and the services."""
+
+    def test_records_store_and_service_metrics(self):
+        """Loads, saves, bytes and service calls are all recorded."""
+        original_load = FileStore.load
+        registry = MetricsRegistry()
+        instrument(registry)
+        self.addCleanup(uninstrument)
+
+        with TemporaryDirectory() as tmp:
+            service = HotelService(FileStore(f"{tmp}/hotels.json"))
+            service.create(Hotel("H1", "A", 1, 1))
+            service.get("H1")
+
+        self.assertTrue(is_instrumented())
+        self.assertEqual(
+            registry.counter("service_calls_total",
+                             service="HotelService", method="create"), 1
+        )
+        self.assertEqual(
+            registry.counter("store_calls_total", method="save"), 1
+        )
+        self.assertGreater(registry.counter("store_written_bytes_total"), 0)
+        self.assertEqual(
+            registry.counter("store_read_bytes_total"),
+            registry.counter("store_written_bytes_total"),
+        )
+        self.assertEqual(registry.histogram("store_parse_seconds").count, 1)
+        self.assertEqual(
+            registry.histogram("store_serialize_seconds").count, 1
+        )
+
+        uninstrument()
+        self.assertFalse(is_instrumented())
+        self.assertIs(FileStore.load, original_load)
+        self.assertNotIn("list_all", HotelService.__dict__)
+
+    def test_counts_unit_of_work_commits(self):
+        """Files written by a booking's UnitOfWork commit are counted."""
+        registry = MetricsRegistry()
+        instrument(registry)
+        self.addCleanup(uninstrument)
+
+        with TemporaryDirectory() as tmp:
+            hotels = HotelService(FileStore(f"{tmp}/hotels.json"))
+            customers = CustomerService(FileStore(f"{tmp}/customers.json"))
+            service = ReservationService(
+                FileStore(f"{tmp}/reservations.json"), hotels, customers
+            )
+            hotels.create(Hotel("H1", "A", 1, 1))
+            customers.create(Customer("C1", "Ana"))
+            before = registry.counter("store_written_bytes_total")
+
+            self.assertTrue(service.create(Reservation("R1", "H1", "C1")))
+
+            written = sum(
+                Path(tmp, name).stat().st_size
+                for name in ("hotels.json", "reservations.json")
+            )
+        self.assertEqual(
+            registry.counter("store_written_bytes_total") - before, written
+        )
+        self.assertEqual(
+            registry.counter("store_calls_total", method="commit"), 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
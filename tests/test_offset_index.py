@@ -0,0 +1,130 @@
+"""Unit tests for offset-indexed point reads."""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.models import Hotel
+from src.offset_index import IndexedFileStore, encode_indexed, scan_offsets
+from src.services import HotelService
+from src.storage import FileStore
+from src.transactions import UnitOfWork
+
+SAMPLE = {
+    "H1": {"hotel_id": "H1", "name": "Mar", "tags": ["a", "b"],
+           "nested": {"x": [1, {"y": None}]}},
+    "Hé": {"hotel_id": "Hé", "name": "Café \"Sol\""},
+    "H3": [],
+    "H4": 5,
+}
+
+
+class TestEncoding(unittest.TestCase):
+    """encode_indexed() and scan_offsets() agree with json."""
+
+    def test_payload_matches_pretty_json(self):
+        """The payload is byte-identical to json.dumps(indent=2)."""
+        for data in (SAMPLE, {}, {"a": {}}):
+            payload, _ = encode_indexed(data)
+            self.assertEqual(payload,
+                             json.dumps(data, indent=2).encode("utf-8"))
+
+    def test_offsets_slice_each_value(self):
+        """Every span decodes to its record, also after a rescan."""
+        payload, offsets = encode_indexed(SAMPLE)
+        compact = json.dumps(SAMPLE, ensure_ascii=False).encode("utf-8")
+
+        for raw, spans in ((payload, offsets),
+                           (compact, scan_offsets(compact))):
+            self.assertEqual(set(spans), set(SAMPLE))
+            for key, (start, length) in spans.items():
+                self.assertEqual(
+                    json.loads(raw[start:start + length]), SAMPLE[key]
+                )
+        self.assertEqual(scan_offsets(payload), offsets)
+
+    def test_scan_rejects_non_objects(self):
+        """A JSON array cannot be indexed."""
+        with self.assertRaises(ValueError):
+            scan_offsets(b"[1, 2]")
+
+
+class TestIndexedFileStore(unittest.TestCase):
+    """Point reads, sidecar reuse and staleness detection."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = f"{self.tmp_dir}/hotels.json"
+
+    def open(self, **kwargs):
+        """Open an IndexedFileStore over the hotels file."""
+        store = IndexedFileStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_save_writes_index_and_reads_slices(self):
+        """get_record() decodes one slice without a full read."""
+        store = self.open()
+        store.save(SAMPLE)
+
+        self.assertTrue(Path(f"{self.path}.idx").exists())
+        self.assertEqual(store.get_record("H1"), SAMPLE["H1"])
+        self.assertEqual(store.get_record("Hé"), SAMPLE["Hé"])
+        self.assertIsNone(store.get_record("missing"))
+        self.assertEqual(store.stats["reads"], 0)
+        self.assertEqual(store.stats["index_builds"], 0)
+        self.assertEqual(
+            Path(self.path).read_bytes(),
+            FileStore(f"{self.tmp_dir}/plain.json").dumps(SAMPLE),
+        )
+
+    def test_sidecar_is_reused_by_new_store(self):
+        """A fresh store uses the saved index instead of rescanning."""
+        self.open().save(SAMPLE)
+        store = self.open()
+
+        self.assertEqual(store.get_record("H4"), 5)
+        self.assertEqual(store.stats["index_builds"], 0)
+
+    def test_external_change_rebuilds_index(self):
+        """A file rewritten by someone else invalidates the index."""
+        store = self.open()
+        store.save(SAMPLE)
+        store.get_record("H1")
+        FileStore(self.path, codec="json-compact").save(
+            {"H1": {"name": "Other"}, "H9": {"name": "New"}}
+        )
+
+        self.assertEqual(store.get_record("H1"), {"name": "Other"})
+        self.assertEqual(store.get_record("H9"), {"name": "New"})
+        self.assertEqual(store.stats["index_builds"], 1)
+
+    def test_binary_codec_falls_back_to_load(self):
+        """Files that cannot be sliced are read whole."""
+        store = self.open(codec="marshal")
+        store.save(SAMPLE)
+
+        self.assertEqual(store.get_record("H1"), SAMPLE["H1"])
+        self.assertEqual(store.stats["index_reads"], 0)
+
+    def test_services_and_transactions(self):
+        """HotelService and UnitOfWork commits keep the index current."""
+        store = self.open()
+        hotels = HotelService(store)
+        hotels.create(Hotel("H1", "A", 2, 2))
+        with UnitOfWork() as uow:
+            uow.put(store, "H2", {"hotel_id": "H2", "name": "B",
+                                  "rooms_total": 1, "rooms_available": 1})
+
+        self.assertEqual(hotels.get("H2").name, "B")
+        self.assertEqual(hotels.get("H1").rooms_total, 2)
+        self.assertEqual(store.stats["index_builds"], 0)
+        self.assertGreater(store.stats["index_reads"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,8 @@ from src.services import CustomerService, HotelService, ReservationService
 from src.storage import FileStore
 
 
-class TestReservationService(unittest.TestCase):
-    """Tests for reservation creation, cancellation and validations."""
+class ReservationTestCase(unittest.TestCase):
+    """Fixture: one hotel with one room and one customer."""
 
     def setUp(self):
         """Prepare isolated stores for each test."""
@@ -35,6 +35,10 @@ class TestReservationService(unittest.TestCase):
         self.hotel_service.create(hotel)
         self.customer_service.create(customer)
 
+
+class TestReservationService(ReservationTestCase):
+    """Tests for reservation creation, cancellation and validations."""
+
     def test_create_reservation_success(self):
         """Reservation is created when hotel and customer exist."""
         reservation = Reservation("R001", "H001", "C001")
@@ -93,6 +97,216 @@ class TestReservationService(unittest.TestCase):
         self.reservation_store.save(["not", "a", "dict"])
         self.assertEqual(self.reservation_service.list_all(), {})
 
+    def test_create_many_decrements_shared_hotel(self):
+        """Bookings for the same hotel in one batch share its rooms."""
+        self.hotel_service.update("H001", rooms_total=2, rooms_available=2)
+
+        results = self.reservation_service.create_many([
+            Reservation("R1", "H001", "C001"),
+            Reservation("R2", "H001", "C001"),
+            Reservation("R3", "H001", "C001"),
+        ])
+
+        self.assertEqual([r.ok for r in results], [True, True, False])
+        self.assertEqual(results[2].message, "No rooms available.")
+        self.assertEqual(self.hotel_service.get("H001").rooms_available, 0)
+
+    def test_cancel_many_releases_rooms(self):
+        """cancel_many frees every booked room and reports misses."""
+        self.reservation_service.create(Reservation("R1", "H001", "C001"))
+
+        results = self.reservation_service.cancel_many(["R1", "R404"])
+
+        self.assertEqual([r.ok for r in results], [True, False])
+        self.assertEqual(self.hotel_service.get("H001").rooms_available, 1)
+
+    def test_find_queries_follow_create_and_cancel(self):
+        """Secondary index lookups stay consistent with bookings."""
+        self.hotel_service.update("H001", rooms_total=3, rooms_available=3)
+        self.reservation_service.create(Reservation("R1", "H001", "C001"))
+        self.reservation_service.create(Reservation("R2", "H001", "C001"))
+
+        self.assertEqual(
+            self.reservation_service.find_by_hotel("H001"), ["R1", "R2"]
+        )
+
+        self.reservation_service.cancel("R1")
+        self.reservation_service.create(Reservation("R3", "H001", "C001"))
+
+        self.assertEqual(
+            self.reservation_service.find_by_hotel("H001", status="ACTIVE"),
+            ["R2", "R3"],
+        )
+        self.assertEqual(
+            self.reservation_service.find_by_customer("C001"),
+            ["R1", "R2", "R3"],
+        )
+        self.assertEqual(
+            self.reservation_service.find_by_status("CANCELED"), ["R1"]
+        )
+
+    def test_find_rebuilds_after_external_write(self):
+        """An edit made outside the service is picked up."""
+        self.assertEqual(self.reservation_service.find_by_hotel("H001"), [])
+
+        self.reservation_store.save({
+            "RX": {"reservation_id": "RX", "hotel_id": "H001",
+                   "customer_id": "C001", "status": "ACTIVE"},
+        })
+
+        self.assertEqual(
+            self.reservation_service.find_by_hotel("H001"), ["RX"]
+        )
+        self.assertEqual(
+            self.reservation_service.get("RX").customer_id, "C001"
+        )
+
+    def test_query_follows_bookings(self):
+        """query() sees bookings, cancellations and external writes."""
+        self.hotel_service.update("H001", rooms_total=3, rooms_available=3)
+        for rid in ("R1", "R2", "R3"):
+            self.reservation_service.create(Reservation(rid, "H001", "C001"))
+        self.reservation_service.cancel("R2")
+
+        page = self.reservation_service.query(
+            {"status": "ACTIVE"}, limit=1
+        )
+        rest = self.reservation_service.query(
+            {"status": "ACTIVE"}, limit=1, cursor=page.next_cursor
+        )
+        self.assertEqual([key for key, _ in page.items], ["R1"])
+        self.assertEqual([key for key, _ in rest.items], ["R3"])
+
+        self.reservation_store.save({})
+        self.assertEqual(self.reservation_service.query().items, [])
+
+    def test_iter_filtered_streams_typed_chunks(self):
+        """Typed iteration yields models in chunks and applies filters."""
+        self.hotel_service.update("H001", rooms_total=5, rooms_available=5)
+        for i in range(5):
+            self.reservation_service.create(
+                Reservation(f"R{i}", "H001", "C001")
+            )
+        self.reservation_service.cancel("R3")
+
+        chunks = list(self.reservation_service.iter_all(
+            typed=True, chunk_size=2
+        ))
+        active = self.reservation_service.iter_filtered(
+            lambda record: record["status"] == "ACTIVE"
+        )
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertIsInstance(chunks[0][0], Reservation)
+        self.assertEqual(sorted(rid for rid, _ in active),
+                         ["R0", "R1", "R2", "R4"])
+        self.assertEqual(
+            self.reservation_service.load_table().count_by_status(),
+            {"ACTIVE": 4, "CANCELED": 1},
+        )
+        with self.assertRaises(ValueError):
+            self.reservation_service.iter_all(chunk_size=0)
+
+    def test_booking_bumps_hotel_version(self):
+        """Room changes from bookings invalidate stale hotel writers."""
+        before = self.hotel_service.get("H001").version
+
+        self.reservation_service.create(Reservation("R1", "H001", "C001"))
+
+        result = self.hotel_service.compare_and_set("H001", before, name="X")
+        self.assertFalse(result.ok)
+        self.assertEqual(result.version, before + 1)
+
+
+class TestDatedReservations(ReservationTestCase):
+    """Tests for dated stays and the nightly room inventory."""
+
+    def test_dated_bookings_use_nightly_inventory(self):
+        """Overlapping stays are limited by rooms_total per night."""
+        service = self.reservation_service
+        self.hotel_service.update("H001", rooms_total=2, rooms_available=2)
+
+        def stay(rid, check_in, check_out):
+            return Reservation(rid, "H001", "C001",
+                               check_in=check_in, check_out=check_out)
+
+        self.assertTrue(service.create(stay("R1", "2026-03-01", "2026-03-05")))
+        self.assertTrue(service.create(stay("R2", "2026-03-04", "2026-03-06")))
+        self.assertFalse(
+            service.create(stay("R3", "2026-03-04", "2026-03-05"))
+        )
+        self.assertTrue(service.create(stay("R4", "2026-03-05", "2026-03-07")))
+        self.assertFalse(
+            service.create(stay("R5", "2026-03-07", "2026-03-06"))
+        )
+
+        self.assertEqual(service.availability("H001", "2026-03-01",
+                                              "2026-03-04"), 1)
+        self.assertFalse(service.can_book("H001", "2026-03-04", "2026-03-06"))
+        self.assertEqual(self.hotel_service.get("H001").rooms_available, 2)
+
+        self.assertTrue(service.cancel("R2"))
+        self.assertTrue(service.can_book("H001", "2026-03-04", "2026-03-06"))
+
+    def test_undated_and_dated_stays_share_rooms(self):
+        """Undated stays hold a room every night, so mixing cannot overbook."""
+        service = self.reservation_service
+        self.hotel_service.update("H001", rooms_total=2, rooms_available=2)
+
+        def stay(rid, check_in=None, check_out=None):
+            return Reservation(rid, "H001", "C001",
+                               check_in=check_in, check_out=check_out)
+
+        self.assertTrue(service.create(stay("R1")))
+        self.assertTrue(service.create(stay("R2", "2099-03-01", "2099-03-03")))
+        self.assertFalse(
+            service.create(stay("R3", "2099-03-02", "2099-03-04"))
+        )
+        self.assertFalse(service.create(stay("R4")))
+        self.assertEqual(service.availability("H001", "2099-03-05",
+                                              "2099-03-06"), 1)
+
+        self.assertTrue(service.cancel("R2"))
+        self.assertTrue(service.create(stay("R4")))
+        self.assertFalse(
+            service.create(stay("R5", "2099-03-02", "2099-03-04"))
+        )
+
+    def test_dated_batch_sees_its_own_stays(self):
+        """create_many counts stays booked earlier in the same batch."""
+        results = self.reservation_service.create_many(
+            Reservation(f"R{i}", "H001", "C001",
+                        check_in="2026-05-01", check_out="2026-05-03")
+            for i in range(2)
+        )
+
+        self.assertEqual([result.ok for result in results], [True, False])
+        reopened = ReservationService(
+            self.reservation_store, self.hotel_service, self.customer_service
+        )
+        self.assertEqual(
+            reopened.availability("H001", "2026-05-02", "2026-05-03"), 0
+        )
+
+    def test_past_stays_do_not_block_undated_bookings(self):
+        """Only tonight and later count against an undated stay."""
+        service = self.reservation_service
+
+        self.assertTrue(service.create(Reservation(
+            "R1", "H001", "C001",
+            check_in="2001-01-01", check_out="2001-01-03",
+        )))
+        self.assertTrue(service.create(Reservation("R2", "H001", "C001")))
+
+    def test_non_string_dates_are_rejected(self):
+        """A check_in of the wrong type fails the booking cleanly."""
+        self.assertFalse(self.reservation_service.create(
+            Reservation("R1", "H001", "C001", check_in=5, check_out=6)
+        ))
+        self.assertIsNone(
+            self.reservation_service.availability("H001", 5, 6)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+"""Unit tests for FileStore codecs, detection and conversion."""
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.serialization import (
+    MAGIC,
+    available_codecs,
+    convert,
+    detect,
+    get_codec,
+)
+from src.storage import FileStore
+
+SAMPLE = {"A": {"value": 1, "name": "ñandú"}, "B": {"value": None}}
+
+
+class TestCodecs(unittest.TestCase):
+    """Tests for every codec available in this environment."""
+
+    def test_roundtrip_every_codec(self):
+        """Each codec saves and loads the same data through FileStore."""
+        with TemporaryDirectory() as tmp:
+            for name in available_codecs():
+                store = FileStore(f"{tmp}/{name}.dat", codec=name)
+                store.save(SAMPLE)
+
+                self.assertEqual(
+                    FileStore(str(store.path), codec=name).load(), SAMPLE
+                )
+                self.assertEqual(dict(store.iter_records()), SAMPLE)
+                self.assertEqual(
+                    detect(store.path.read_bytes()).name,
+                    name if get_codec(name).binary else "json",
+                )
+
+    def test_default_is_pretty_json(self):
+        """The default codec keeps the historical indent=2 layout."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+
+            self.assertEqual(
+                store.path.read_text(encoding="utf-8"),
+                '{\n  "A": {\n    "value": 1\n  }\n}',
+            )
+
+    def test_convert_in_place(self):
+        """convert() rewrites a file with another codec."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save(SAMPLE)
+
+            self.assertEqual(convert(str(store.path), "marshal"), "json")
+            self.assertTrue(store.path.read_bytes().startswith(MAGIC))
+            self.assertEqual(
+                FileStore(str(store.path), codec="marshal").load(), SAMPLE
+            )
+            self.assertEqual(
+                convert(str(store.path), "json", trusted=["marshal"]),
+                "marshal",
+            )
+            self.assertEqual(store.load(), SAMPLE)
+            self.assertEqual(list(Path(tmp).iterdir()), [store.path])
+
+    def test_unknown_and_corrupt_data(self):
+        """Unknown codecs raise; corrupt binary files load as empty."""
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.dat"
+            path.write_bytes(MAGIC + b"pickle\nnot a pickle")
+            self.assertEqual(FileStore(str(path), codec="pickle").load(), {})
+            path.write_bytes(MAGIC + b"nope\n")
+            self.assertEqual(FileStore(str(path)).load(), {})
+
+    def test_unsafe_codecs_need_trust(self):
+        """A JSON store never unpickles a file it did not write."""
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            FileStore(str(path), codec="pickle").save(SAMPLE)
+
+            with mock.patch("builtins.print") as warn:
+                self.assertEqual(FileStore(str(path)).load(), {})
+            self.assertIn("untrusted pickle", str(warn.call_args))
+            with self.assertRaises(ValueError):
+                convert(str(path), "json")
+            self.assertEqual(
+                FileStore(str(path), trusted_codecs=["pickle"]).load(),
+                SAMPLE,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
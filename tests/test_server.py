@@ -0,0 +1,277 @@
+"""Unit tests for the HTTP API, its worker pool and group commits."""
+
+import http.client
+import json
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.server import Api, GroupCommitter, create_server
+from src.services import ItemResult
+
+
+class TestGroupCommitter(unittest.TestCase):
+    """Concurrent submits share batch calls."""
+
+    def test_burst_is_committed_in_few_batches(self):
+        """Items queued during a commit are folded into the next one."""
+        batches = []
+
+        def commit(items):
+            batches.append(list(items))
+            time.sleep(0.02)
+            return [ItemResult(item, item % 2 == 0) for item in items]
+
+        committer = GroupCommitter(commit)
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(committer.submit, range(20)))
+
+        self.assertEqual([r.item_id for r in results], list(range(20)))
+        self.assertEqual([r.ok for r in results], [i % 2 == 0
+                                                   for i in range(20)])
+        self.assertLess(len(batches), 20)
+        self.assertEqual(committer.stats["items"], 20)
+        self.assertEqual(sorted(sum(batches, [])), list(range(20)))
+
+    def test_batch_errors_reach_every_caller(self):
+        """An exception from the commit is raised to the submitter."""
+        def commit(items):
+            raise RuntimeError(f"boom {items}")
+
+        with self.assertRaises(RuntimeError):
+            GroupCommitter(commit).submit(1)
+
+    def test_failed_batch_is_retried_item_by_item(self):
+        """Only the item that breaks a batch gets the error."""
+        def commit(items):
+            time.sleep(0.02)
+            if 3 in items:
+                raise TypeError("bad item")
+            return [ItemResult(item, True) for item in items]
+
+        committer = GroupCommitter(commit)
+
+        def submit(item):
+            try:
+                return committer.submit(item).ok
+            except TypeError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(submit, range(8)))
+
+        self.assertEqual(results, [True, True, True, None,
+                                   True, True, True, True])
+        self.assertLess(committer.stats["batches"], 8)
+
+
+class TestApi(unittest.TestCase):
+    """Routing and status codes, without sockets."""
+
+    def setUp(self):
+        """Serve services over a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.server = create_server(
+            {"data_dir": self.tmp_dir,
+             "idempotency_path": f"{self.tmp_dir}/keys.jsonl"},
+            ("127.0.0.1", 0),
+            workers=4,
+        )
+        self.addCleanup(self.server.server_close)
+        self.api: Api = self.server.api
+
+    def call(self, method, target, body=None, headers=None):
+        """Send one request through the Api."""
+        raw = json.dumps(body).encode("utf-8") if body is not None else b""
+        return self.api.handle(method, target, raw, headers)
+
+    def seed(self):
+        """Create one hotel with two rooms and one customer."""
+        self.call("POST", "/hotels", {"hotel_id": "H1", "name": "A",
+                                      "rooms_total": 2,
+                                      "rooms_available": 2})
+        self.call("POST", "/customers", {"customer_id": "C1", "name": "X"})
+
+    def test_booking_flow(self):
+        """Create, read, page and cancel through the routes."""
+        self.seed()
+        booking = {"reservation_id": "R1", "hotel_id": "H1",
+                   "customer_id": "C1"}
+
+        self.assertEqual(self.call("POST", "/reservations", booking)[0], 201)
+        status, payload = self.call("POST", "/reservations", booking)
+        self.assertEqual(status, 409)
+        self.assertEqual(payload["error"], "Reservation already exists.")
+        self.assertEqual(
+            self.call("GET", "/hotels/H1")[1]["rooms_available"], 1
+        )
+        page = self.call("GET", "/reservations?status=%22ACTIVE%22&limit=1")
+        self.assertEqual([r["reservation_id"] for r in page[1]["items"]],
+                         ["R1"])
+        self.assertEqual(self.call("DELETE", "/reservations/R1")[0], 200)
+        self.assertEqual(
+            self.call("GET", "/reservations/R1")[1]["status"], "CANCELED"
+        )
+        self.assertEqual(self.call("GET", "/reservations/R404")[0], 404)
+
+    def test_update_and_errors(self):
+        """If-Match conflicts, bad payloads and unknown routes."""
+        self.seed()
+
+        ok = self.call("PATCH", "/hotels/H1", {"name": "B"},
+                       {"If-Match": "0"})
+        stale = self.call("PATCH", "/hotels/H1", {"name": "C"},
+                          {"If-Match": "0"})
+
+        self.assertEqual(ok, (200, {"ok": True, "version": 1}))
+        self.assertEqual(stale[0], 409)
+        self.assertEqual(self.call("POST", "/hotels", {"bad": 1})[0], 400)
+        self.assertEqual(self.api.handle("POST", "/hotels", b"[")[0], 400)
+        self.assertEqual(self.call("PATCH", "/reservations/R1", {})[0], 405)
+        self.assertEqual(
+            self.call("PATCH", "/hotels/H1", {"color": "red"})[0], 400
+        )
+        self.assertEqual(self.call("GET", "/hotels/H1")[1]["name"], "B")
+        self.assertEqual(self.call("GET", "/rooms")[0], 404)
+
+    def test_field_types_are_checked(self):
+        """Wrong field types get a 400; numeric strings are coerced."""
+        self.seed()
+
+        status, payload = self.call("POST", "/reservations", {
+            "reservation_id": "R1", "hotel_id": "H1", "customer_id": "C1",
+            "check_in": 5,
+        })
+        self.assertEqual(status, 400)
+        self.assertIn("check_in", payload["error"])
+        self.assertEqual(self.call("POST", "/hotels", {
+            "hotel_id": "H2", "name": "B",
+            "rooms_total": "five", "rooms_available": 1,
+        })[0], 400)
+        self.assertEqual(self.call("POST", "/hotels", {
+            "hotel_id": "H3", "name": "C",
+            "rooms_total": "5", "rooms_available": 5,
+        })[0], 201)
+        self.assertEqual(
+            self.call("GET", "/hotels/H3")[1]["rooms_total"], 5
+        )
+
+    def test_idempotent_retry(self):
+        """A retried booking with the same key replays the result."""
+        self.seed()
+        booking = {"reservation_id": "R1", "hotel_id": "H1",
+                   "customer_id": "C1"}
+        headers = {"Idempotency-Key": "k1"}
+
+        first = self.call("POST", "/reservations", booking, headers)
+        retry = self.call("POST", "/reservations", booking, headers)
+
+        self.assertEqual(first[0], 201)
+        self.assertEqual(retry[0], 201)
+        self.assertEqual(
+            self.call("GET", "/hotels/H1")[1]["rooms_available"], 1
+        )
+
+
+class TestApiServer(unittest.TestCase):
+    """The server over real sockets."""
+
+    def setUp(self):
+        """Start a server on a free port in a background thread."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.server = create_server(
+            {"data_dir": self.tmp_dir}, ("127.0.0.1", 0), workers=8
+        )
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.port = self.server.server_address[1]
+
+    def request(self, conn, method, target, body=None):
+        """Send a request on ``conn`` and decode the JSON answer."""
+        conn.request(method, target, json.dumps(body) if body else None,
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_keep_alive_and_concurrent_bookings(self):
+        """One connection serves many requests; bookings are committed."""
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        self.addCleanup(conn.close)
+        self.request(conn, "POST", "/hotels", {
+            "hotel_id": "H1", "name": "A",
+            "rooms_total": 40, "rooms_available": 40,
+        })
+        sock = conn.sock
+        self.request(conn, "POST", "/customers",
+                     {"customer_id": "C1", "name": "X"})
+        self.assertIs(conn.sock, sock)
+
+        def book(number):
+            client = http.client.HTTPConnection("127.0.0.1", self.port,
+                                                timeout=5)
+            try:
+                return self.request(client, "POST", "/reservations", {
+                    "reservation_id": f"R{number}", "hotel_id": "H1",
+                    "customer_id": "C1",
+                })[0]
+            finally:
+                client.close()
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            statuses = list(pool.map(book, range(30)))
+
+        self.assertEqual(statuses, [201] * 30)
+        self.assertEqual(self.request(conn, "GET", "/hotels/H1")[1][
+            "rooms_available"], 10)
+        self.assertEqual(
+            self.request(conn, "GET", "/stats")[1][
+                "create_reservations"]["items"], 30
+        )
+
+    def test_bad_content_length_is_rejected(self):
+        """A non-numeric Content-Length gets a 400, not a crash."""
+        with socket.create_connection(("127.0.0.1", self.port),
+                                      timeout=5) as sock:
+            sock.sendall(b"POST /hotels HTTP/1.1\r\nHost: x\r\n"
+                         b"Content-Length: abc\r\n\r\n")
+            reply = sock.makefile("rb").readline()
+
+        self.assertIn(b" 400 ", reply)
+
+    def test_idle_connections_do_not_hold_workers(self):
+        """Idle keep-alive clients leave the workers free for others."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = create_server(
+            {"data_dir": self.tmp_dir}, ("127.0.0.1", 0), workers=2
+        )
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        port = self.server.server_address[1]
+
+        idle = []
+        for _ in range(2):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            self.addCleanup(conn.close)
+            self.request(conn, "GET", "/health")
+            idle.append(conn)
+        client = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+        self.addCleanup(client.close)
+
+        self.assertEqual(self.request(client, "GET", "/health")[0], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Unit tests for ShardedStore and resharding."""
+
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from src import sharding
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.sharding import ShardedStore, reshard, shard_of
+from src.storage import FileStore
+
+
+def _records(count):
+    """Return ``count`` small hotel records keyed by id."""
+    return {
+        f"H{i:03d}": {"hotel_id": f"H{i:03d}", "name": f"Hotel {i}",
+                      "rooms_total": 1, "rooms_available": 1}
+        for i in range(count)
+    }
+
+
+class TestShardedStore(unittest.TestCase):
+    """Tests for routing, partial rewrites and parallel loads."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def open(self, **kwargs):
+        """Open the hotels collection in the temporary directory."""
+        store = ShardedStore(self.tmp_dir, "hotels", **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_records_are_routed_by_hash(self):
+        """Each record lands in the shard chosen by crc32 of its id."""
+        store = self.open(shards=4)
+        store.save(_records(40))
+
+        for index, shard in enumerate(store.shards):
+            self.assertTrue(all(
+                shard_of(key, 4) == index for key in shard.load()
+            ))
+        self.assertEqual(store.load(), _records(40))
+        self.assertEqual(dict(store.iter_records()), _records(40))
+        self.assertEqual(store.get_record("H007")["name"], "Hotel 7")
+
+    def test_record_writes_touch_one_shard(self):
+        """put/update/delete rewrite only the owning shard."""
+        store = self.open(shards=4)
+        store.save(_records(20))
+        before = [shard.stats["writes"] for shard in store.shards]
+
+        store.put_record("H100", {"hotel_id": "H100"})
+        store.update_record("H100", {"name": "New"})
+        store.delete_record("H001")
+
+        touched = {shard_of("H100", 4), shard_of("H001", 4)}
+        for index, shard in enumerate(store.shards):
+            written = shard.stats["writes"] - before[index]
+            self.assertEqual(written > 0, index in touched)
+
+    def test_default_lock_serializes_instances(self):
+        """Stores over the same files share the manifest's FileLock."""
+        first, second = self.open(shards=2), self.open()
+        first.put_record("N", {"value": 0})
+
+        def increment(store):
+            with store.atomic():
+                record = store.get_record("N")
+                store.put_record("N", {"value": record["value"] + 1})
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(increment, [first, second] * 20))
+
+        self.assertEqual(first.get_record("N"), {"value": 40})
+        self.assertTrue(
+            Path(self.tmp_dir, ".hotels.shards.json.lock").exists()
+        )
+
+    def test_save_skips_unchanged_cached_shards(self):
+        """With the cache on, save() rewrites only changed shards."""
+        store = self.open(shards=4, cache=True)
+        store.save(_records(20))
+        data = store.load()
+        data["H003"]["name"] = "Changed"
+
+        store.save(data)
+
+        self.assertEqual(store.stats["skipped_writes"], 3)
+        self.assertEqual(store.get_record("H003")["name"], "Changed")
+
+    def test_parallel_load_matches_serial(self):
+        """Parsing shards in worker processes returns the same data."""
+        store = self.open(shards=3, workers=2)
+        store.save(_records(30))
+
+        with mock.patch.object(sharding, "PARALLEL_BYTES", 0):
+            data = store.load()
+
+        self.assertEqual(data, _records(30))
+        self.assertEqual(store.stats["parallel_loads"], 1)
+
+    def test_shard_count_mismatch_raises(self):
+        """Opening with another shard count requires a reshard."""
+        self.open(shards=4)
+
+        with self.assertRaises(ValueError):
+            ShardedStore(self.tmp_dir, "hotels", shards=2)
+        self.assertEqual(self.open().count, 4)
+
+    def test_services_run_on_shards(self):
+        """Hotel CRUD and bookings work over sharded stores."""
+        def store(name):
+            opened = ShardedStore(self.tmp_dir, name, shards=3)
+            self.addCleanup(opened.close)
+            return opened
+
+        hotels = HotelService(store("hotels"))
+        customers = CustomerService(store("customers"))
+        reservations = ReservationService(
+            store("reservations"), hotels, customers
+        )
+        hotels.create(Hotel("H1", "A", 2, 2))
+        customers.create(Customer("C1", "Ana"))
+
+        self.assertTrue(reservations.create(Reservation("R1", "H1", "C1")))
+        self.assertEqual(hotels.get("H1").rooms_available, 1)
+        self.assertEqual(reservations.find_by_hotel("H1"), ["R1"])
+
+
+class TestReshard(unittest.TestCase):
+    """Tests for the offline reshard."""
+
+    def setUp(self):
+        """Create a temporary data directory."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_split_plain_file_then_reshard(self):
+        """A JSON file is split, then moved to a new shard count."""
+        FileStore(f"{self.tmp_dir}/hotels.json").save(_records(25))
+
+        self.assertEqual(reshard(self.tmp_dir, "hotels", 4), 25)
+        self.assertEqual(reshard(self.tmp_dir, "hotels", 3), 25)
+
+        store = ShardedStore(self.tmp_dir, "hotels")
+        self.assertEqual(store.count, 3)
+        self.assertEqual(store.load(), _records(25))
+        self.assertEqual(
+            len(list(Path(self.tmp_dir).glob("hotels.*-of-*.json"))), 3
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""Unit tests for the SQLite store, backend selection and migration."""
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.backends import build_services, load_config, open_stores
+from src.migrate import migrate_json_to_sqlite
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.sqlite_store import SQLiteDatabase, SQLiteStore
+from src.storage import FileStore
+
+
+class TestSQLiteStore(unittest.TestCase):
+    """Tests for the load/save contract and record-level access."""
+
+    def setUp(self):
+        """Open a fresh database per test."""
+        self.tmp = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp.cleanup)
+        self.database = SQLiteDatabase(f"{self.tmp.name}/test.db")
+        self.addCleanup(self.database.close)
+
+    def test_save_and_load_roundtrip(self):
+        """save() replaces the table and load() returns it."""
+        store = self.database.store("items")
+        store.save({"A": {"value": 1}, "B": {"value": 2}})
+        store.save({"B": {"value": 3}})
+
+        self.assertEqual(store.load(), {"B": {"value": 3}})
+
+    def test_iter_records_pages_in_key_order(self):
+        """iter_records() walks the table across several pages."""
+        store = self.database.store("items")
+        store.save({f"K{i:02d}": {"value": i} for i in range(10)})
+
+        with mock.patch.object(store, "PAGE_SIZE", 3):
+            pairs = list(store.iter_records())
+
+        self.assertEqual([key for key, _ in pairs],
+                         [f"K{i:02d}" for i in range(10)])
+        self.assertEqual(pairs[4][1], {"value": 4})
+
+    def test_record_level_operations(self):
+        """get/put/update/delete work on single rows."""
+        store = self.database.store("items")
+
+        self.assertTrue(store.put_record("A", {"value": 1}))
+        self.assertFalse(store.put_record("A", {"value": 9}, overwrite=False))
+        self.assertEqual(store.update_record("A", {"value": 2}),
+                         {"value": 2})
+        self.assertEqual(store.get_record("A"), {"value": 2})
+        self.assertTrue(store.delete_record("A"))
+        self.assertFalse(store.delete_record("A"))
+        self.assertIsNone(store.get_record("A"))
+        with self.assertRaises(KeyError):
+            store.update_record("A", {"value": 3})
+
+    def test_signature_follows_only_its_table(self):
+        """Writes to other tables do not change a store's signature."""
+        items = self.database.store("items")
+        other = self.database.store("other")
+        before = items.signature()
+
+        other.put_record("X", {"value": 1})
+        self.assertEqual(items.signature(), before)
+
+        items.put_record("A", {"value": 1})
+        self.assertNotEqual(items.signature(), before)
+        changed = items.signature()
+        SQLiteDatabase(str(self.database.path)).store("items").delete_record(
+            "A"
+        )
+        self.assertNotEqual(items.signature(), changed)
+
+    def test_bookings_do_not_rescan_reservations(self):
+        """Customer writes between bookings keep the reservation index."""
+        hotels = HotelService(self.database.store("hotels"))
+        customers = CustomerService(self.database.store("customers"))
+        store = self.database.store("reservations")
+        reservations = ReservationService(store, hotels, customers)
+        hotels.create(Hotel("H1", "A", 10, 10))
+        customers.create(Customer("C0", "X"))
+        reservations.create(Reservation("R0", "H1", "C0"))
+
+        with mock.patch.object(store, "iter_records",
+                               wraps=store.iter_records) as scans:
+            for number in range(1, 4):
+                customers.create(Customer(f"C{number}", "X"))
+                self.assertTrue(reservations.create(
+                    Reservation(f"R{number}", "H1", f"C{number}")
+                ))
+
+        scans.assert_not_called()
+
+    def test_invalid_table_name_rejected(self):
+        """Table names are restricted to identifiers."""
+        with self.assertRaises(ValueError):
+            SQLiteStore(self.database, 'x"; DROP TABLE y; --')
+
+    def test_services_run_on_sqlite(self):
+        """The services work unchanged on SQLite stores."""
+        hotels = HotelService(self.database.store("hotels"))
+        customers = CustomerService(self.database.store("customers"))
+        reservations = ReservationService(
+            self.database.store("reservations"), hotels, customers
+        )
+
+        self.assertTrue(hotels.create(Hotel("H001", "A", 1, 1)))
+        self.assertFalse(hotels.create(Hotel("H001", "A", 1, 1)))
+        self.assertTrue(customers.create(Customer("C001", "X")))
+        self.assertTrue(reservations.create(Reservation("R1", "H001", "C001")))
+        self.assertFalse(
+            reservations.create(Reservation("R2", "H001", "C001"))
+        )
+        self.assertEqual(hotels.get("H001").rooms_available, 0)
+        self.assertTrue(reservations.cancel("R1"))
+        self.assertEqual(hotels.get("H001").rooms_available, 1)
+        self.assertEqual(
+            reservations.list_all()["R1"]["status"], "CANCELED"
+        )
+
+
+class TestBackendsAndMigration(unittest.TestCase):
+    """Tests for configuration-driven backends and the JSON importer."""
+
+    def test_default_backend_is_json(self):
+        """Without config the JSON FileStore is used."""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            config = load_config(None)
+        self.assertEqual(config["backend"], "json")
+        with TemporaryDirectory() as tmp:
+            config["data_dir"] = tmp
+            stores = open_stores(config)
+        self.assertIsInstance(stores["hotels"], FileStore)
+
+    def test_environment_selects_backend(self):
+        """RESERVATION_BACKEND overrides the configured backend."""
+        with mock.patch.dict(os.environ, {"RESERVATION_BACKEND": "sqlite"}):
+            self.assertEqual(load_config(None)["backend"], "sqlite")
+
+    def test_unknown_backend_raises(self):
+        """An unknown backend name is a configuration error."""
+        with self.assertRaises(ValueError):
+            open_stores({"backend": "nope"})
+
+    def test_migrate_json_to_sqlite(self):
+        """The importer copies all three collections."""
+        with TemporaryDirectory() as tmp:
+            HotelService(FileStore(f"{tmp}/hotels.json")).create(
+                Hotel("H001", "A", 2, 2)
+            )
+            CustomerService(FileStore(f"{tmp}/customers.json")).create(
+                Customer("C001", "X")
+            )
+
+            counts = migrate_json_to_sqlite(tmp, f"{tmp}/out.db")
+            self.assertEqual(
+                counts, {"hotels": 1, "customers": 1, "reservations": 0}
+            )
+
+            hotels, _, _ = build_services({
+                "backend": "sqlite",
+                "sqlite_path": f"{tmp}/out.db",
+            })
+            self.assertEqual(hotels.get("H001").rooms_total, 2)
+            hotels.store.database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
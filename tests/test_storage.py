@@ -1,6 +1,7 @@
 """Unit tests for the FileStore JSON persistence layer."""
 
 import unittest
+from unittest import mock
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -40,6 +41,116 @@ class TestFileStore(unittest.TestCase):
 
             self.assertEqual(data, {})
 
+    def test_cached_load_counts_hits_and_misses(self):
+        """Repeated loads of an unchanged file are served from memory."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json", cache=True)
+            store.save({"A": {"value": 1}})
+
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+            self.assertEqual(store.stats["misses"], 0)
+            self.assertEqual(store.stats["hits"], 2)
+
+    def test_cached_load_returns_independent_copies(self):
+        """Mutating a loaded dict does not corrupt the cache."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json", cache=True)
+            store.save({"A": {"value": 1}})
+
+            data = store.load()
+            data["A"]["value"] = 99
+            data["B"] = {}
+
+            self.assertEqual(store.load(), {"A": {"value": 1}})
+
+    def test_cached_get_record_copies_one_record(self):
+        """get_record() on a warm cache copies only the record asked for."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json", cache=True)
+            store.save({"A": {"value": 1}, "B": {"value": 2}})
+
+            with mock.patch("src.storage._copy_records") as copy:
+                record = store.get_record("A")
+                record["value"] = 99
+
+            copy.assert_not_called()
+            self.assertEqual(store.get_record("A"), {"value": 1})
+            self.assertIsNone(store.get_record("C"))
+            self.assertEqual(store.stats["reads"], 0)
+
+    def test_cached_load_picks_up_external_edits(self):
+        """A file changed by another writer is reloaded."""
+        with TemporaryDirectory() as tmp:
+            file_path = Path(tmp) / "data.json"
+            store = FileStore(str(file_path), cache=True)
+            store.save({"A": {"value": 1}})
+            store.load()
+
+            file_path.write_text(
+                '{"A": {"value": 2}, "B": {"value": 3}}',
+                encoding="utf-8",
+            )
+
+            self.assertEqual(store.load()["A"]["value"], 2)
+            self.assertEqual(store.stats["reloads"], 1)
+
+    def test_cached_load_missing_file_is_a_miss(self):
+        """The first load without a prior save counts as a miss."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/missing.json", cache=True)
+
+            self.assertEqual(store.load(), {})
+            self.assertEqual(store.load(), {})
+            self.assertEqual(store.stats["misses"], 1)
+            self.assertEqual(store.stats["hits"], 1)
+
+    def test_record_level_operations(self):
+        """Record helpers read and rewrite the file for one key."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+
+            self.assertTrue(store.put_record("A", {"value": 1}))
+            self.assertFalse(
+                store.put_record("A", {"value": 2}, overwrite=False)
+            )
+            store.update_record("A", {"value": 3})
+            self.assertEqual(store.get_record("A"), {"value": 3})
+            self.assertTrue(store.delete_record("A"))
+            self.assertFalse(store.delete_record("A"))
+            with self.assertRaises(KeyError):
+                store.update_record("A", {"value": 4})
+
+    def test_iter_records_streams_in_small_reads(self):
+        """iter_records() matches load() even when values span reads."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            data = {
+                f"K{i}": {"value": i * 1000, "name": "x" * i, "ok": True}
+                for i in range(50)
+            }
+            store.save(data)
+
+            with mock.patch.object(store, "READ_SIZE", 7):
+                self.assertEqual(dict(store.iter_records()), data)
+            self.assertEqual(list(FileStore(f"{tmp}/none").iter_records()),
+                             [])
+
+    def test_iter_records_malformed_file_warns(self):
+        """A truncated file yields the complete records, then stops."""
+        with TemporaryDirectory() as tmp:
+            file_path = Path(tmp) / "data.json"
+            file_path.write_text(
+                '{"A": {"value": 1}, "B": {"val', encoding="utf-8"
+            )
+            store = FileStore(str(file_path))
+
+            self.assertEqual(
+                list(store.iter_records()), [("A", {"value": 1})]
+            )
+            file_path.write_text("[1, 2]", encoding="utf-8")
+            self.assertEqual(list(store.iter_records()), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,264 @@
+"""Unit tests for UnitOfWork and transactional bookings."""
+
+import json
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.models import Customer, Hotel, Reservation
+from src.services import CustomerService, HotelService, ReservationService
+from src.sharding import ShardedStore, shard_of
+from src.storage import FileStore, VersionConflict
+from src.transactions import INTENT_PREFIX, UnitOfWork, recover
+
+
+class TestUnitOfWork(unittest.TestCase):
+    """Tests for staging, commit and recovery."""
+
+    def test_commit_writes_all_dirty_stores(self):
+        """Changes to two stores are flushed together on exit."""
+        with TemporaryDirectory() as tmp:
+            first = FileStore(f"{tmp}/first.json")
+            second = FileStore(f"{tmp}/second.json")
+
+            with UnitOfWork() as uow:
+                uow.put(first, "A", {"value": 1})
+                uow.put(second, "B", {"value": 2})
+
+            self.assertEqual(first.load(), {"A": {"value": 1}})
+            self.assertEqual(second.load(), {"B": {"value": 2}})
+            self.assertEqual(list(Path(tmp).glob(INTENT_PREFIX + "*")), [])
+
+    def test_exception_discards_changes(self):
+        """Nothing is written when the block raises."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+
+            with self.assertRaises(RuntimeError):
+                with UnitOfWork() as uow:
+                    uow.put(store, "A", {"value": 1})
+                    raise RuntimeError("boom")
+
+            self.assertFalse(store.path.exists())
+
+    def test_store_loaded_once_per_transaction(self):
+        """Repeated loads inside a transaction reuse the working copy."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+
+            with UnitOfWork() as uow:
+                uow.load(store)
+                uow.load(store)
+                uow.delete(store, "A")
+
+            self.assertEqual(store.stats["reads"], 1)
+            self.assertEqual(uow.stats["loads"], 1)
+            self.assertEqual(store.load(), {})
+
+    def test_commit_merges_concurrent_writes(self):
+        """Records written by others since load are kept."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1}})
+
+            with UnitOfWork() as uow:
+                uow.load(store)
+                FileStore(f"{tmp}/data.json").save(
+                    {"A": {"value": 1}, "B": {"value": 2}, "padding": 1}
+                )
+                uow.put(store, "C", {"value": 3})
+
+            self.assertEqual(uow.stats["reloads"], 1)
+            self.assertEqual(set(store.load()), {"A", "B", "C", "padding"})
+
+    def test_commit_rejects_record_changed_since_read(self):
+        """A record updated by someone else is not overwritten."""
+        with TemporaryDirectory() as tmp:
+            store = FileStore(f"{tmp}/data.json")
+            store.save({"A": {"value": 1, "version": 0}})
+
+            with self.assertRaises(VersionConflict):
+                with UnitOfWork() as uow:
+                    record = dict(uow.get(store, "A"), value=2)
+                    FileStore(f"{tmp}/data.json").update_record(
+                        "A", {"value": 5}, bump_version=True
+                    )
+                    uow.put(store, "A", record)
+
+            self.assertEqual(store.load(), {"A": {"value": 5, "version": 1}})
+
+    def test_recover_rolls_pending_commit_forward(self):
+        """An interrupted commit is completed by recover()."""
+        with TemporaryDirectory() as tmp:
+            target = Path(tmp) / "data.json"
+            staged = Path(tmp) / "data.json.uow.tmp"
+            staged.write_text('{"A": {"value": 1}}', encoding="utf-8")
+            (Path(tmp) / f"{INTENT_PREFIX}1.json").write_text(
+                json.dumps([[str(staged), str(target)]]), encoding="utf-8"
+            )
+
+            self.assertTrue(recover(tmp))
+            self.assertEqual(
+                FileStore(str(target)).load(), {"A": {"value": 1}}
+            )
+            self.assertFalse(recover(tmp))
+
+    def test_intent_holds_absolute_paths(self):
+        """Relative store paths are recoverable from any working dir."""
+        with TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "data"
+            data_dir.mkdir()
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            self.addCleanup(os.chdir, cwd)
+            store = FileStore("data/data.json")
+            uow = UnitOfWork("data")
+            replace = os.replace
+
+            def crash_on_commit(source, target):
+                if str(source).endswith(".uow.tmp"):
+                    raise OSError("crash")
+                replace(source, target)
+
+            with mock.patch("src.transactions.os.replace",
+                            side_effect=crash_on_commit):
+                with self.assertRaises(OSError):
+                    with uow:
+                        uow.put(store, "A", {"value": 1})
+            os.chdir(cwd)
+
+            self.assertTrue(recover(str(data_dir)))
+            self.assertEqual(FileStore(str(data_dir / "data.json")).load(),
+                             {"A": {"value": 1}})
+
+    def test_lost_staged_file_keeps_intent(self):
+        """A missing staged file is not mistaken for a finished rename."""
+        with TemporaryDirectory() as tmp:
+            target = Path(tmp) / "data.json"
+            target.write_text("{}", encoding="utf-8")
+            intent = Path(tmp) / f"{INTENT_PREFIX}1.json"
+            intent.write_text(json.dumps([[
+                str(Path(tmp) / "gone.uow.tmp"), str(target), "0" * 64,
+            ]]), encoding="utf-8")
+
+            with mock.patch("builtins.print"):
+                self.assertFalse(recover(tmp))
+
+            self.assertTrue(intent.exists())
+
+    def test_sharded_store_commits_atomically(self):
+        """Shards touched by one transaction share its intent commit."""
+        with TemporaryDirectory() as tmp:
+            store = ShardedStore(tmp, "data", shards=4)
+            keys = ["K0", "K1", "K2", "K3", "K4", "K5"]
+            touched = {shard_of(key, 4) for key in keys}
+            self.assertGreater(len(touched), 1)
+            uow = UnitOfWork(tmp)
+            replace = os.replace
+            renamed = []
+
+            def crash_after_first(source, target):
+                if str(source).endswith(".uow.tmp"):
+                    if renamed:
+                        raise OSError("crash")
+                    renamed.append(target)
+                replace(source, target)
+
+            with mock.patch("src.transactions.os.replace",
+                            side_effect=crash_after_first):
+                with self.assertRaises(OSError):
+                    with uow:
+                        for key in keys:
+                            uow.put(store, key, {"value": key})
+
+            self.assertTrue(recover(tmp))
+            self.assertEqual(
+                ShardedStore(tmp, "data").load(),
+                {key: {"value": key} for key in keys},
+            )
+
+
+class TestTransactionalBooking(unittest.TestCase):
+    """Booking I/O is bounded and consistent."""
+
+    def test_booking_reads_each_store_once(self):
+        """create() reads every store once and writes two files."""
+        with TemporaryDirectory() as tmp:
+            FileStore(f"{tmp}/hotels.json").save(
+                {"H001": {"hotel_id": "H001", "name": "A",
+                          "rooms_total": 2, "rooms_available": 2}}
+            )
+            FileStore(f"{tmp}/customers.json").save(
+                {"C001": {"customer_id": "C001", "name": "X",
+                          "email": None}}
+            )
+            hotels = FileStore(f"{tmp}/hotels.json")
+            customers = FileStore(f"{tmp}/customers.json")
+            reservations = FileStore(f"{tmp}/reservations.json")
+            service = ReservationService(
+                reservations, HotelService(hotels), CustomerService(customers)
+            )
+
+            self.assertTrue(service.create(Reservation("R1", "H001", "C001")))
+
+            self.assertEqual(hotels.stats["reads"], 1)
+            self.assertEqual(customers.stats["reads"], 1)
+            self.assertEqual(reservations.stats["reads"], 0)
+            self.assertEqual(hotels.stats["writes"], 1)
+            self.assertEqual(reservations.stats["writes"], 1)
+            self.assertEqual(customers.stats["writes"], 0)
+
+    def test_booking_keeps_concurrent_hotel_update(self):
+        """A compare_and_set landing mid-booking is not undone."""
+        with TemporaryDirectory() as tmp:
+            hotels = HotelService(FileStore(f"{tmp}/hotels.json"))
+            customers = CustomerService(FileStore(f"{tmp}/customers.json"))
+            hotels.create(Hotel("H001", "A", 2, 2))
+            customers.create(Customer("C001", "X"))
+            service = ReservationService(
+                FileStore(f"{tmp}/reservations.json"), hotels, customers
+            )
+            other = HotelService(FileStore(f"{tmp}/hotels.json"))
+            # pylint: disable-next=protected-access
+            stage_hotel = service._stage_hotel
+
+            def racing(uow, record, hotel):
+                if record["version"] == 0:
+                    self.assertTrue(
+                        other.compare_and_set("H001", 0, name="B").ok
+                    )
+                stage_hotel(uow, record, hotel)
+
+            with mock.patch.object(service, "_stage_hotel", racing):
+                self.assertTrue(
+                    service.create(Reservation("R1", "H001", "C001"))
+                )
+
+            hotel = hotels.get("H001")
+            self.assertEqual(hotel.name, "B")
+            self.assertEqual(hotel.rooms_available, 1)
+            self.assertEqual(hotel.version, 2)
+
+    def test_failed_booking_writes_nothing(self):
+        """A rejected booking leaves both files untouched."""
+        with TemporaryDirectory() as tmp:
+            hotels = FileStore(f"{tmp}/hotels.json")
+            customers = FileStore(f"{tmp}/customers.json")
+            reservations = FileStore(f"{tmp}/reservations.json")
+            HotelService(hotels).create(Hotel("H001", "A", 1, 0))
+            CustomerService(customers).create(Customer("C001", "X"))
+            service = ReservationService(
+                reservations, HotelService(hotels), CustomerService(customers)
+            )
+            writes = hotels.stats["writes"]
+
+            self.assertFalse(service.create(Reservation("R1", "H001", "C001")))
+            self.assertEqual(hotels.stats["writes"], writes)
+            self.assertFalse(reservations.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()